@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict
-from services import genaitext
+from api.errors import upstream_http_exception
+from core.resilience import UpstreamError
+from services import hybrid_generation
 
 router = APIRouter()
 
@@ -12,11 +14,16 @@ class IngredientsPayload(BaseModel):
 async def generate_recipe_endpoint(payload: IngredientsPayload):
     """
     Generate a new recipe from a list of ingredients using a generative AI model.
+    A corpus recipe covering the ingredients well enough is returned instead
+    when hybrid generation is enabled; "source" tells which one was served.
     """
     if not payload.ingredients:
         raise HTTPException(status_code=400, detail="Ingredients list cannot be empty.")
 
-    recipe = genaitext.generate_recipe_with_gemini(payload.ingredients)
+    try:
+        recipe = await hybrid_generation.generate_recipe(payload.ingredients)
+    except UpstreamError as e:
+        raise upstream_http_exception(e)
 
     if "error" in recipe:
         raise HTTPException(status_code=500, detail=f"Failed to generate recipe: {recipe['error']}")
@@ -2,6 +2,8 @@ from fastapi import APIRouter, File, UploadFile, HTTPException
 from typing import Dict
 import shutil
 import os
+from api.errors import upstream_http_exception
+from core.resilience import UpstreamError
 from services import ingredienImg
 
 router = APIRouter()
@@ -22,12 +24,14 @@ async def extract_ingredients_from_image_endpoint(file: UploadFile = File(...)):
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
 
-        ingredients = ingredienImg.extract_ingredients_from_image(file_path)
+        ingredients = await ingredienImg.extract_ingredients_from_image(file_path)
 
         if not ingredients:
             raise HTTPException(status_code=404, detail="Could not extract any ingredients from the image.")
 
         return {"ingredients": ingredients}
+    except UpstreamError as e:
+        raise upstream_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
     finally:
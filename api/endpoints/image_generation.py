@@ -1,36 +1,28 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from api.errors import upstream_http_exception
+from core.resilience import UpstreamError
+from core.tracing import span
 from services import imgGen
+from services.registry import registry
 import os
 import re
 import uuid
 import io
 from dotenv import load_dotenv
-import cloudinary
-import cloudinary.uploader
 
 # Load environment variables from .env if present
 load_dotenv()
 
 router = APIRouter()
 
-# Configure Cloudinary from environment variables at import time
+# Cloudinary credentials from environment variables. The SDK itself is
+# imported and configured on first upload, see services/registry.py
 CLOUD_NAME = os.getenv("CLOUD_NAME")
 CLOUD_API_KEY = os.getenv("CLOUD_API_KEY")
 CLOUD_API_SECRET = os.getenv("CLOUD_API_SECRET")
 CLOUD_FOLDER = os.getenv("CLOUD_FOLDER", "recipes")
 
-if CLOUD_NAME and CLOUD_API_KEY and CLOUD_API_SECRET:
-    cloudinary.config(
-        cloud_name=CLOUD_NAME,
-        api_key=CLOUD_API_KEY,
-        api_secret=CLOUD_API_SECRET,
-        secure=True,
-    )
-else:
-    # Defer raising an error until endpoint call to avoid crashing app import
-    pass
-
 class ImagePrompt(BaseModel):
     prompt: str
 
@@ -63,15 +55,16 @@ async def generate_image_endpoint(payload: ImagePrompt):
 
         buffer = io.BytesIO(image_bytes)
         buffer.seek(0)
-        res = cloudinary.uploader.upload(
-            buffer,
-            folder=CLOUD_FOLDER,
-            public_id=public_id,
-            use_filename=True,
-            unique_filename=False,
-            overwrite=False,
-            resource_type="image",
-        )
+        with span("cloudinary"):
+            res = registry.get("cloudinary").upload(
+                buffer,
+                folder=CLOUD_FOLDER,
+                public_id=public_id,
+                use_filename=True,
+                unique_filename=False,
+                overwrite=False,
+                resource_type="image",
+            )
 
         url = res.get("secure_url") or res.get("url")
         if not url:
@@ -80,5 +73,7 @@ async def generate_image_endpoint(payload: ImagePrompt):
         return {"url": url, "public_id": res.get("public_id")}
     except HTTPException:
         raise
+    except UpstreamError as e:
+        raise upstream_http_exception(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate or upload image: {str(e)}")
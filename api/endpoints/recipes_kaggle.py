@@ -1,27 +1,193 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional, Sequence
 
 # Correctly import from sibling/parent packages within the 'app' module
+from api.responses import FastJSONResponse
 from crud import crud_recipe
-from schemas.recipe import Recipe
-from utils.formatters import clean_recipe_ingredients
+from core.config import settings
+from core.tracing import span
+from schemas.recipe import (
+    Recipe, IngredientStat, IngredientStatsDetail, IngredientSuggestion, RecipeBatchItem, RecipeBatchRequest,
+    SimilarRecipe,
+)
+from services import corpus_snapshot, export, ingredient_index, ingredient_stats, recipe_cache, similarity
+from utils.dietary import DIET_FLAGS_FIELD, DietFilter
+from utils.formatters import clean_recipe_ingredients, serialize_recipe
+from utils.ingredients import canonicalize_ingredient
 
 router = APIRouter()
 
+
+def recipe_response(content):
+    """
+    Returns cleaned recipe(s) through the trusted fast path when enabled:
+    shaped by serialize_recipe and encoded with orjson, skipping
+    response_model validation. Otherwise FastAPI validates as usual.
+    """
+    if not settings.FAST_SERIALIZATION:
+        return content
+    with span("serialize"):
+        if isinstance(content, dict):
+            return FastJSONResponse(serialize_recipe(content))
+        return FastJSONResponse([serialize_recipe(recipe) for recipe in content])
+
+
+def parse_diet_filter(include: List[str], exclude: List[str]) -> Optional[DietFilter]:
+    """
+    Compiles the `include`/`exclude` query parameters, rejecting unknown
+    labels with a 400.
+    """
+    try:
+        return DietFilter.parse(include, exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def load_cleaned_recipes(recipe_ids: Sequence[str]) -> Dict[str, dict]:
+    """
+    Cleaned recipes for the given IDs, from the memory-mapped snapshot where
+    possible, then the recipe cache, and from Mongo (in one query) for
+    anything neither holds. Unknown IDs are absent from the result.
+    """
+    found = {}
+    snapshot = corpus_snapshot.get_snapshot()
+    if snapshot is not None:
+        found = snapshot.get_many(recipe_ids)
+
+    missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in found]
+    cache = recipe_cache.get_cache()
+    if missing and cache is not None:
+        found.update(cache.get_many(missing))
+        missing = [recipe_id for recipe_id in missing if recipe_id not in found]
+
+    if missing:
+        from_db = await crud_recipe.get_recipes_by_ids(missing)
+        cleaned = {recipe_id: clean_recipe_ingredients(doc) for recipe_id, doc in from_db.items()}
+        if cache is not None:
+            cache.put_many(cleaned)
+        found.update(cleaned)
+    return found
+
+
+async def snapshot_page(snapshot, skip: int, limit: int, diet_filter: Optional[DietFilter]) -> List[dict]:
+    """
+    A list page from the corpus snapshot, with rows changed since it was
+    written replaced by their current version (dropped if deleted or no
+    longer matching diet_filter).
+    """
+    page = snapshot.page(skip=skip, limit=limit, diet_filter=diet_filter)
+    stale = [str(recipe["_id"]) for recipe in page if snapshot.is_stale(recipe)]
+    if not stale:
+        return page
+
+    current = await load_cleaned_recipes(stale)
+    refreshed = []
+    for recipe in page:
+        if snapshot.is_stale(recipe):
+            recipe = current.get(str(recipe["_id"]))
+            if recipe is None or (diet_filter is not None and not diet_filter.matches(recipe.get(DIET_FLAGS_FIELD))):
+                continue
+        refreshed.append(recipe)
+    return refreshed
+
+
 @router.get("/", response_model=List[Recipe])
-async def read_recipes(skip: int = 0, limit: int = 20):
+async def read_recipes(
+    skip: int = 0,
+    limit: int = 20,
+    include: List[str] = Query([], description="Diets to satisfy (e.g. vegan) or categories to contain (e.g. dairy)."),
+    exclude: List[str] = Query([], description="Categories to avoid (e.g. tree_nut) or diets not to satisfy."),
+):
     """
-    Retrieve a paginated list of recipes.
-    Ingredients are cleaned on-the-fly for each recipe.
+    Retrieve a paginated list of recipes, optionally filtered by dietary and
+    allergen flags.
+    Ingredients are cleaned on-the-fly for each recipe, unless the page is
+    served from the corpus snapshot, which stores them already cleaned.
     """
+    diet_filter = parse_diet_filter(include, exclude)
+
+    snapshot = corpus_snapshot.get_snapshot()
+    if snapshot is not None and not snapshot.superseded and (diet_filter is None or snapshot.has_diet_flags):
+        return recipe_response(await snapshot_page(snapshot, skip, limit, diet_filter))
+
     # 1. Fetch the raw data
-    recipes_from_db = await crud_recipe.get_recipes(skip=skip, limit=limit)
+    recipes_from_db = await crud_recipe.get_recipes(
+        skip=skip, limit=limit, diet_query=diet_filter.to_query() if diet_filter else None,
+    )
 
     # 2. Apply the cleaning function to each recipe
     cleaned_recipes = [clean_recipe_ingredients(recipe) for recipe in recipes_from_db]
 
     # 3. Return the cleaned recipes
-    return cleaned_recipes
+    return recipe_response(cleaned_recipes)
+
+@router.post("/batch", response_model=List[RecipeBatchItem])
+async def read_recipes_batch(payload: RecipeBatchRequest):
+    """
+    Retrieve many recipes in one call, e.g. for favourites or a meal plan.
+    Results follow the order of `ids` (duplicates included); IDs that are
+    malformed or unknown get an item with `recipe: null` and an `error`.
+    """
+    if len(payload.ids) > settings.RECIPE_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RECIPE_BATCH_MAX_IDS} ids can be requested at once.",
+        )
+
+    valid_ids = list(dict.fromkeys(recipe_id for recipe_id in payload.ids if ObjectId.is_valid(recipe_id)))
+    recipes_by_id = await load_cleaned_recipes(valid_ids)
+
+    fast = settings.FAST_SERIALIZATION
+    items = []
+    with span("serialize"):
+        for recipe_id in payload.ids:
+            recipe = recipes_by_id.get(recipe_id)
+            if recipe is not None:
+                items.append({"id": recipe_id, "recipe": serialize_recipe(recipe) if fast else recipe, "error": None})
+            else:
+                error = "not_found" if ObjectId.is_valid(recipe_id) else "invalid_id"
+                items.append({"id": recipe_id, "recipe": None, "error": error})
+    return FastJSONResponse(items) if fast else items
+
+@router.get("/export")
+async def export_recipes(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (one JSON object per line) or csv."),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated fields to export; default {','.join(export.DEFAULT_FIELDS)}."
+    ),
+    ingredients: List[str] = Query([], description="Only recipes using all of these ingredients."),
+    include: List[str] = Query([], description="Diets to satisfy (e.g. vegan) or categories to contain (e.g. dairy)."),
+    exclude: List[str] = Query([], description="Categories to avoid (e.g. tree_nut) or diets not to satisfy."),
+):
+    """
+    Stream the whole catalogue, or a filtered part of it, in one response.
+    Recipes are read from Mongo in batches and written as they arrive, so
+    memory use does not grow with the size of the export. The body is
+    gzip-compressed when the client sends "Accept-Encoding: gzip".
+    """
+    try:
+        export_fields = export.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    diet_filter = parse_diet_filter(include, exclude)
+    compress = "gzip" in request.headers.get("accept-encoding", "").lower()
+
+    headers = {"Content-Disposition": f'attachment; filename="recipes.{format}"', "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    body = export.stream_recipes(
+        format,
+        export_fields,
+        ingredients=ingredients,
+        diet_query=diet_filter.to_query() if diet_filter else None,
+        batch_size=settings.EXPORT_BATCH_SIZE,
+        chunk_bytes=settings.EXPORT_CHUNK_BYTES,
+        compress=compress,
+    )
+    return StreamingResponse(body, media_type=export.FORMATS[format], headers=headers)
 
 @router.get("/{recipe_id}", response_model=Recipe)
 async def read_recipe(recipe_id: str):
@@ -29,13 +195,44 @@ async def read_recipe(recipe_id: str):
     Retrieve a single recipe by its ID.
     Ingredients are cleaned on-the-fly before returning.
     """
-    recipe_from_db = await crud_recipe.get_recipe_by_id(recipe_id)
-    if recipe_from_db is None:
+    # Snapshot, then cache, then Mongo
+    cleaned_recipe = (await load_cleaned_recipes([recipe_id])).get(recipe_id)
+    if cleaned_recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
+    return recipe_response(cleaned_recipe)
 
-    # Apply the cleaning function and return the result
-    cleaned_recipe = clean_recipe_ingredients(recipe_from_db)
-    return cleaned_recipe
+@router.get("/{recipe_id}/similar", response_model=List[SimilarRecipe])
+async def read_similar_recipes(
+    recipe_id: str,
+    limit: int = Query(settings.SIMILAR_DEFAULT_LIMIT, ge=1, le=50),
+):
+    """
+    "More like this": recipes whose ingredients are most similar (cosine
+    over TF-IDF ingredient vectors). Uses precomputed neighbour lists when
+    available, otherwise queries the in-memory similarity index.
+    """
+    neighbors = None
+    if settings.SIMILAR_USE_PRECOMPUTED:
+        stored = await crud_recipe.get_precomputed_neighbors(recipe_id)
+        if stored is not None:
+            neighbors = [(str(n["_id"]), n["score"]) for n in stored[:limit]]
+
+    if neighbors is None:
+        index = similarity.get_index()
+        if index is None:
+            raise HTTPException(status_code=503, detail="Similarity index is not ready yet.")
+        if recipe_id not in index:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        neighbors = index.similar(recipe_id, limit)
+
+    recipes_by_id = await load_cleaned_recipes([neighbor_id for neighbor_id, _ in neighbors])
+
+    similar_recipes = []
+    for neighbor_id, score in neighbors:
+        recipe = recipes_by_id.get(neighbor_id)
+        if recipe is not None:
+            similar_recipes.append({**recipe, "score": score})
+    return recipe_response(similar_recipes)
 
 @router.get("/by-ingredients/", response_model=List[Recipe])
 async def search_recipes_by_ingredients(
@@ -43,13 +240,25 @@ async def search_recipes_by_ingredients(
         ...,
         title="Search Ingredients",
         description="Provide one or more ingredients to find matching recipes."
-    )
+    ),
+    include: List[str] = Query([], description="Diets to satisfy (e.g. vegan) or categories to contain (e.g. dairy)."),
+    exclude: List[str] = Query([], description="Categories to avoid (e.g. tree_nut) or diets not to satisfy."),
 ):
     """
-    Search for recipes that contain all of the provided ingredients.
+    Search for recipes that contain all of the provided ingredients,
+    optionally filtered by dietary and allergen flags.
     """
+    diet_filter = parse_diet_filter(include, exclude)
+
+    # Rarest ingredient first narrows the index scan the most
+    stats = ingredient_stats.get_stats()
+
     # 1. Fetch the matching recipes using the new CRUD function
-    recipes_from_db = await crud_recipe.find_recipes_by_ingredients(ingredients=ingredients)
+    recipes_from_db = await crud_recipe.find_recipes_by_ingredients(
+        ingredients=ingredients,
+        diet_query=diet_filter.to_query() if diet_filter else None,
+        order_terms=stats.rarest_first if stats is not None else None,
+    )
 
     if not recipes_from_db:
         # It's better to return an empty list than a 404 for a search
@@ -59,4 +268,51 @@ async def search_recipes_by_ingredients(
     cleaned_recipes = [clean_recipe_ingredients(recipe) for recipe in recipes_from_db]
 
     # 3. Return the cleaned, matching recipes
-    return cleaned_recipes
\ No newline at end of file
+    return recipe_response(cleaned_recipes)
+
+@router.get("/ingredients/suggest", response_model=List[IngredientSuggestion])
+async def suggest_ingredients(
+    prefix: str = Query("", description="What the user has typed so far."),
+    limit: int = Query(settings.SUGGEST_DEFAULT_LIMIT, ge=1, le=100),
+):
+    """
+    Typeahead suggestions for ingredient names, most used first.
+    Served entirely from the in-memory prefix index.
+    """
+    index = ingredient_index.get_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Ingredient index is not ready yet.")
+
+    return [{"name": name, "count": count} for name, count in index.suggest(prefix, limit)]
+
+@router.get("/ingredients/popular", response_model=List[IngredientStat])
+async def popular_ingredients(limit: int = Query(20, ge=1, le=200)):
+    """
+    The ingredients used by the most recipes, with their recipe counts.
+    Served from the in-memory mirror of the ingredient statistics.
+    """
+    stats = ingredient_stats.get_stats()
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Ingredient statistics are not ready yet.")
+
+    return [{"name": name, "count": count} for name, count in stats.popular(limit)]
+
+@router.get("/ingredients/{name}/stats", response_model=IngredientStatsDetail)
+async def read_ingredient_stats(name: str, limit: int = Query(10, ge=1, le=settings.INGREDIENT_STATS_TOP_N)):
+    """
+    Recipe count for one ingredient and the ingredients most often used
+    with it. The name is canonicalized like a search term ("Eggs" -> "egg").
+    """
+    stats = ingredient_stats.get_stats()
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Ingredient statistics are not ready yet.")
+
+    key = canonicalize_ingredient(name)
+    if not key or key not in stats:
+        raise HTTPException(status_code=404, detail="Ingredient not found")
+
+    return {
+        "name": key,
+        "count": stats.counts[key],
+        "related": [{"name": other, "count": count} for other, count in stats.related[key][:limit]],
+    }
@@ -0,0 +1,22 @@
+# stir-backend/app/api/errors.py
+
+from fastapi import HTTPException
+
+from core.resilience import CircuitOpenError, DeadlineExceededError, UpstreamError
+
+
+def upstream_http_exception(exc: UpstreamError) -> HTTPException:
+    """
+    Maps a call the resilience layer gave up on to the HTTP error for clients:
+    503 with Retry-After while the circuit is open, 504 when the deadline
+    ran out, 502 otherwise.
+    """
+    if isinstance(exc, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail=f"{exc.upstream} is temporarily unavailable, please retry later.",
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
+    if isinstance(exc, DeadlineExceededError):
+        return HTTPException(status_code=504, detail=f"{exc.upstream} did not respond in time.")
+    return HTTPException(status_code=502, detail=f"{exc.upstream} request failed.")
@@ -0,0 +1,57 @@
+# stir-backend/api/middleware.py
+
+import logging
+import time
+
+from fastapi import Request
+
+from core import metrics, profiling, tracing
+
+logger = logging.getLogger("stir.requests")
+
+
+async def log_requests(request: Request, call_next):
+    """
+    Records per-route count/status/latency metrics and emits one structured
+    access-log record per request. Both are cheap: metrics are in-memory
+    counters and logging only enqueues (see core.logging_config).
+
+    Also collects timing spans for the request (returned as Server-Timing)
+    and runs opt-in profiling (see core.profiling).
+    """
+    start_time = time.perf_counter()
+    trace_token = tracing.start_trace()
+    profiler = profiling.start() if profiling.should_profile(request) else None
+    status_code = 500
+    profile_name = None
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        process_time = time.perf_counter() - start_time
+        trace = tracing.end_trace(trace_token)
+        # Label by route template, not raw path, to keep metric cardinality bounded
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+
+        if profiler is not None:
+            profile_name = await profiling.stop(profiler, request.method, route_path)
+
+        metrics.observe_request(request.method, route_path, status_code, process_time)
+        logger.info(
+            "request",
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "route": route_path,
+                "status": status_code,
+                "duration_ms": round(process_time * 1000, 3),
+                "spans": {name: round(seconds * 1000, 3) for name, (seconds, _) in trace.spans.items()},
+            },
+        )
+
+    response.headers["Server-Timing"] = trace.server_timing(process_time)
+    response.headers["Timing-Allow-Origin"] = "*"
+    if profile_name:
+        response.headers["X-Profile-Id"] = profile_name
+    return response
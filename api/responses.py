@@ -0,0 +1,35 @@
+# stir-backend/api/responses.py
+
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+
+
+def _default(value: Any):
+    # orjson handles datetime natively; ObjectId is the only BSON type we return
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    orjson encoding of trusted documents, ObjectIds as strings.
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson-encoded response for trusted documents from our own database.
+
+    Returning an instance of this from an endpoint bypasses FastAPI's
+    response_model validation, so the content must already have the
+    response schema's shape (see utils.formatters.serialize_recipe).
+    Output is byte-identical to the default JSONResponse for our schemas.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
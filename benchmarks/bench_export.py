@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+bench_export.py
+
+Peak memory and throughput of GET /recipes/export as the export grows,
+against materialising the same recipes first (what a client paging
+through GET /recipes/ costs the server, all pages at once).
+
+The collection is a stand-in that generates synthetic recipes lazily in
+cursor batches, so the corpus itself costs nothing and any growth in
+traced memory comes from the export path. Requests go through main.app as
+raw ASGI calls and body chunks are discarded as they are sent.
+
+Prints one line per size and exits non-zero if the streaming export's
+peak memory grows with the number of recipes.
+
+Usage:
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --sizes 5000 20000 80000 --format csv
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import zlib
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+os.environ.setdefault("INVALIDATION_MODE", "off")
+
+from bson import ObjectId
+
+from benchmarks.synthetic import make_corpus
+
+
+class GeneratedCursor:
+    """
+    Async cursor over `count` recipes cloned from a small template corpus,
+    produced one batch at a time.
+    """
+
+    def __init__(self, templates, count, projection):
+        self._templates = templates
+        self._count = count
+        self._projection = projection or {}
+        self._batch_size = 100
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, size):
+        self._batch_size = size
+        return self
+
+    def _project(self, doc):
+        keep = [name for name, on in self._projection.items() if on and name != "_id"]
+        projected = {name: doc[name] for name in keep if name in doc} if keep else dict(doc)
+        if self._projection.get("_id", 1):
+            projected["_id"] = ObjectId()
+        return projected
+
+    async def __aiter__(self):
+        for start in range(0, self._count, self._batch_size):
+            batch = [
+                self._project(self._templates[i % len(self._templates)])
+                for i in range(start, min(start + self._batch_size, self._count))
+            ]
+            # One round trip per batch
+            await asyncio.sleep(0)
+            for doc in batch:
+                yield doc
+
+    async def to_list(self, length=None):
+        return [doc async for doc in self]
+
+    def close(self):
+        pass
+
+
+class GeneratedCollection:
+    def __init__(self, templates, count):
+        self._templates = templates
+        self.count = count
+
+    def find(self, query=None, projection=None, **kwargs):
+        return GeneratedCursor(self._templates, self.count, projection)
+
+
+async def measure(app, query_string, headers):
+    """
+    Calls the ASGI app directly and discards body chunks as they are sent,
+    like a client reading the response off the socket.
+    """
+    sent = {"status": None, "bytes": 0, "chunks": 0, "body": bytearray()}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/recipes/export", "raw_path": b"/api/v1/recipes/export",
+        "root_path": "", "query_string": query_string.encode(), "server": ("bench", 80), "client": ("bench", 1),
+        "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+    }
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if not sent.get("requested"):
+            sent["requested"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            sent["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body"):
+            sent["bytes"] += len(message["body"])
+            sent["chunks"] += 1
+            # Keep only the start of the body, to check its encoding
+            if len(sent["body"]) < 4096:
+                sent["body"] += message["body"][:4096 - len(sent["body"])]
+
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    disconnected.set()
+    return sent, elapsed, (peak - baseline) / 1024 / 1024
+
+
+def materialise(collection, fmt_fields):
+    """
+    The non-streaming equivalent: every document in memory, one body.
+    """
+    from api.responses import dumps
+    from services import export
+
+    async def run():
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        docs = await collection.find({}, export.projection_for(fmt_fields)).to_list()
+        body = dumps([export.shape(doc, fmt_fields) for doc in docs])
+        _, peak = tracemalloc.get_traced_memory()
+        return len(body), time.perf_counter() - started, (peak - baseline) / 1024 / 1024
+
+    return run()
+
+
+async def run(args):
+    from core.logging_config import configure_logging, stop_logging
+    from crud import crud_recipe
+    from services import export
+
+    import main
+
+    devnull = open(os.devnull, "w")
+    configure_logging(logging.WARNING, stream=devnull)
+    # The formatter logs every recipe at INFO
+    logging.getLogger("utils.formatters").setLevel(logging.WARNING)
+
+    collection = GeneratedCollection(make_corpus(500), 0)
+    crud_recipe.read_db = {"recipes": collection}
+    headers = {"accept-encoding": "gzip"} if args.gzip else {}
+    query_string = f"format={args.format}"
+
+    tracemalloc.start()
+    peaks = []
+    print(f"{'recipes':>8}  {'stream MiB':>10}  {'stream rec/s':>12}  {'chunks':>6}  "
+          f"{'body MiB':>8}  {'materialised MiB':>16}")
+    for size in args.sizes:
+        collection.count = size
+        sent, elapsed, peak = await measure(main.app, query_string, headers)
+        if sent["status"] != 200:
+            print(f"FAIL  export returned {sent['status']}")
+            return 1
+        if args.gzip:
+            # The first chunks must open a valid gzip stream
+            decoded = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(bytes(sent["body"]))
+            if not decoded.startswith(b"{" if args.format == "ndjson" else b"_id"):
+                print(f"FAIL  gzip body does not decode to {args.format}")
+                return 1
+        _, _, materialised_peak = await materialise(collection, export.DEFAULT_FIELDS)
+        peaks.append(peak)
+        print(f"{size:>8}  {peak:>10.2f}  {size / elapsed:>12.0f}  {sent['chunks']:>6}  "
+              f"{sent['bytes'] / 1024 / 1024:>8.1f}  {materialised_peak:>16.1f}")
+    tracemalloc.stop()
+    stop_logging()
+    devnull.close()
+
+    flat = peaks[-1] < max(peaks[0], 1.0) * 1.5
+    print(f"\n{'PASS' if flat else 'FAIL'}  streaming peak {peaks[0]:.2f} -> {peaks[-1]:.2f} MiB "
+          f"for {args.sizes[0]} -> {args.sizes[-1]} recipes")
+    return 0 if flat else 1
+
+
+def main(args):
+    if asyncio.run(run(args)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory profile of the streaming recipe export")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 8000, 32000])
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--no-gzip", dest="gzip", action="store_false", help="Request an uncompressed body")
+    main(parser.parse_args())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+bench_images.py
+
+Bytes a client downloads for recipe images: the full-size original in
+`image.url` versus the width-based delivery variants in `image.variants`.
+
+Cloudinary is not called. For every image size in the synthetic corpus a
+photo-like test image is rendered and encoded the way each URL would be
+served: the original as an upload-quality JPEG, a variant resized to its
+c_limit width and encoded as WebP at a q_auto-like quality (what f_auto
+serves to current browsers). Per-size byte counts are then weighted by
+how often each size occurs in the corpus.
+
+Usage:
+    python benchmarks/bench_images.py
+    python benchmarks/bench_images.py --recipes 13500 --page-size 20
+"""
+
+import argparse
+import io
+import os
+import sys
+from collections import Counter
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings require a URI; the benchmark itself never connects
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.synthetic import make_corpus
+from utils.images import image_variants
+
+# Encoder settings standing in for the stored original and for f_auto,q_auto
+ORIGINAL_JPEG_QUALITY = 90
+VARIANT_WEBP_QUALITY = 80
+
+
+def photo_like(width: int, height: int, seed: int = 3) -> Image.Image:
+    """
+    Smooth colour regions plus fine grain, which compresses roughly like a
+    food photograph (flat noise or flat colour would not).
+    """
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(40, 220, size=(max(height // 64, 2), max(width // 64, 2), 3), dtype=np.uint8)
+    base = np.asarray(Image.fromarray(coarse).resize((width, height), Image.BICUBIC), dtype=np.int16)
+    grain = rng.normal(0, 10, size=(height, width, 3))
+    return Image.fromarray(np.clip(base + grain, 0, 255).astype(np.uint8))
+
+
+def encoded_size(image: Image.Image, fmt: str, quality: int) -> int:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=quality)
+    return buffer.tell()
+
+
+def main(args):
+    corpus = make_corpus(args.recipes)
+    images = [recipe["image"] for recipe in corpus if recipe.get("image")]
+    sizes = Counter((image["width"], image["height"]) for image in images)
+
+    # Bytes per (width, height) for the original and each variant
+    original_bytes = {}
+    variant_bytes = {}
+    for (width, height) in sizes:
+        photo = photo_like(width, height)
+        original_bytes[(width, height)] = encoded_size(photo, "JPEG", ORIGINAL_JPEG_QUALITY)
+        variants = image_variants({"url": images[0]["url"], "public_id": "x", "width": width, "height": height})
+        for name, variant in variants.items():
+            resized = photo.resize((variant["width"], variant["height"]), Image.LANCZOS)
+            variant_bytes[(width, height, name)] = encoded_size(resized, "WEBP", VARIANT_WEBP_QUALITY)
+
+    names = list(image_variants(images[0]))
+    total_original = sum(original_bytes[size] * count for size, count in sizes.items())
+
+    print(f"recipes={len(images)} sizes={dict(sorted(sizes.items()))}")
+    print(f"{'size':>11}  {'original KiB':>12}  " + "  ".join(f"{name + ' KiB':>14}" for name in names))
+    for (width, height) in sorted(sizes):
+        row = "  ".join(f"{variant_bytes[(width, height, name)] / 1024:>14.1f}" for name in names)
+        print(f"{width:>5}x{height:<5}  {original_bytes[(width, height)] / 1024:>12.1f}  {row}")
+
+    print(f"\ncorpus-weighted, per image and per list page of {args.page_size}:")
+    print(f"{'variant':<10} {'avg KiB':>8} {'page KiB':>9} {'saved':>7}")
+    average_original = total_original / len(images)
+    print(f"{'original':<10} {average_original / 1024:>8.1f} {average_original * args.page_size / 1024:>9.1f} {'':>7}")
+    for name in names:
+        total = sum(variant_bytes[(width, height, name)] * count for (width, height), count in sizes.items())
+        average = total / len(images)
+        print(f"{name:<10} {average / 1024:>8.1f} {average * args.page_size / 1024:>9.1f} "
+              f"{1 - total / total_original:>7.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate image bytes saved by responsive delivery variants")
+    parser.add_argument("--recipes", type=int, default=13500)
+    parser.add_argument("--page-size", type=int, default=20, help="Recipes per list page")
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+bench_middleware.py
+
+Per-request overhead of the request-logging/metrics middleware, measured
+on the middleware function alone: a pre-built request and a call_next that
+returns immediately, so nothing but the middleware's own work is timed.
+Logs go through the real queue handler to /dev/null.
+
+Usage:
+    python benchmarks/bench_middleware.py
+    python benchmarks/bench_middleware.py --requests 200000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from api.middleware import log_requests
+from core import metrics
+from core.logging_config import configure_logging, stop_logging
+
+
+def make_request() -> Request:
+    route = Route("/api/v1/recipes/{recipe_id}", endpoint=lambda request: None)
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/recipes/652f1c2e9b1e8a3d4c5b6a79",
+        "raw_path": b"/api/v1/recipes/652f1c2e9b1e8a3d4c5b6a79",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "scheme": "http",
+        "server": ("bench", 80),
+        "route": route,
+    })
+
+
+async def run(n: int, legacy_stream) -> None:
+    request = make_request()
+    response = Response(b"{}", media_type="application/json")
+
+    async def call_next(_request):
+        return response
+
+    async def bare(_request, call_next):
+        return await call_next(_request)
+
+    async def metrics_only(_request, call_next):
+        started = time.perf_counter()
+        result = await call_next(_request)
+        metrics.observe_request("GET", "/bench", result.status_code, time.perf_counter() - started)
+        return result
+
+    async def legacy(_request, call_next):
+        # The previous middleware: print + logging.info, twice, synchronously
+        logging.info(f"REQUEST: {_request.method} {_request.url.path}")
+        print(f"REQUEST: {_request.method} {_request.url.path}", file=legacy_stream)
+        started = time.time()
+        result = await call_next(_request)
+        elapsed = time.time() - started
+        print(f"RESPONSE: Status {result.status_code} - Took {elapsed:.2f}s", file=legacy_stream)
+        logging.info(f"RESPONSE: Status {result.status_code} - Took {elapsed:.2f}s")
+        return result
+
+    variants = (
+        ("no-op", bare),
+        ("metrics only", metrics_only),
+        ("log_requests", log_requests),
+        ("legacy", legacy),
+    )
+    for name, middleware in variants:
+        # Warm up caches and metric series before timing
+        for _ in range(1000):
+            await middleware(request, call_next)
+        started = time.perf_counter()
+        for _ in range(n):
+            await middleware(request, call_next)
+        per_call_us = (time.perf_counter() - started) / n * 1e6
+        print(f"{name:<13} {per_call_us:8.2f} µs/request")
+
+    print(metrics.HTTP_LATENCY.count(("GET", "/api/v1/recipes/{recipe_id}")), "requests recorded")
+
+
+def main(args):
+    with open(os.devnull, "w") as devnull:
+        configure_logging(logging.INFO, stream=devnull)
+        asyncio.run(run(args.requests, devnull))
+        # Drain the queue before devnull is closed
+        stop_logging()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the logging/metrics middleware")
+    parser.add_argument("--requests", type=int, default=100000)
+    main(parser.parse_args())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+bench_resilience.py
+
+Measures core.resilience against fake upstreams with injected latency:
+
+  hedge      hedging cuts the p99 of a heavy-tailed upstream
+  app        POST /generate/generate-recipe/ against a stalled fake Gemini
+             answers 504 within the deadline, then 503 once the circuit opens
+
+The behaviour of deadlines, retries, the circuit breaker and hedging is
+covered by tests/test_resilience.py; this script checks the timings.
+
+Prints one line per check and exits non-zero if any check fails.
+
+Usage:
+    python benchmarks/bench_resilience.py
+    python benchmarks/bench_resilience.py --calls 500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import random
+import sys
+import time
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+# The app check exercises the Gemini path, not corpus matches
+os.environ.setdefault("HYBRID_GENERATION", "false")
+
+from core.resilience import CircuitBreaker, Policy, Upstream
+
+
+class FakeUpstream:
+    """
+    Async stand-in for an AI API: each call sleeps for a latency drawn from
+    a fast/slow mixture and can be told to fail its next N calls.
+    """
+
+    def __init__(self, fast: float = 0.02, slow: float = 1.0, slow_ratio: float = 0.0, seed: int = 7):
+        self.fast = fast
+        self.slow = slow
+        self.slow_ratio = slow_ratio
+        self.fail_next = 0
+        self.error = ConnectionError
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    async def __call__(self):
+        self.calls += 1
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise self.error("injected failure")
+        slow = self._rng.random() < self.slow_ratio
+        await asyncio.sleep(self.slow if slow else self.fast)
+        return "ok"
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def timed(coro):
+    started = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as exc:
+        result = exc
+    return result, time.perf_counter() - started
+
+
+async def run_tail(upstream: Upstream, fake: FakeUpstream, calls: int, concurrency: int = 16):
+    latencies = []
+    remaining = calls
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            _, elapsed = await timed(upstream.call(fake))
+            latencies.append(elapsed)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def check_hedge(calls: int):
+    # 5% of requests take 1 s, the rest 20 ms
+    plain = await run_tail(
+        Upstream("bench_plain", Policy(timeout=5.0, deadline=5.0)),
+        FakeUpstream(slow_ratio=0.05), calls,
+    )
+    hedged_upstream = Upstream("bench_hedged", Policy(timeout=5.0, deadline=5.0, hedge=True, hedge_delay=0.1))
+    hedged = await run_tail(hedged_upstream, FakeUpstream(slow_ratio=0.05), calls)
+
+    plain_p99, hedged_p99 = percentile(plain, 0.99), percentile(hedged, 0.99)
+    ok = hedged_p99 < plain_p99 / 2
+    return ok, (
+        f"p50 {percentile(plain, 0.5) * 1000:.0f} -> {percentile(hedged, 0.5) * 1000:.0f} ms, "
+        f"p99 {plain_p99 * 1000:.0f} -> {hedged_p99 * 1000:.0f} ms "
+        f"(hedge delay {hedged_upstream.hedge_delay() * 1000:.0f} ms)"
+    )
+
+
+async def check_app():
+    import httpx
+
+    from benchmarks.fakes import FakeLatency, install_fakes, make_fake_db
+    from core.logging_config import configure_logging, stop_logging
+    from services import upstreams
+
+    import main
+
+    devnull = open(os.devnull, "w")
+    configure_logging(logging.WARNING, stream=devnull)
+    db, _ = await make_fake_db(200)
+    install_fakes(db, FakeLatency(gemini=3.0, jitter=0.0))
+    upstreams.gemini.policy = Policy(
+        timeout=0.2, deadline=0.4, max_attempts=2, backoff_base=0.01, failure_threshold=2, reset_timeout=30,
+    )
+    upstreams.gemini.breaker = CircuitBreaker("gemini", failure_threshold=2, reset_timeout=30)
+
+    transport = httpx.ASGITransport(app=main.app)
+    statuses = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        # The service module prints progress; keep the report readable
+        with contextlib.redirect_stdout(devnull):
+            for _ in range(2):
+                response = await client.post("/api/v1/generate/generate-recipe/", json={"ingredients": ["tomato"]})
+                statuses.append(response.status_code)
+        elapsed = time.perf_counter() - started
+    stop_logging()
+    devnull.close()
+
+    ok = statuses == [504, 503] and elapsed < 1.0
+    return ok, f"statuses {statuses} in {elapsed * 1000:.0f} ms against a 3 s stall"
+
+
+async def run(args):
+    checks = [("hedge", check_hedge(args.calls))]
+    if not args.skip_app:
+        checks.append(("app", check_app()))
+
+    failures = 0
+    for name, check in checks:
+        ok, detail = await check
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {name:<9} {detail}")
+    return failures
+
+
+def main(args):
+    failures = asyncio.run(run(args))
+    if failures:
+        print(f"\n{failures} check(s) failed")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Self-checking resilience benchmark against fake upstreams")
+    parser.add_argument("--calls", type=int, default=400, help="Calls per run in the hedging check")
+    parser.add_argument("--skip-app", action="store_true", help="Skip the end-to-end check through main.app")
+    main(parser.parse_args())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+bench_serialization.py
+
+Time to turn a page of recipes into response bytes: the default
+response_model path (Pydantic validation + serialization, then the stdlib
+JSON encoder) versus the trusted fast path (serialize_recipe + orjson).
+
+Also checks that both paths produce byte-identical bodies, through real
+FastAPI routes, for every page of the synthetic corpus.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --page-size 20 --rounds 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings require a URI; the benchmark itself never connects
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from api.responses import FastJSONResponse
+from benchmarks.synthetic import make_corpus
+from schemas.recipe import Recipe
+from utils.formatters import serialize_recipe
+
+
+def pydantic_path(adapter: TypeAdapter, page: List[dict]) -> bytes:
+    # What FastAPI does for response_model=List[Recipe]
+    validated = adapter.validate_python(page)
+    return JSONResponse(adapter.dump_python(validated, mode="json", by_alias=True)).body
+
+
+def fast_path(page: List[dict]) -> bytes:
+    return FastJSONResponse([serialize_recipe(recipe) for recipe in page]).body
+
+
+def timed(fn, rounds: int) -> List[float]:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def check_byte_compatibility(corpus: List[dict], page_size: int) -> int:
+    app = FastAPI()
+
+    @app.get("/default", response_model=List[Recipe])
+    def default(skip: int):
+        return corpus[skip:skip + page_size]
+
+    @app.get("/fast", response_model=List[Recipe])
+    def fast(skip: int):
+        return FastJSONResponse([serialize_recipe(recipe) for recipe in corpus[skip:skip + page_size]])
+
+    client = TestClient(app)
+    mismatches = 0
+    for skip in range(0, len(corpus), page_size):
+        if client.get(f"/default?skip={skip}").content != client.get(f"/fast?skip={skip}").content:
+            mismatches += 1
+    return mismatches
+
+
+def main(args):
+    corpus = make_corpus(args.recipes)
+    # Exercise the awkward cases: no image, non-ASCII and quotes in text
+    corpus[1].pop("image")
+    corpus[2]["title"] = 'Crème brûlée with "burnt" ½ sugar — 焦糖'
+
+    page = corpus[:args.page_size]
+    adapter = TypeAdapter(List[Recipe])
+
+    slow = timed(lambda: pydantic_path(adapter, page), args.rounds)
+    fast = timed(lambda: fast_path(page), args.rounds)
+    print(f"page of {args.page_size} recipes, {args.rounds} rounds")
+    print(f"response_model + json: p50={statistics.median(slow):.3f} ms")
+    print(f"fast path + orjson:    p50={statistics.median(fast):.3f} ms")
+    print(f"speed-up: {statistics.median(slow) / statistics.median(fast):.1f}x")
+
+    mismatches = check_byte_compatibility(corpus, args.page_size)
+    print(f"byte-compatibility: {mismatches} mismatching pages")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark recipe list-page serialization")
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=300)
+    main(parser.parse_args())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+bench_similarity.py
+
+Build time, memory footprint and top-k query latency of the similar-recipe
+index on the synthetic corpus.
+
+Usage:
+    python benchmarks/bench_similarity.py
+    python benchmarks/bench_similarity.py --recipes 50000 --vocabulary 20000 --weighting binary
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings require a URI; the benchmark itself never connects
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+
+from benchmarks.synthetic import make_corpus
+from services.similarity import SimilarityIndex
+
+
+def main(args):
+    corpus = make_corpus(args.recipes, args.vocabulary)
+    recipe_ids = [str(doc["_id"]) for doc in corpus]
+    ingredient_lists = [doc["ingredients_canonical"] for doc in corpus]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = SimilarityIndex(recipe_ids, ingredient_lists, weighting=args.weighting)
+    build_seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"recipes={len(index)} vocabulary={index.vocabulary_size} weighting={args.weighting}")
+    print(f"build:        {build_seconds * 1000:.1f} ms")
+    print(f"build peak:   {peak / 1024 / 1024:.1f} MiB (tracemalloc)")
+    print(f"index size:   {index.nbytes / 1024 / 1024:.1f} MiB (sparse matrices)")
+
+    rng = random.Random(0)
+    timings = []
+    for recipe_id in rng.choices(recipe_ids, k=args.queries):
+        started = time.perf_counter()
+        index.similar(recipe_id, args.k)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(
+        f"query top-{args.k}: p50={statistics.median(timings):.3f} ms "
+        f"p99={timings[int(len(timings) * 0.99) - 1]:.3f} ms over {len(timings)} queries"
+    )
+
+    if args.all_neighbors:
+        started = time.perf_counter()
+        count = sum(1 for _ in index.all_neighbors(args.k))
+        print(f"all neighbours: {count} recipes in {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the similar-recipe index")
+    parser.add_argument("--recipes", type=int, default=13500)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--weighting", choices=["tfidf", "binary"], default="tfidf")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--all-neighbors", action="store_true", help="Also time precomputing every neighbour list")
+    main(parser.parse_args())
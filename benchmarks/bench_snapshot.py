@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+bench_snapshot.py
+
+Worker start-up time and memory when serving the recipe corpus from Python
+dicts versus the memory-mapped snapshot.
+
+Each mode runs in a fresh subprocess that imports the app's dependencies,
+loads the corpus, then serves every recipe once (so all pages are touched).
+"dict" loads pickled documents, which is a lower bound for loading them
+from Mongo. Private (anonymous) RSS is what each extra uvicorn worker
+costs; file-backed RSS of the mapping is shared through the page cache.
+
+Usage:
+    python benchmarks/bench_snapshot.py
+    python benchmarks/bench_snapshot.py --recipes 50000
+"""
+
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings require a URI; the benchmark itself never connects
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+
+
+def rss_kib() -> dict:
+    fields = {}
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                fields[key] = int(value.split()[0])
+    return fields
+
+
+def run_worker(mode: str, path: str) -> None:
+    from services.corpus_snapshot import CorpusSnapshot
+
+    before = rss_kib()
+    started = time.perf_counter()
+    if mode == "dict":
+        with open(path, "rb") as fh:
+            recipes = pickle.load(fh)
+        by_id = {str(recipe["_id"]): recipe for recipe in recipes}
+        load_seconds = time.perf_counter() - started
+        served = sum(1 for recipe_id in by_id if by_id[recipe_id]["title"])
+    else:
+        snapshot = CorpusSnapshot(path)
+        load_seconds = time.perf_counter() - started
+        served = sum(1 for i in range(len(snapshot)) if snapshot.recipe(i)["title"])
+    after = rss_kib()
+
+    print(json.dumps({
+        "mode": mode,
+        "served": served,
+        "load_ms": load_seconds * 1000,
+        "private_mib": (after.get("RssAnon", 0) - before.get("RssAnon", 0)) / 1024,
+        "shared_mib": (after.get("RssFile", 0) - before.get("RssFile", 0)) / 1024,
+    }))
+
+
+def main(args):
+    from benchmarks.synthetic import make_corpus
+    from services.corpus_snapshot import write_snapshot
+
+    corpus = make_corpus(args.recipes)
+    with tempfile.TemporaryDirectory() as tmp:
+        pickle_path = os.path.join(tmp, "corpus.pickle")
+        snapshot_path = os.path.join(tmp, "corpus.snapshot")
+        with open(pickle_path, "wb") as fh:
+            pickle.dump(corpus, fh)
+        write_snapshot(snapshot_path, corpus)
+        print(f"recipes={len(corpus)} snapshot={os.path.getsize(snapshot_path) / 1024 / 1024:.1f} MiB")
+
+        print(f"{'mode':<6} {'load ms':>9} {'private MiB':>12} {'shared MiB':>11}")
+        for mode, path in (("dict", pickle_path), ("mmap", snapshot_path)):
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, "--path", path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:<6} {result['load_ms']:>9.1f} {result['private_mib']:>12.1f} {result['shared_mib']:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dict vs memory-mapped corpus workers")
+    parser.add_argument("--recipes", type=int, default=13500)
+    parser.add_argument("--worker", choices=["dict", "mmap"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args.worker, args.path)
+    else:
+        main(args)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py
+
+Cold-start cost of a worker: wall time and resident memory of `import main`,
+each measured in a fresh interpreter so nothing is already cached in
+sys.modules. Also lists which heavy SDKs the import pulled in; the AI and
+CDN clients are meant to load on first use (services/registry.py), so any
+of them showing up here is a regression on its own.
+
+With --baseline, results are compared to a previous --save-baseline run
+and the process exits non-zero if import time or RSS grows by more than
+--threshold, or if a lazily loaded SDK is imported eagerly again.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --save-baseline benchmarks/startup_baseline.json
+    python benchmarks/bench_startup.py --baseline benchmarks/startup_baseline.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only the AI/CDN endpoints need
+LAZY_MODULES = ("google.generativeai", "fireworks", "cloudinary", "PIL")
+
+# Runs inside the child interpreter; prints one JSON line
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+
+def rss_kib():
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mib": rss_kib() / 1024,
+    "modules": len(sys.modules),
+    "eager": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def measure_once() -> dict:
+    env = dict(os.environ)
+    # Settings require a URI; the client connects lazily, so nothing is contacted
+    env.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int) -> dict:
+    # First run warms the bytecode cache and the OS page cache
+    measure_once()
+    samples = [measure_once() for _ in range(runs)]
+    return {
+        "seconds": statistics.median(s["seconds"] for s in samples),
+        "rss_mib": statistics.median(s["rss_mib"] for s in samples),
+        "modules": samples[-1]["modules"],
+        "eager": samples[-1]["eager"],
+    }
+
+
+def compare(result: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    if result["seconds"] > baseline["seconds"] * (1 + threshold):
+        regressions.append(f"import time {result['seconds']:.3f}s > baseline {baseline['seconds']:.3f}s")
+    if result["rss_mib"] > baseline["rss_mib"] * (1 + threshold):
+        regressions.append(f"RSS {result['rss_mib']:.1f} MiB > baseline {baseline['rss_mib']:.1f} MiB")
+    newly_eager = sorted(set(result["eager"]) - set(baseline.get("eager", [])))
+    if newly_eager:
+        regressions.append(f"imported eagerly: {', '.join(newly_eager)}")
+    return regressions
+
+
+def main(args):
+    result = measure(args.runs)
+    print(f"import main: {result['seconds'] * 1000:.0f} ms, RSS {result['rss_mib']:.1f} MiB, "
+          f"{result['modules']} modules (median of {args.runs} runs)")
+    print(f"eagerly imported SDKs: {', '.join(result['eager']) or 'none'}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fh:
+            json.dump(result, fh, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            raise SystemExit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import time and RSS of `import main`")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON")
+    parser.add_argument("--save-baseline", help="Write results to this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    main(parser.parse_args())
@@ -0,0 +1,157 @@
+# stir-backend/benchmarks/fakes.py
+
+"""
+Local stand-ins for every external dependency, so the app can be driven
+offline with reproducible latency:
+
+  * Mongo      - mongomock-motor, loaded with the synthetic corpus
+  * Gemini     - fake `google.generativeai` module (text and multimodal)
+  * Fireworks  - fake ImageInference client returning a generated JPEG
+  * Cloudinary - fake uploader
+
+Each fake sleeps for a configurable latency the same way the real client
+would block: Gemini's SDK is synchronous so its fake uses time.sleep (the
+app runs it on a worker thread), Fireworks is awaited so its fake uses
+asyncio.sleep.
+"""
+
+import asyncio
+import io
+import json
+import random
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import List
+
+from PIL import Image
+
+from benchmarks.synthetic import make_corpus
+
+
+@dataclass
+class FakeLatency:
+    gemini: float = 0.8
+    fireworks: float = 1.5
+    cloudinary: float = 0.3
+    # Relative jitter applied to every fake call, e.g. 0.2 = +/-20%
+    jitter: float = 0.2
+
+    def sample(self, base: float) -> float:
+        return max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+class FakeGenerativeModel:
+    def __init__(self, model_name: str, latency: FakeLatency):
+        self.model_name = model_name
+        self._latency = latency
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self._latency.sample(self._latency.gemini))
+        if isinstance(prompt, list):
+            # Multimodal ingredient extraction
+            payload = {"ingredients": ["tomato", "onion", "garlic", "basil leaf"]}
+        else:
+            payload = {
+                "title": "Benchmark Skillet",
+                "description": "A fake recipe from the fake Gemini model.",
+                "servings": "2-4 people",
+                "prep_time": "10 minutes",
+                "cook_time": "20 minutes",
+                "ingredients": [{"item": "tomato", "quantity": "2"}, {"item": "garlic", "quantity": "1 clove"}],
+                "instructions": ["Chop everything.", "Cook everything."],
+            }
+        return SimpleNamespace(text=json.dumps(payload), candidates=[])
+
+
+class FakeGenAI:
+    """
+    Drop-in for the `google.generativeai` module as used by our services.
+    """
+
+    def __init__(self, latency: FakeLatency):
+        self._latency = latency
+
+    def configure(self, **kwargs):
+        pass
+
+    def GenerativeModel(self, model_name: str):
+        return FakeGenerativeModel(model_name, self._latency)
+
+
+class FakeImageInference:
+    def __init__(self, latency: FakeLatency, size: int = 256):
+        self._latency = latency
+        self._size = size
+
+    async def text_to_image_async(self, prompt: str, **kwargs):
+        await asyncio.sleep(self._latency.sample(self._latency.fireworks))
+        image = Image.new("RGB", (self._size, self._size), (200, 120, 40))
+        return SimpleNamespace(image=image, finish_reason="SUCCESS")
+
+
+def make_fake_upload(latency: FakeLatency):
+    def upload(file, folder=None, public_id=None, **kwargs):
+        time.sleep(latency.sample(latency.cloudinary))
+        full_id = f"{folder}/{public_id}" if folder else public_id
+        return {
+            "secure_url": f"https://res.cloudinary.com/bench/image/upload/{full_id}.jpg",
+            "public_id": full_id,
+            "width": 1024,
+            "height": 1024,
+            "format": "jpg",
+        }
+    return upload
+
+
+def make_test_image() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (30, 160, 60)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+async def make_fake_db(n_recipes: int, vocabulary_size: int = 5000):
+    """
+    Returns a mongomock-motor database holding the synthetic corpus, with
+    the same indexes the importer and migrations create.
+    """
+    from mongomock_motor import AsyncMongoMockClient
+
+    db = AsyncMongoMockClient()["stir"]
+    corpus = make_corpus(n_recipes, vocabulary_size)
+    await db["recipes"].insert_many(corpus)
+    await db["recipes"].create_index("ingredients_canonical")
+    await db["recipes"].create_index("diet_flags")
+    return db, corpus
+
+
+def install_fakes(db, latency: FakeLatency) -> None:
+    """
+    Points every service module at the fakes. Call after importing `main`.
+
+    The database is swapped by rebinding `db`/`read_db` on db.mongodb and
+    crud.crud_recipe, the only app modules that hold the client; all other
+    app code queries through crud_recipe. A module that does
+    `from db.mongodb import db` itself (like the scripts/ entry points)
+    keeps the real client, so new app code must go through crud_recipe or
+    be added here.
+    """
+    from api.endpoints import image_generation
+    from crud import crud_recipe
+    from db import mongodb
+    from services.registry import registry
+
+    mongodb.db = mongodb.read_db = db
+    crud_recipe.db = crud_recipe.read_db = db
+
+    registry.override("gemini", FakeGenAI(latency))
+    registry.override("fireworks_image", FakeImageInference(latency))
+    registry.override("cloudinary", SimpleNamespace(upload=make_fake_upload(latency)))
+    image_generation.CLOUD_NAME = "bench"
+    image_generation.CLOUD_API_KEY = "bench"
+    image_generation.CLOUD_API_SECRET = "bench"
+
+
+def sample_ids(corpus: List[dict], k: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    return [str(doc["_id"]) for doc in rng.sample(corpus, min(k, len(corpus)))]
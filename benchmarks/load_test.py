@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+load_test.py
+
+Offline load test of the whole app. Starts `main.app` in-process against
+the local fakes in benchmarks/fakes.py (Mongo stand-in holding a synthetic
+corpus, fake Gemini/Fireworks/Cloudinary with configurable latency) and
+drives each endpoint at fixed concurrency levels through httpx's ASGI
+transport. Reports RPS and p50/p99 latency per endpoint and concurrency.
+
+With --baseline, results are compared to a previous --save-baseline run
+and the process exits non-zero if any RPS drops, or any p99 grows, by more
+than --threshold. Record the baseline on the machine that runs the check;
+numbers from different hardware are not comparable.
+
+Usage:
+    pip install -r requirements-bench.txt
+    python benchmarks/load_test.py --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py --baseline benchmarks/baseline.json --threshold 0.2
+    python benchmarks/load_test.py --scenarios list_recipes suggest --concurrency 1 16 64
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings require a URI; the fakes replace the client before any query runs
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+# The Mongo stand-in has no change streams
+os.environ.setdefault("INVALIDATION_MODE", "poll")
+# The generate_from_corpus scenario measures database-first generation
+os.environ.setdefault("HYBRID_GENERATION", "true")
+
+import httpx
+
+from benchmarks.fakes import FakeLatency, install_fakes, make_fake_db, make_test_image, sample_ids
+from utils.ingredients import canonicalize_ingredient
+
+
+@dataclass
+class Scenario:
+    name: str
+    # Builds the kwargs for httpx.AsyncClient.request
+    build: Callable[[random.Random], dict]
+    # Scenarios backed by slow fake upstreams run fewer requests
+    slow: bool = False
+
+
+def make_scenarios(
+    recipe_ids: List[str], ingredient_names: List[str], ingredient_lists: List[List[str]],
+) -> List[Scenario]:
+    image_bytes = make_test_image()
+    prefix = "/api/v1"
+    return [
+        Scenario("list_recipes", lambda rng: {
+            "method": "GET", "url": f"{prefix}/recipes/",
+            "params": {"skip": rng.randint(0, 500), "limit": 100},
+        }),
+        Scenario("get_recipe", lambda rng: {
+            "method": "GET", "url": f"{prefix}/recipes/{rng.choice(recipe_ids)}",
+        }),
+        Scenario("batch_recipes", lambda rng: {
+            "method": "POST", "url": f"{prefix}/recipes/batch",
+            "json": {"ids": rng.sample(recipe_ids, 50)},
+        }),
+        Scenario("similar_recipes", lambda rng: {
+            "method": "GET", "url": f"{prefix}/recipes/{rng.choice(recipe_ids)}/similar",
+        }),
+        Scenario("by_ingredients", lambda rng: {
+            "method": "GET", "url": f"{prefix}/recipes/by-ingredients/",
+            "params": {"ingredients": rng.sample(ingredient_names, 2)},
+        }),
+        Scenario("suggest", lambda rng: {
+            "method": "GET", "url": f"{prefix}/recipes/ingredients/suggest",
+            "params": {"prefix": rng.choice(ingredient_names)[:rng.randint(1, 4)]},
+        }),
+        Scenario("generate_recipe", lambda rng: {
+            "method": "POST", "url": f"{prefix}/generate/generate-recipe/",
+            "json": {"ingredients": rng.sample(ingredient_names, 3)},
+        }, slow=True),
+        # Ingredients of a corpus recipe, which hybrid generation serves locally
+        Scenario("generate_from_corpus", lambda rng: {
+            "method": "POST", "url": f"{prefix}/generate/generate-recipe/",
+            "json": {"ingredients": rng.choice(ingredient_lists)},
+        }),
+        Scenario("extract_ingredients", lambda rng: {
+            "method": "POST", "url": f"{prefix}/image/extract-ingredients/",
+            "files": {"file": ("groceries.jpg", image_bytes, "image/jpeg")},
+        }, slow=True),
+        Scenario("generate_image", lambda rng: {
+            "method": "POST", "url": f"{prefix}/image/generate-image/",
+            "json": {"prompt": f"A bowl of {rng.choice(ingredient_names)}"},
+        }, slow=True),
+    ]
+
+
+async def run_level(client: httpx.AsyncClient, scenario: Scenario, concurrency: int, total: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+    rng = random.Random(concurrency)
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            kwargs = scenario.build(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(**kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if result["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{key}: rps {result['rps']:.1f} < baseline {base['rps']:.1f}")
+        if result["p99_ms"] > base["p99_ms"] * (1 + threshold):
+            regressions.append(f"{key}: p99 {result['p99_ms']:.1f} ms > baseline {base['p99_ms']:.1f} ms")
+    return regressions
+
+
+async def run(args) -> Dict[str, Dict]:
+    import main
+    from core.logging_config import configure_logging
+
+    # Keep the app's logging work in the measurement, but not on the console
+    devnull = open(os.devnull, "w")
+    configure_logging(logging.INFO, stream=devnull)
+
+    db, corpus = await make_fake_db(args.recipes)
+    install_fakes(db, FakeLatency(args.gemini_latency, args.fireworks_latency, args.cloudinary_latency))
+
+    recipe_ids = sample_ids(corpus, 500)
+    ingredient_names = sorted({name for doc in corpus[:500] for name in doc["ingredients_canonical"]})
+    # Recipes whose ingredients canonicalize back to their stored names (the
+    # numbered synthetic names do not), so a request for them finds the recipe
+    ingredient_lists = [
+        doc["ingredients_cleaned"] for doc in corpus
+        if doc["ingredients_canonical"]
+        and all(canonicalize_ingredient(name) == name for name in doc["ingredients_canonical"])
+    ][:500]
+    scenarios = [s for s in make_scenarios(recipe_ids, ingredient_names, ingredient_lists)
+                 if not args.scenarios or s.name in args.scenarios]
+
+    results = {}
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"{'scenario':<22} {'conc':>5} {'reqs':>6} {'errs':>5} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9}")
+            for scenario in scenarios:
+                total = args.slow_requests if scenario.slow else args.requests
+                for concurrency in args.concurrency:
+                    # Service modules print progress; keep the report readable
+                    with contextlib.redirect_stdout(devnull):
+                        result = await run_level(client, scenario, concurrency, max(total, concurrency))
+                    results[f"{scenario.name}@{concurrency}"] = result
+                    print(
+                        f"{scenario.name:<22} {concurrency:>5} {result['requests']:>6} {result['errors']:>5} "
+                        f"{result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+                    )
+    return results
+
+
+def main(args):
+    results = asyncio.run(run(args))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as fh:
+            json.dump(results, fh, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            raise SystemExit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test against local fakes")
+    parser.add_argument("--recipes", type=int, default=5000, help="Synthetic corpus size")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=300, help="Requests per level for fast endpoints")
+    parser.add_argument("--slow-requests", type=int, default=16, help="Requests per level for AI/CDN endpoints")
+    parser.add_argument("--scenarios", nargs="+", help="Only run these scenarios")
+    parser.add_argument("--gemini-latency", type=float, default=0.8, help="Fake Gemini latency (s)")
+    parser.add_argument("--fireworks-latency", type=float, default=1.5, help="Fake Fireworks latency (s)")
+    parser.add_argument("--cloudinary-latency", type=float, default=0.3, help="Fake Cloudinary latency (s)")
+    parser.add_argument("--baseline", help="Compare against this baseline JSON")
+    parser.add_argument("--save-baseline", help="Write results to this baseline JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    main(parser.parse_args())
@@ -0,0 +1,68 @@
+# stir-backend/benchmarks/synthetic.py
+
+"""
+Deterministic synthetic recipe corpus shaped like our stored documents.
+
+Ingredient popularity follows a Zipf-like distribution, as it does in the
+Epicurious data: a few staples (salt, oil, garlic) appear everywhere and
+most ingredients are rare.
+"""
+
+import random
+from typing import Dict, List
+
+from bson import ObjectId
+
+from utils.dietary import classify_ingredients
+
+BASE_INGREDIENTS = [
+    "salt", "olive oil", "garlic", "onion", "butter", "sugar", "egg", "flour", "pepper", "lemon juice",
+    "water", "milk", "heavy cream", "parmesan", "tomato", "chicken", "ginger", "honey", "scallion",
+    "cilantro", "soy sauce", "rice", "potato", "carrot", "celery", "thyme", "rosemary", "basil leaf",
+    "vanilla extract", "baking powder", "baking soda", "cinnamon", "cumin", "paprika", "chickpea",
+    "shrimp", "bacon", "walnut", "almond", "peanut butter", "tofu", "mushroom", "spinach", "lime juice",
+]
+
+UNITS = ["cup", "tbsp.", "tsp.", "oz.", "lb.", "g"]
+WORDS = ["roasted", "spicy", "quick", "classic", "braised", "crispy", "summer", "herbed", "smoky", "golden"]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    vocabulary = list(BASE_INGREDIENTS[:size])
+    while len(vocabulary) < size:
+        vocabulary.append(f"{rng.choice(WORDS)} {rng.choice(BASE_INGREDIENTS)} {len(vocabulary)}")
+    return vocabulary
+
+
+def make_corpus(n_recipes: int = 13500, vocabulary_size: int = 5000, seed: int = 42) -> List[Dict]:
+    """
+    Returns n_recipes documents with the same fields the importer writes.
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+    weights = [1.0 / (rank + 1) ** 1.1 for rank in range(len(vocabulary))]
+
+    corpus = []
+    for i in range(n_recipes):
+        names = list(dict.fromkeys(rng.choices(vocabulary, weights=weights, k=rng.randint(5, 18))))
+        lines = [f"{rng.randint(1, 4)} {rng.choice(UNITS)} {name}" for name in names]
+        stem = f"synthetic-recipe-{i}"
+        width, height = rng.choice([(274, 169), (1024, 768), (1200, 800), (2048, 1365)])
+        corpus.append({
+            "_id": ObjectId(),
+            "title": f"{rng.choice(WORDS).title()} {names[0].title()} #{i}",
+            "ingredients_raw": repr(lines),
+            "ingredients_cleaned": lines,
+            "ingredients_canonical": names,
+            "diet_flags": classify_ingredients(names),
+            "instructions": " ".join(f"Step {s + 1}: cook the {rng.choice(names)}." for s in range(rng.randint(3, 9))),
+            "source_meta": {"image_name": stem},
+            "image": {
+                "url": f"https://res.cloudinary.com/demo/image/upload/v1/recipes/{stem}.jpg",
+                "public_id": f"recipes/{stem}",
+                "width": width,
+                "height": height,
+                "format": "jpg",
+            },
+        })
+    return corpus
@@ -6,14 +6,123 @@ from typing import Optional
 class Settings(BaseSettings):
     # MongoDB settings
     MONGO_URI: str
+    # Client options below are passed only when set; unset ones keep the value
+    # from MONGO_URI, else the driver default. Set values override MONGO_URI.
+    # Connection pool (driver defaults: 100 max, 0 min, no wait queue timeout)
+    MONGO_MAX_POOL_SIZE: Optional[int] = None
+    MONGO_MIN_POOL_SIZE: Optional[int] = None
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None  # e.g. 2000 to fail fast when the pool is exhausted
+    # Timeouts (driver defaults: 20 s connect, 30 s server selection, no socket timeout)
+    MONGO_CONNECT_TIMEOUT_MS: Optional[int] = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: Optional[int] = None
+    MONGO_SOCKET_TIMEOUT_MS: Optional[int] = None
+    # Wire compression, comma-separated in preference order, e.g. "zlib" (zstd/snappy need extra packages)
+    MONGO_COMPRESSORS: Optional[str] = None
+    # Secondary reads may lag the primary by at most this much (MongoDB minimum is 90)
+    MONGO_READ_MAX_STALENESS_SECONDS: int = 90
+    # Commands slower than this are counted and logged
+    MONGO_SLOW_COMMAND_MS: int = 100
 
     # JWT settings (optional for now)
     JWT_SECRET_KEY: Optional[str] = "your-secret-key-here"
     JWT_ALGORITHM: Optional[str] = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Cleaned-recipe cache in front of Mongo (0 disables it)
+    RECIPE_CACHE_MAX_ENTRIES: int = 5000
+    RECIPE_CACHE_TTL_SECONDS: int = 300
+    # Most IDs accepted by POST /recipes/batch
+    RECIPE_BATCH_MAX_IDS: int = 250
+    # GET /recipes/export: documents per cursor batch and bytes per response chunk
+    EXPORT_BATCH_SIZE: int = 500
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    # How workers learn about writes to the recipes collection: "auto" (change
+    # streams, else polling updated_at), "change_stream", "poll" or "off"
+    INVALIDATION_MODE: str = "auto"
+    INVALIDATION_POLL_INTERVAL_SECONDS: float = 5.0
+    # Changes within this window are published as one event
+    INVALIDATION_BATCH_WINDOW_SECONDS: float = 0.5
+    # Quiet period before derived indexes are rebuilt after recipe writes
+    INDEX_REBUILD_DELAY_SECONDS: float = 30.0
+
+    # Ingredient autocomplete settings
+    SUGGEST_DEFAULT_LIMIT: int = 10
+    # How often (seconds) to check whether the corpus was re-imported
+    CORPUS_REFRESH_INTERVAL_SECONDS: int = 60
+
+    # Co-occurring ingredients kept per ingredient by the ingredient stats mirror
+    INGREDIENT_STATS_TOP_N: int = 20
+
+    # Similar-recipe settings
+    SIMILARITY_WEIGHTING: str = "tfidf"  # "tfidf" or "binary"
+    SIMILAR_DEFAULT_LIMIT: int = 10
+    # Serve from neighbour lists written by scripts/build_similar_recipes.py when present
+    # and built from the current corpus version
+    SIMILAR_USE_PRECOMPUTED: bool = True
+
+    # Memory-mapped corpus snapshot (scripts/snapshot_corpus.py); read paths use it when set
+    CORPUS_SNAPSHOT_PATH: Optional[str] = None
+
+    # Encode recipe responses with orjson, skipping response_model re-validation
+    FAST_SERIALIZATION: bool = True
+
+    # Responsive image variants returned with every recipe image: name=width
+    # pairs, derived from the stored Cloudinary public_id (no extra uploads)
+    IMAGE_VARIANT_WIDTHS: str = "thumbnail=160,card=480,full=1280"
+    # Transformation applied to every variant: automatic format and quality
+    IMAGE_VARIANT_TRANSFORM: str = "f_auto,q_auto"
+    # Used to build delivery URLs when a stored image URL does not name the cloud
+    CLOUD_NAME: Optional[str] = None
+
+    # Opt-in request profiling: send "X-Profile: <PROFILE_TOKEN>", or sample a fraction of requests
+    PROFILE_TOKEN: Optional[str] = None
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_DIR: str = "profiles"
+
+    # API keys for the AI services; never commit them, set them in .env or the environment
+    GEMINI_API_KEY: Optional[str] = None
+    FIREWORKS_API_KEY: Optional[str] = None
+
+    # External service clients (gemini, fireworks_image, cloudinary) are built on
+    # first use; list any here, comma-separated, to build them at startup instead
+    PRELOAD_SERVICES: Optional[str] = None
+
+    # Resilience for external AI calls: per-attempt timeout and overall
+    # deadline (seconds), attempts, hedging, and circuit breaker
+    GEMINI_TIMEOUT_SECONDS: float = 30.0
+    GEMINI_DEADLINE_SECONDS: float = 60.0
+    GEMINI_MAX_ATTEMPTS: int = 3
+    GEMINI_HEDGE: bool = False
+    # Threads for the blocking Gemini SDK; bounds concurrent Gemini calls per worker
+    GEMINI_MAX_CONCURRENCY: int = 16
+    FIREWORKS_TIMEOUT_SECONDS: float = 60.0
+    FIREWORKS_DEADLINE_SECONDS: float = 90.0
+    FIREWORKS_MAX_ATTEMPTS: int = 2
+    FIREWORKS_HEDGE: bool = False
+    UPSTREAM_BACKOFF_BASE_SECONDS: float = 0.5
+    UPSTREAM_BACKOFF_MAX_SECONDS: float = 5.0
+    # Hedge delay before enough latencies have been seen to use the p95
+    UPSTREAM_HEDGE_DELAY_SECONDS: float = 5.0
+    CIRCUIT_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Database-first generation: serve a corpus recipe instead of calling
+    # Gemini when its ingredient coverage (shared / all distinct
+    # ingredients of request and recipe, pantry staples ignored) is at least
+    # HYBRID_MIN_COVERAGE. Off by default: a corpus recipe is not tailored to
+    # the request the way a generated one is
+    HYBRID_GENERATION: bool = False
+    HYBRID_MIN_COVERAGE: float = 0.8
+    HYBRID_PANTRY_STAPLES: str = "salt,pepper,water,olive oil,vegetable oil,sugar"
+    # Most candidate recipes scored per request
+    HYBRID_MAX_CANDIDATES: int = 2000
+    # Store generated recipes in the corpus so later requests can be served from it
+    HYBRID_PERSIST_GENERATED: bool = False
+
     class Config:
         env_file = ".env"
         extra = "allow"  # Allow extra fields from .env
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
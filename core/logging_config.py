@@ -0,0 +1,96 @@
+# stir-backend/app/core/logging_config.py
+
+"""
+Non-blocking, structured logging.
+
+Log calls on the event loop only enqueue the record. A background
+QueueListener thread formats each record as one JSON object per line and
+writes it to stdout, so slow or blocked stdout never stalls a request.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional, TextIO
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class _DeferredFormatQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread. Only the
+    message arguments and exception text are resolved on the caller's side,
+    because they may reference objects that change after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def stop_logging() -> None:
+    """
+    Flushes queued records and stops the writer thread. Runs at exit;
+    safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(level: int = logging.INFO, stream: TextIO = sys.stdout) -> logging.handlers.QueueListener:
+    """
+    Routes all logging through a queue to a JSON stream handler.
+    Safe to call more than once; the previous listener is stopped.
+    """
+    global _listener
+
+    stop_logging()
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(JsonFormatter())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    logging.basicConfig(
+        level=level,
+        handlers=[_DeferredFormatQueueHandler(log_queue)],
+        force=True,  # Force reconfiguration to override uvicorn's logging
+    )
+    return _listener
+
+
+atexit.register(stop_logging)
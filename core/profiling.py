@@ -0,0 +1,72 @@
+# stir-backend/app/core/profiling.py
+
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it carries `X-Profile: <PROFILE_TOKEN>` or when
+it is picked by PROFILE_SAMPLE_RATE. The request is run under cProfile and
+the stats are written to PROFILE_DIR for later analysis with pstats or
+snakeviz. Only one request per worker is profiled at a time; cProfile
+observes the whole event-loop thread, so concurrent requests can show up
+in the same profile.
+"""
+
+import asyncio
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import time
+from typing import Optional
+
+from fastapi import Request
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+
+_active = False
+
+
+def should_profile(request: Request) -> bool:
+    if _active:
+        return False
+    token = request.headers.get(PROFILE_HEADER)
+    if token and settings.PROFILE_TOKEN and hmac.compare_digest(token, settings.PROFILE_TOKEN):
+        return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def start() -> cProfile.Profile:
+    global _active
+    _active = True
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+async def stop(profiler: cProfile.Profile, method: str, route: str) -> Optional[str]:
+    """
+    Stops the profiler and saves its stats. Returns the profile file name,
+    or None if it could not be written.
+    """
+    global _active
+    profiler.disable()
+    _active = False
+
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", route).strip("-") or "root"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{method.lower()}-{slug}-{os.getpid()}.prof"
+    path = os.path.join(settings.PROFILE_DIR, name)
+    try:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        # Writing stats can take a while for big profiles; keep it off the loop
+        await asyncio.to_thread(profiler.dump_stats, path)
+    except OSError:
+        logger.exception("Could not write request profile")
+        return None
+    logger.info("profile saved", extra={"profile": path, "route": route})
+    return name
@@ -0,0 +1,296 @@
+# stir-backend/app/core/resilience.py
+
+"""
+Deadlines, hedging, retries and circuit breaking for calls to slow external
+services (Gemini, Fireworks).
+
+Every call goes through an `Upstream`, which
+
+  * fails fast with CircuitOpenError while the upstream's circuit is open,
+  * bounds each attempt by `timeout` and the whole call by `deadline`,
+  * optionally hedges an attempt: if it has not answered after the recent
+    p95 latency, a second identical request is sent and the first answer
+    wins,
+  * retries transient errors (timeouts, connection errors, 429/5xx) with
+    full-jitter exponential backoff, as long as the deadline allows.
+
+Circuit state, attempts and outcomes are exported through core.metrics.
+"""
+
+import asyncio
+import functools
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from core import metrics
+
+T = TypeVar("T")
+
+UPSTREAM_CALLS = metrics.REGISTRY.counter(
+    "upstream_calls_total",
+    "Calls to external services by outcome (success, failure, deadline, rejected, cancelled).",
+    ("upstream", "outcome"),
+)
+UPSTREAM_ATTEMPTS = metrics.REGISTRY.counter(
+    "upstream_attempts_total", "Requests sent to external services by kind (first, retry, hedge).",
+    ("upstream", "kind"),
+)
+UPSTREAM_LATENCY = metrics.REGISTRY.histogram(
+    "upstream_call_duration_seconds", "Latency of external service calls including retries and hedges.",
+    ("upstream",),
+)
+CIRCUIT_STATE = metrics.REGISTRY.gauge(
+    "upstream_circuit_state", "Circuit breaker state per external service (0 closed, 1 half-open, 2 open).",
+    ("upstream",),
+)
+
+# HTTP statuses and SDK exception names that are worth retrying
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+TRANSIENT_ERROR_NAMES = {
+    "DeadlineExceeded", "InternalServerError", "ResourceExhausted", "ServiceUnavailable",
+    "TooManyRequests", "RateLimitError", "ServiceUnavailableError", "APITimeoutError",
+}
+
+
+class UpstreamError(Exception):
+    """
+    Base class for calls the resilience layer gave up on.
+    """
+
+    def __init__(self, upstream: str, message: str):
+        super().__init__(f"{upstream}: {message}")
+        self.upstream = upstream
+
+
+class CircuitOpenError(UpstreamError):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(upstream, "circuit open, failing fast")
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(UpstreamError):
+    pass
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(status, int) and status in TRANSIENT_STATUS_CODES:
+        return True
+    return type(exc).__name__ in TRANSIENT_ERROR_NAMES
+
+
+@dataclass
+class Policy:
+    # Per attempt and for the whole call, including backoff, in seconds
+    timeout: float
+    deadline: float
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 5.0
+    # Hedge after the recent `hedge_quantile` latency; `hedge_delay` is used
+    # until enough successful calls have been observed
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_delay: float = 2.0
+    # Open after this many consecutive transient failures, probe again after reset_timeout
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._set_state(self.CLOSED)
+
+    def _set_state(self, state: int) -> None:
+        self.state = state
+        CIRCUIT_STATE.set(state, (self.name,))
+
+    def retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out now. After reset_timeout an open circuit
+        lets a single probe through; its result closes or re-opens it.
+        """
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and self.retry_after() > 0:
+            return False
+        if self._probing:
+            return False
+        self._set_state(self.HALF_OPEN)
+        self._probing = True
+        return True
+
+    def release_probe(self) -> None:
+        """
+        Lets another probe through if the current one was abandoned.
+        """
+        self._probing = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probing = False
+        if self.state != self.CLOSED:
+            self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+            self._set_state(self.OPEN)
+
+
+class LatencyWindow:
+    """
+    Latencies of the most recent successful attempts, for the hedge delay.
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self._samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Upstream:
+    """
+    One external service: its policy, circuit breaker, latency window and,
+    for blocking SDKs, a bounded thread pool so stalled calls cannot use up
+    the event loop's default executor.
+    """
+
+    def __init__(self, name: str, policy: Policy, max_threads: Optional[int] = None, clock=time.monotonic):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(name, policy.failure_threshold, policy.reset_timeout, clock)
+        self.latencies = LatencyWindow()
+        self._clock = clock
+        self._max_threads = max_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run_sync(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs a blocking SDK call on this upstream's thread pool.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self._max_threads, thread_name_prefix=f"upstream-{self.name}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    def hedge_delay(self) -> float:
+        observed = self.latencies.quantile(self.policy.hedge_quantile)
+        return observed if observed is not None else self.policy.hedge_delay
+
+    async def _attempt(self, request: Callable[[], Awaitable[T]]) -> T:
+        if not self.policy.hedge:
+            return await request()
+
+        tasks = {asyncio.ensure_future(request())}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if done:
+                return done.pop().result()
+
+            UPSTREAM_ATTEMPTS.inc((self.name, "hedge"))
+            tasks.add(asyncio.ensure_future(request()))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The loser, or both requests if this attempt timed out
+            for task in tasks:
+                task.cancel()
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Calls `request` (a zero-argument coroutine factory, invoked once per
+        attempt) under this upstream's policy.
+        """
+        policy = self.policy
+        if not self.breaker.allow():
+            UPSTREAM_CALLS.inc((self.name, "rejected"))
+            raise CircuitOpenError(self.name, self.breaker.retry_after())
+
+        started = self._clock()
+        outcome = "failure"
+        try:
+            for attempt in range(policy.max_attempts):
+                remaining = policy.deadline - (self._clock() - started)
+                if remaining <= 0:
+                    outcome = "deadline"
+                    raise DeadlineExceededError(self.name, f"no answer within {policy.deadline:.1f}s")
+
+                UPSTREAM_ATTEMPTS.inc((self.name, "first" if attempt == 0 else "retry"))
+                attempt_started = self._clock()
+                try:
+                    result = await asyncio.wait_for(self._attempt(request), min(policy.timeout, remaining))
+                except Exception as exc:
+                    transient = is_transient(exc)
+                    if transient:
+                        self.breaker.record_failure()
+                    else:
+                        # The upstream answered (e.g. 400 for bad input): not a health signal
+                        self.breaker.release_probe()
+                    out_of_time = policy.deadline - (self._clock() - started) <= 0
+                    if isinstance(exc, asyncio.TimeoutError) and out_of_time:
+                        outcome = "deadline"
+                        raise DeadlineExceededError(
+                            self.name, f"no answer within {policy.deadline:.1f}s"
+                        ) from exc
+                    if not transient:
+                        raise
+                    if attempt == policy.max_attempts - 1:
+                        raise UpstreamError(
+                            self.name, f"failed after {policy.max_attempts} attempts: {exc!r}"
+                        ) from exc
+                    if not self.breaker.allow():
+                        raise CircuitOpenError(self.name, self.breaker.retry_after()) from exc
+                    # Full jitter keeps retries from many workers from synchronising
+                    backoff = random.uniform(0, min(policy.backoff_max, policy.backoff_base * 2 ** attempt))
+                    remaining = policy.deadline - (self._clock() - started)
+                    await asyncio.sleep(min(backoff, max(remaining, 0)))
+                    continue
+
+                self.breaker.record_success()
+                self.latencies.add(self._clock() - attempt_started)
+                outcome = "success"
+                return result
+        except asyncio.CancelledError:
+            # The caller went away; this says nothing about the upstream's health
+            self.breaker.release_probe()
+            outcome = "cancelled"
+            raise
+        finally:
+            UPSTREAM_CALLS.inc((self.name, outcome))
+            UPSTREAM_LATENCY.observe(self._clock() - started, (self.name,))
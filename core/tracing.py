@@ -0,0 +1,109 @@
+# stir-backend/app/core/tracing.py
+
+"""
+Lightweight per-request timing spans.
+
+The request middleware opens a Trace in a context variable; code at the
+expensive boundaries (Mongo, Gemini, Fireworks, Cloudinary, serialization)
+wraps its work in `span(name)` or `@traced(name)`. Span time is summed per
+name, returned to the client in a `Server-Timing` header and recorded in
+the `span_duration_seconds` histogram. Outside a request, spans only
+record the histogram.
+"""
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, List, Optional
+
+from core import metrics
+
+SPAN_LATENCY = metrics.REGISTRY.histogram(
+    "span_duration_seconds", "Time spent in instrumented boundaries (db, model, CDN, serialization).",
+    ("span",),
+)
+
+
+class Trace:
+    def __init__(self):
+        # name -> [total seconds, count]; insertion order is first-seen order
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def server_timing(self, total_seconds: Optional[float] = None) -> str:
+        """
+        Renders the spans as a Server-Timing header value (durations in ms).
+        """
+        parts = [
+            f'{name};dur={seconds * 1000:.2f};desc="{int(count)}x"'
+            for name, (seconds, count) in self.spans.items()
+        ]
+        if total_seconds is not None:
+            parts.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(parts)
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def start_trace() -> Token:
+    return _current_trace.set(Trace())
+
+
+def end_trace(token: Token) -> Trace:
+    trace = _current_trace.get()
+    _current_trace.reset(token)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def record(name: str, seconds: float) -> None:
+    SPAN_LATENCY.observe(seconds, (name,))
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    """
+    Times the enclosed block as span `name`. Works in sync and async code.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def traced(name: str):
+    """
+    Decorator form of `span` for sync and async functions.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
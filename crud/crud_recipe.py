@@ -1,20 +1,38 @@
 # stir-backend/crud/crud_recipe.py
 
-from db.mongodb import db
-from typing import List
+import asyncio
+import inspect
+from core.tracing import traced
+from db.mongodb import db, read_db
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import ReturnDocument
+from utils.ingredient_stats import STATS_COLLECTION, StatsDelta
+from utils.ingredients import CANONICAL_FIELD, canonicalize_ingredients
 
+# Read-only queries use `read_db` (secondaryPreferred, bounded staleness);
+# writes and freshness checks such as get_corpus_version use the primary.
 COLLECTION_NAME = "recipes"
+CORPUS_META_COLLECTION = "corpus_meta"
+NEIGHBORS_COLLECTION = "recipe_neighbors"
+# Set (server time, via $currentDate) by every writer of a recipe; the
+# invalidation poller watches it on servers without change streams
+UPDATED_AT_FIELD = "updated_at"
 
 
-async def get_recipes(skip: int = 0, limit: int = 100) -> List[dict]:
+@traced("mongo")
+async def get_recipes(skip: int = 0, limit: int = 100, diet_query: Optional[dict] = None) -> List[dict]:
     """
-    Retrieves a list of recipes with pagination.
+    Retrieves a list of recipes with pagination in _id order (the order the
+    corpus snapshot pages in), optionally restricted by a dietary filter
+    (utils.dietary.DietFilter.to_query()).
     """
-    cursor = db[COLLECTION_NAME].find({}, skip=skip, limit=limit)
+    cursor = read_db[COLLECTION_NAME].find(diet_query or {}, skip=skip, limit=limit).sort("_id", 1)
     return await cursor.to_list(length=limit)
 
 
+@traced("mongo")
 async def get_recipe_by_id(recipe_id: str) -> dict:
     """
     Finds a single recipe by its unique ID.
@@ -26,34 +44,303 @@ async def get_recipe_by_id(recipe_id: str) -> dict:
         # If the ID is not valid, it cannot be in the database.
         return None
 
-    return await db[COLLECTION_NAME].find_one({"_id": obj_id})
+    return await read_db[COLLECTION_NAME].find_one({"_id": obj_id})
 
 
-async def find_recipes_by_ingredients(ingredients: List[str], limit: int = 50) -> List[dict]:
+@traced("mongo")
+async def get_recipes_by_ids(recipe_ids: Sequence[str]) -> Dict[str, dict]:
     """
-    Finds recipes by searching for each ingredient as a substring
-    within the 'CleanedIngredients' array.
+    Fetches many recipes with a single `$in` query.
+    Returns a mapping of string ID -> document; invalid or unknown IDs are absent.
+    """
+    obj_ids = [ObjectId(recipe_id) for recipe_id in recipe_ids if ObjectId.is_valid(recipe_id)]
+    if not obj_ids:
+        return {}
+
+    cursor = read_db[COLLECTION_NAME].find({"_id": {"$in": obj_ids}})
+    return {str(doc["_id"]): doc async for doc in cursor}
+
+
+@traced("mongo")
+async def find_recipes_by_ingredients(
+    ingredients: List[str],
+    limit: int = 50,
+    diet_query: Optional[dict] = None,
+    order_terms: Optional[Callable[[List[str]], List[str]]] = None,
+) -> List[dict]:
+    """
+    Finds recipes that use all of the given ingredients.
+
+    The search terms are canonicalized the same way as stored recipes, so
+    "Eggs" matches a recipe listing "2 large eggs, beaten". The lookup is an
+    exact `$all` match on the indexed 'ingredients_canonical' array.
 
     Args:
         ingredients: A list of ingredient strings to search for.
         limit: The maximum number of recipes to return.
+        diet_query: Optional dietary filter (DietFilter.to_query()) that
+            matching recipes must also satisfy.
+        order_terms: Optional reordering of the canonical terms. The
+            server bounds the index scan by the first `$all` term, so
+            putting the rarest ingredient first scans the fewest keys.
 
     Returns:
         A list of matching recipe documents from the database.
     """
-    if not ingredients:
+    terms = canonicalize_ingredients(ingredients)
+    if not terms:
         return []
+    if order_terms is not None:
+        terms = order_terms(terms)
+
+    query = {CANONICAL_FIELD: {"$all": terms}, **(diet_query or {})}
+
+    cursor = read_db[COLLECTION_NAME].find(query).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+@traced("mongo")
+async def find_ingredient_lists_using_any(terms: List[str], limit: int) -> List[Tuple[str, List[str]]]:
+    """
+    (string ID, canonical ingredients) of up to `limit` recipes using at
+    least one of the canonical `terms`; an indexed `$in` lookup.
+    """
+    cursor = read_db[COLLECTION_NAME].find({CANONICAL_FIELD: {"$in": terms}}, {CANONICAL_FIELD: 1}).limit(limit)
+    return [(str(doc["_id"]), doc.get(CANONICAL_FIELD) or []) async for doc in cursor]
+
+
+@traced("mongo")
+async def upsert_recipe(query: dict, doc: dict) -> Optional[dict]:
+    """
+    Inserts or replaces the fields of the recipe matching `query`, stamping
+    updated_at. Returns the recipe's previous canonical ingredients document
+    ({"_id", CANONICAL_FIELD}), or None if it was inserted.
+    """
+    return await db[COLLECTION_NAME].find_one_and_update(
+        query,
+        {"$set": doc, "$currentDate": {UPDATED_AT_FIELD: True}},
+        upsert=True,
+        projection={CANONICAL_FIELD: 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+
+
+async def iter_recipes(
+    ingredients: Optional[List[str]] = None,
+    diet_query: Optional[dict] = None,
+    projection: Optional[dict] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[dict]:
+    """
+    Streams recipes in _id order without materialising the result set: the
+    cursor fetches `batch_size` documents per round trip, and the next batch
+    is only requested once the caller has consumed the previous one.
+    Optionally restricted to recipes using all `ingredients` (canonicalized,
+    as in find_recipes_by_ingredients) and matching a dietary filter.
+    """
+    query = dict(diet_query or {})
+    if ingredients:
+        terms = canonicalize_ingredients(ingredients)
+        if not terms:
+            return
+        query[CANONICAL_FIELD] = {"$all": terms}
+
+    cursor = read_db[COLLECTION_NAME].find(query, projection).sort("_id", 1).batch_size(batch_size)
+    try:
+        async for doc in cursor:
+            yield doc
+    finally:
+        # Release the server-side cursor if the consumer stops early
+        closed = cursor.close()
+        if inspect.isawaitable(closed):
+            await closed
+
 
-    # Build a list of query conditions, one for each ingredient.
-    # Each condition checks if the ingredient exists as a case-insensitive
-    # substring anywhere in the CleanedIngredients array.
-    query_conditions = [
-        {"CleanedIngredients": {"$regex": ingredient.strip(), "$options": "i"}}
-        for ingredient in ingredients
+@traced("mongo")
+async def get_ingredient_frequencies() -> Dict[str, int]:
+    """
+    Counts how many recipes use each distinct ingredient name. Canonical
+    names are used when a recipe has them, so suggestions are valid search
+    terms; otherwise both the 'ingredients_cleaned' (importer) and
+    'CleanedIngredients' (migration) fields are used. Names are lower-cased
+    and trimmed.
+    """
+    pipeline = [
+        {"$project": {"names": {"$ifNull": [f"${CANONICAL_FIELD}", {"$setUnion": [
+            {"$ifNull": ["$ingredients_cleaned", []]},
+            {"$ifNull": ["$CleanedIngredients", []]},
+        ]}]}}},
+        {"$unwind": "$names"},
+        {"$group": {"_id": "$names", "count": {"$sum": 1}}},
     ]
 
-    # Use the $and operator to ensure all conditions are met in a document.
-    query = {"$and": query_conditions}
+    # Case/whitespace variants are merged here rather than in the pipeline;
+    # there are only as many rows as distinct names
+    frequencies = {}
+    async for row in read_db[COLLECTION_NAME].aggregate(pipeline, allowDiskUse=True):
+        name = str(row["_id"] or "").strip().lower()
+        if name:
+            frequencies[name] = frequencies.get(name, 0) + row["count"]
+    return frequencies
+
+
+@traced("mongo")
+async def get_corpus_version(collection: str = COLLECTION_NAME):
+    """
+    Returns the timestamp of the last import/migration that rewrote the
+    recipes collection (or another collection derived from it), or None if
+    it has never been recorded.
+    """
+    meta = await db[CORPUS_META_COLLECTION].find_one({"_id": collection})
+    return meta.get("updated_at") if meta else None
+
+
+@traced("mongo")
+async def mark_corpus_updated(collection: str = COLLECTION_NAME) -> None:
+    """
+    Records that the recipes collection (or another collection derived
+    from it) was rewritten, so in-memory structures derived from it know
+    to rebuild.
+    """
+    await db[CORPUS_META_COLLECTION].update_one(
+        {"_id": collection},
+        {"$set": {"updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+
+
+@traced("mongo")
+async def mark_ingredient_stats_built() -> None:
+    """
+    Records a full rebuild of the ingredient statistics. Until one has run,
+    the stats collection only holds the increments of writes made since it
+    was introduced, so readers must not trust it.
+    """
+    now = datetime.now(timezone.utc)
+    await db[CORPUS_META_COLLECTION].update_one(
+        {"_id": STATS_COLLECTION},
+        {"$set": {"updated_at": now, "built_at": now}},
+        upsert=True,
+    )
 
-    cursor = db[COLLECTION_NAME].find(query).limit(limit)
-    return await cursor.to_list(length=limit)
\ No newline at end of file
+
+@traced("mongo")
+async def ingredient_stats_built() -> bool:
+    meta = await db[CORPUS_META_COLLECTION].find_one({"_id": STATS_COLLECTION})
+    return bool(meta and meta.get("built_at"))
+
+
+@traced("mongo")
+async def get_ingredient_lists() -> Tuple[List[str], List[List[str]]]:
+    """
+    Streams the canonical ingredient list of every recipe.
+    Returns parallel lists of string IDs and ingredient lists.
+    """
+    recipe_ids, ingredient_lists = [], []
+    async for doc in read_db[COLLECTION_NAME].find({}, {CANONICAL_FIELD: 1}).batch_size(5000):
+        recipe_ids.append(str(doc["_id"]))
+        ingredient_lists.append(doc.get(CANONICAL_FIELD) or [])
+    return recipe_ids, ingredient_lists
+
+
+@traced("mongo")
+async def get_ingredient_stats() -> List[dict]:
+    """
+    Every document of the materialized ingredient statistics collection
+    (see utils/ingredient_stats.py).
+    """
+    return await read_db[STATS_COLLECTION].find({}).to_list(length=None)
+
+
+@traced("mongo")
+async def apply_ingredient_stats(delta: StatsDelta) -> None:
+    """
+    Applies the count changes of a batch of recipe writes with `$inc`.
+    """
+    operations = delta.updates()
+    if operations:
+        await db[STATS_COLLECTION].bulk_write(operations, ordered=False)
+
+
+@traced("mongo")
+async def replace_ingredient_stats(documents: List[dict], batch_size: int = 1000) -> None:
+    """
+    Swaps in a fully rebuilt statistics collection. Documents are written to
+    a staging collection that is then renamed over the live one, so readers
+    never see a partial rebuild.
+
+    `$inc` updates that writers apply to the live collection between the
+    recompute and the rename are lost with it; rebuild while no importer or
+    migration is running (see scripts/rebuild_ingredient_stats.py).
+    """
+    staging = db[f"{STATS_COLLECTION}_rebuild"]
+    await staging.drop()
+    for start in range(0, len(documents), batch_size):
+        await staging.insert_many(documents[start:start + batch_size], ordered=False)
+    if documents:
+        await staging.rename(STATS_COLLECTION, dropTarget=True)
+    else:
+        await db[STATS_COLLECTION].delete_many({})
+
+
+@traced("mongo")
+async def get_precomputed_neighbors(recipe_id: str) -> Optional[List[dict]]:
+    """
+    Returns the persisted neighbour list ([{"_id", "score"}, ...]) for a
+    recipe, or None if neighbours have not been precomputed for it or are
+    outdated: built from an older corpus version (before a re-import or
+    migration), or before the latest per-recipe write.
+    """
+    if not ObjectId.is_valid(recipe_id):
+        return None
+    doc, corpus_version, latest_write = await asyncio.gather(
+        read_db[NEIGHBORS_COLLECTION].find_one({"_id": ObjectId(recipe_id)}),
+        get_corpus_version(),
+        get_latest_recipe_write(),
+    )
+    if doc is None or doc.get("corpus_version") != corpus_version:
+        return None
+    built_after = doc.get("recipes_updated_at")
+    if latest_write is not None and (built_after is None or latest_write > built_after):
+        return None
+    return doc["neighbors"]
+
+
+@traced("mongo")
+async def get_recipes_updated_since(since: Optional[datetime], limit: int = 1000) -> List[Tuple[str, datetime]]:
+    """
+    (string ID, updated_at) of recipes written at or after `since`, oldest
+    first. With `since` None, returns only the most recent write, to seed
+    the poller's watermark.
+    """
+    if since is None:
+        cursor = db[COLLECTION_NAME].find(
+            {UPDATED_AT_FIELD: {"$exists": True}}, {UPDATED_AT_FIELD: 1}
+        ).sort(UPDATED_AT_FIELD, -1).limit(1)
+    else:
+        cursor = db[COLLECTION_NAME].find(
+            {UPDATED_AT_FIELD: {"$gte": since}}, {UPDATED_AT_FIELD: 1}
+        ).sort(UPDATED_AT_FIELD, 1).limit(limit)
+    return [(str(doc["_id"]), doc[UPDATED_AT_FIELD]) async for doc in cursor]
+
+
+async def get_latest_recipe_write() -> Optional[datetime]:
+    """
+    `updated_at` of the most recent per-recipe write, or None if no recipe
+    has been stamped.
+    """
+    latest = await get_recipes_updated_since(None)
+    return latest[0][1] if latest else None
+
+
+def watch_recipe_changes(resume_after: Optional[dict] = None, max_await_time_ms: Optional[int] = None):
+    """
+    Opens a change stream on the recipes collection (replica sets and
+    sharded clusters only). Only the document key of each change is needed,
+    so full documents are not requested.
+    """
+    return db[COLLECTION_NAME].watch(
+        pipeline=[{"$project": {"operationType": 1, "documentKey": 1}}],
+        resume_after=resume_after,
+        max_await_time_ms=max_await_time_ms,
+    )
@@ -1,10 +1,45 @@
 # stir-backend/app/db/mongodb.py
 
 import motor.motor_asyncio
+from pymongo.read_preferences import SecondaryPreferred
+
 from core.config import settings
+from db.monitoring import CommandMetricsListener, PoolMetricsListener
+
+
+def _client_options() -> dict:
+    """
+    Pool, compression and timeout options that are set in Settings. Unset
+    ones are not passed, so options in MONGO_URI (or the driver defaults)
+    apply.
+    """
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+        "compressors": settings.MONGO_COMPRESSORS,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
 
 # The MongoDB client is created once and shared
-client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
+client = motor.motor_asyncio.AsyncIOMotorClient(
+    settings.MONGO_URI,
+    event_listeners=[PoolMetricsListener(), CommandMetricsListener(settings.MONGO_SLOW_COMMAND_MS)],
+    **_client_options(),
+)
+
+# get_default_database() will use the database specified in your MONGO_URI.
+# Writes and read-your-own-write lookups go to the primary.
+db = client.get_default_database()
 
-# get_default_database() will use the database specified in your MONGO_URI
-db = client.get_default_database()
\ No newline at end of file
+# Heavy read-only traffic (lists, search, index builds) prefers secondaries,
+# but never one lagging more than MONGO_READ_MAX_STALENESS_SECONDS behind.
+# On a standalone server this behaves exactly like `db`.
+read_db = client.get_default_database(
+    read_preference=SecondaryPreferred(max_staleness=settings.MONGO_READ_MAX_STALENESS_SECONDS)
+)
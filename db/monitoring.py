@@ -0,0 +1,114 @@
+# stir-backend/app/db/monitoring.py
+
+"""
+PyMongo event listeners that feed connection-pool and command metrics into
+core.metrics: checkout wait time, connections in use / open per server,
+checkout failures, per-command latency and slow commands.
+
+Listeners run on PyMongo's threads; the metric types are thread-safe.
+"""
+
+import logging
+
+from pymongo import monitoring
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+POOL_CHECKOUT_WAIT = metrics.REGISTRY.histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the pool.",
+    ("address",),
+)
+POOL_IN_USE = metrics.REGISTRY.gauge(
+    "mongo_pool_connections_in_use", "Connections currently checked out of the pool.", ("address",),
+)
+POOL_OPEN = metrics.REGISTRY.gauge(
+    "mongo_pool_connections_open", "Connections currently open (idle or in use).", ("address",),
+)
+POOL_CHECKOUT_FAILURES = metrics.REGISTRY.counter(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts by reason.", ("address", "reason"),
+)
+COMMAND_LATENCY = metrics.REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by command name.", ("command",),
+)
+SLOW_COMMANDS = metrics.REGISTRY.counter(
+    "mongo_slow_commands_total", "Commands slower than MONGO_SLOW_COMMAND_MS.", ("command",),
+)
+COMMAND_FAILURES = metrics.REGISTRY.counter(
+    "mongo_command_failures_total", "Failed MongoDB commands by command name.", ("command",),
+)
+
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        POOL_IN_USE.set(0, (_address(event.address),))
+
+    def pool_closed(self, event):
+        POOL_IN_USE.set(0, (_address(event.address),))
+        POOL_OPEN.set(0, (_address(event.address),))
+
+    def connection_created(self, event):
+        POOL_OPEN.inc((_address(event.address),))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        POOL_OPEN.dec((_address(event.address),))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        address = _address(event.address)
+        POOL_CHECKOUT_FAILURES.inc((address, str(event.reason)))
+        if event.duration is not None:
+            POOL_CHECKOUT_WAIT.observe(event.duration, (address,))
+
+    def connection_checked_out(self, event):
+        address = _address(event.address)
+        POOL_IN_USE.inc((address,))
+        if event.duration is not None:
+            POOL_CHECKOUT_WAIT.observe(event.duration, (address,))
+
+    def connection_checked_in(self, event):
+        POOL_IN_USE.dec((_address(event.address),))
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    def __init__(self, slow_command_ms: int):
+        self._slow_seconds = slow_command_ms / 1000
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1e6
+        COMMAND_LATENCY.observe(seconds, (event.command_name,))
+        if seconds >= self._slow_seconds:
+            SLOW_COMMANDS.inc((event.command_name,))
+            logger.warning(
+                "slow mongo command",
+                extra={
+                    "command": event.command_name,
+                    "database": event.database_name,
+                    "duration_ms": round(seconds * 1000, 3),
+                    "server": _address(event.connection_id),
+                },
+            )
+
+    def failed(self, event):
+        COMMAND_LATENCY.observe(event.duration_micros / 1e6, (event.command_name,))
+        COMMAND_FAILURES.inc((event.command_name,))
@@ -16,16 +16,21 @@ import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Optional, Dict
+from datetime import datetime, timezone
 import time
 import urllib3
 
 import pandas as pd
 from tqdm import tqdm
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
 import cloudinary
 import cloudinary.uploader
 
+from utils.dietary import DIET_FLAGS_FIELD, with_diet_flags
+from utils.ingredient_stats import STATS_COLLECTION, StatsDelta
+from utils.ingredients import CANONICAL_FIELD, canonicalize_ingredients
+
 # ---- Logging ----
 logging.basicConfig(
     level=logging.INFO,
@@ -64,6 +69,8 @@ cloudinary.config(
 mongo_client = MongoClient(MONGO_URI)
 db = mongo_client.get_default_database()
 recipes_col = db.get_collection("recipes")
+corpus_meta_col = db.get_collection("corpus_meta")
+ingredient_stats_col = db.get_collection(STATS_COLLECTION)
 
 # ---- Helpers ----
 def normalize_public_id(image_name: str) -> str:
@@ -103,10 +110,13 @@ def make_doc(row: pd.Series, image_meta: Optional[Dict]) -> Dict:
     else:
         cleaned_list = []
 
+    canonical = canonicalize_ingredients(cleaned_raw or row.get("Ingredients"))
     doc = {
         "title": row.get("Title") or "",
         "ingredients_raw": row.get("Ingredients") or "",
         "ingredients_cleaned": cleaned_list,
+        # Canonical names for exact, indexed ingredient search
+        CANONICAL_FIELD: canonical,
         "instructions": row.get("Instructions") or "",
         "source_meta": {
             "image_name": row.get("Image_Name") or ""
@@ -153,8 +163,19 @@ def process_row(row: pd.Series, image_dir: Path, force: bool = False) -> Dict:
 
         doc = make_doc(row, image_meta)
         filter_q = {"source_meta.image_name": img_name} if img_name else {"title": doc["title"]}
-        update = {"$set": doc}
-        recipes_col.update_one(filter_q, update, upsert=True)
+        # updated_at (server time) lets running API workers pick up the change
+        update = {"$set": doc, "$currentDate": {"updated_at": True}}
+        # Dietary/allergen bitmask for filtered listings (unset if nothing was recognised)
+        with_diet_flags(update, doc[CANONICAL_FIELD])
+        previous = recipes_col.find_one_and_update(
+            filter_q, update, upsert=True, projection={CANONICAL_FIELD: 1}, return_document=ReturnDocument.BEFORE,
+        )
+        # Keep the materialized ingredient statistics in step ($inc on the difference)
+        delta = StatsDelta()
+        delta.add((previous or {}).get(CANONICAL_FIELD), doc[CANONICAL_FIELD])
+        operations = delta.updates()
+        if operations:
+            ingredient_stats_col.bulk_write(operations, ordered=False)
         return {"status": "ok", "title": title, "image": img_name}
     except Exception as e:
         logger.exception(f"Exception processing {title} / {img_name}")
@@ -172,6 +193,10 @@ def main(args):
         logger.error(f"Image directory not found: {image_dir}")
         return
 
+    recipes_col.create_index(CANONICAL_FIELD)
+    recipes_col.create_index("updated_at")
+    recipes_col.create_index(DIET_FLAGS_FIELD)
+
     logger.info(f"Loading CSV: {csv_path}")
     # safe read: explicit encoding and dtype to avoid surprises
     df = pd.read_csv(csv_path, dtype=str, encoding='utf-8', keep_default_na=False)
@@ -223,6 +248,14 @@ def main(args):
 
     logger.info(f"Finished. inserted/updated: {processed}, skipped: {skipped}, failures: {len(failures)}")
 
+    # Tell running API workers that in-memory indexes (e.g. autocomplete) are stale
+    if processed:
+        corpus_meta_col.update_one(
+            {"_id": "recipes"},
+            {"$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+
     if failures:
         import csv
         out = Path("import_failures.csv")
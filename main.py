@@ -1,19 +1,20 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
-import sys
 from api.api import api_router  # Correct absolute import from project root
-import time
-
-# Configure logging with explicit handlers
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ],
-    force=True  # Force reconfiguration to override uvicorn's logging
+from api.middleware import log_requests
+from core import metrics
+from core.config import settings
+from core.logging_config import configure_logging
+from services import (
+    corpus_snapshot, hybrid_generation, ingredient_index, ingredient_stats, invalidation, recipe_cache, similarity,
 )
+from services.registry import registry
+import asyncio
+
+# Structured JSON logs, written to stdout by a background thread
+configure_logging(logging.INFO)
 
 app = FastAPI(title="Stir Recipe API")
 
@@ -26,20 +27,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add middleware to log all requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    print(f"🌐 REQUEST: {request.method} {request.url.path}")
-    logging.info(f"🌐 REQUEST: {request.method} {request.url.path}")
-
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-
-    print(f"✅ RESPONSE: Status {response.status_code} - Took {process_time:.2f}s")
-    logging.info(f"✅ RESPONSE: Status {response.status_code} - Took {process_time:.2f}s")
-
-    return response
+# Add middleware to log all requests and record per-route metrics
+app.middleware("http")(log_requests)
 
 app.include_router(api_router, prefix="/api/v1")
 
@@ -47,8 +36,110 @@ app.include_router(api_router, prefix="/api/v1")
 def read_root():
     return {"message": "Welcome to the Stir Recipe API"}
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    """
+    Prometheus text exposition of this worker's metrics.
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 @app.on_event("startup")
 async def startup_event():
     logging.info("🚀 Application starting up - Logging is configured!")
-    print("🔥 PRINT TEST: If you see this, print statements work!")
     logging.info("✅ LOGGING TEST: If you see this, logging works!")
+
+    # Map the shared corpus snapshot, if one is configured
+    try:
+        corpus_snapshot.load(settings.CORPUS_SNAPSHOT_PATH)
+    except Exception:
+        logging.exception("Could not map corpus snapshot at startup")
+
+    # Build in-memory indexes; a failure here should not stop the API
+    try:
+        await ingredient_index.rebuild()
+    except Exception:
+        logging.exception("Could not build ingredient index at startup")
+    try:
+        await similarity.rebuild(settings.SIMILARITY_WEIGHTING)
+    except Exception:
+        logging.exception("Could not build similarity index at startup")
+    try:
+        await ingredient_stats.rebuild()
+    except Exception:
+        logging.exception("Could not load ingredient statistics at startup")
+
+    # Workers that serve generation traffic can pay the SDK import cost up
+    # front instead of on their first request
+    if settings.PRELOAD_SERVICES:
+        names = [name.strip() for name in settings.PRELOAD_SERVICES.split(",") if name.strip()]
+        try:
+            await asyncio.to_thread(registry.preload, names)
+        except Exception:
+            logging.exception("Could not preload service clients")
+
+    # Keep references so the tasks are not garbage collected
+    app.state.index_refresh_task = asyncio.create_task(refresh_derived_indexes())
+
+    # Per-recipe invalidation of cached/derived data as recipes are written
+    app.state.debounced_tasks = subscribe_invalidation_consumers()
+    app.state.invalidation_task = asyncio.create_task(invalidation.run(
+        settings.INVALIDATION_MODE,
+        poll_interval=settings.INVALIDATION_POLL_INTERVAL_SECONDS,
+        batch_window=settings.INVALIDATION_BATCH_WINDOW_SECONDS,
+    ))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Stop the follower first so it cannot schedule more rebuilds
+    tasks = [getattr(app.state, name, None) for name in ("invalidation_task", "index_refresh_task")]
+    tasks = [task for task in tasks if task is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for debounced in getattr(app.state, "debounced_tasks", []):
+        await debounced.cancel()
+    # Let generated recipes already being stored finish
+    await hybrid_generation.drain_persist_tasks()
+
+
+def subscribe_invalidation_consumers():
+    """
+    Registers the invalidation consumers; returns the debounced rebuilds so
+    shutdown can cancel their pending runs.
+    """
+    bus = invalidation.bus
+    # Startup can run more than once in one process (benchmarks, reloads)
+    for name in ("recipe_cache", "corpus_snapshot", "ingredient_index", "ingredient_stats", "similarity"):
+        bus.unsubscribe(name)
+    bus.subscribe("recipe_cache", recipe_cache.on_invalidation)
+    bus.subscribe("corpus_snapshot", corpus_snapshot.on_invalidation)
+    # Frequency and vector indexes are rebuilt, once writes have settled
+    debounced = [
+        invalidation.DebouncedTask("ingredient_index", ingredient_index.rebuild, settings.INDEX_REBUILD_DELAY_SECONDS),
+        # Writers update the stats collection themselves; reload the mirror from it
+        invalidation.DebouncedTask("ingredient_stats", ingredient_stats.rebuild, settings.INDEX_REBUILD_DELAY_SECONDS),
+        invalidation.DebouncedTask(
+            "similarity", lambda: similarity.rebuild(settings.SIMILARITY_WEIGHTING),
+            settings.INDEX_REBUILD_DELAY_SECONDS,
+        ),
+    ]
+    for task in debounced:
+        bus.subscribe(task.name, task)
+    return debounced
+
+
+async def refresh_derived_indexes():
+    """
+    Background task that rebuilds in-memory indexes after a re-import.
+    """
+    while True:
+        await asyncio.sleep(settings.CORPUS_REFRESH_INTERVAL_SECONDS)
+        try:
+            corpus_snapshot.refresh_if_stale(settings.CORPUS_SNAPSHOT_PATH)
+            await ingredient_index.refresh_if_stale()
+            await similarity.refresh_if_stale(settings.SIMILARITY_WEIGHTING)
+            await ingredient_stats.refresh_if_stale()
+            await recipe_cache.refresh_if_stale()
+        except Exception:
+            logging.exception("Failed to refresh in-memory indexes")
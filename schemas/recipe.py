@@ -1,9 +1,15 @@
 # stir-backend/app/schemas/recipe.py
 
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, computed_field
+from typing import Dict, List, Optional
+from utils.images import image_variants
 from .common import MongoBaseModel
 
+class ImageVariant(BaseModel):
+    url: str
+    width: int
+    height: Optional[int] = None
+
 class ImageMeta(BaseModel):
     url: str
     public_id: str
@@ -11,6 +17,17 @@ class ImageMeta(BaseModel):
     height: int
     format: str
 
+    @computed_field
+    @property
+    def variants(self) -> Optional[Dict[str, ImageVariant]]:
+        # Derived from public_id on every response; see utils/images.py
+        variants = image_variants({
+            "url": self.url, "public_id": self.public_id, "width": self.width, "height": self.height,
+        })
+        if variants is None:
+            return None
+        return {name: ImageVariant(**variant) for name, variant in variants.items()}
+
 class Recipe(MongoBaseModel):
     title: str
     ingredients_cleaned: List[str]
@@ -18,4 +35,36 @@ class Recipe(MongoBaseModel):
     image: Optional[ImageMeta] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SimilarRecipe(Recipe):
+    score: float
+
+
+class RecipeBatchRequest(BaseModel):
+    ids: List[str]
+
+
+class RecipeBatchItem(BaseModel):
+    id: str
+    # None when the recipe could not be returned; `error` says why
+    recipe: Optional[Recipe] = None
+    error: Optional[str] = None  # "not_found" or "invalid_id"
+
+
+class IngredientSuggestion(BaseModel):
+    name: str
+    count: int
+
+
+class IngredientStat(BaseModel):
+    name: str
+    # Recipes using the ingredient (with `name`, for co-occurring ingredients)
+    count: int
+
+
+class IngredientStatsDetail(BaseModel):
+    name: str
+    count: int
+    # Ingredients most often used together with this one
+    related: List[IngredientStat]
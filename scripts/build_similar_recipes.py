@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import logging
+import sys
+import os
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import db
+from crud.crud_recipe import NEIGHBORS_COLLECTION, get_corpus_version, get_latest_recipe_write
+from services.similarity import build_index
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+BATCH_SIZE = 500
+
+
+async def build_similar_recipes(k: int, weighting: str):
+    """
+    Builds the similarity index and persists the top-k neighbour list of
+    every recipe into the 'recipe_neighbors' collection, so the
+    /recipes/{id}/similar endpoint becomes a single primary-key lookup.
+    Lists are stamped with the corpus version and the latest recipe write
+    they were built from; the endpoint ignores them once the corpus is
+    re-imported or migrated, or a recipe is written.
+    """
+    started = time.perf_counter()
+    # Read before the index so a write during the build leaves the lists outdated
+    corpus_version = await get_corpus_version()
+    recipes_updated_at = await get_latest_recipe_write()
+    index = await build_index(weighting)
+    logging.info(
+        f"Built index for {len(index)} recipes / {index.vocabulary_size} ingredients "
+        f"in {time.perf_counter() - started:.2f}s ({index.nbytes / 1024 / 1024:.1f} MiB)."
+    )
+
+    collection = db[NEIGHBORS_COLLECTION]
+    built_at = datetime.now(timezone.utc)
+    processed_count = 0
+    batch = []
+    for recipe_id, neighbors in index.all_neighbors(k):
+        batch.append(ReplaceOne(
+            {"_id": ObjectId(recipe_id)},
+            {
+                "neighbors": [{"_id": ObjectId(n_id), "score": round(score, 6)} for n_id, score in neighbors],
+                "weighting": weighting,
+                "built_at": built_at,
+                "corpus_version": corpus_version,
+                "recipes_updated_at": recipes_updated_at,
+            },
+            upsert=True,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            processed_count += len(batch)
+            batch = []
+            logging.info(f"Stored neighbours for {processed_count}/{len(index)} recipes.")
+
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        processed_count += len(batch)
+
+    # Drop neighbour lists for recipes that no longer exist
+    await collection.delete_many({"built_at": {"$lt": built_at}})
+    logging.info(f"Finished in {time.perf_counter() - started:.2f}s. Recipes with neighbours: {processed_count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute similar-recipe neighbour lists")
+    parser.add_argument("--k", type=int, default=20, help="Neighbours to store per recipe")
+    parser.add_argument("--weighting", choices=["tfidf", "binary"], default="tfidf")
+    args = parser.parse_args()
+    asyncio.run(build_similar_recipes(args.k, args.weighting))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+canonical_recall_report.py
+
+Measures how many relevant Epicurious recipes an exact ingredient match
+finds before and after canonicalization.
+
+  * truth   - recipes whose raw 'Ingredients' text mentions the query as a
+              whole word (singular or plural), i.e. what a regex scan finds
+  * before  - exact match against the comma-split 'Cleaned_Ingredients'
+              list, which is what `make_doc` stored until now
+  * after   - exact match against `canonicalize_ingredients` output
+
+Usage:
+    python scripts/canonical_recall_report.py
+    python scripts/canonical_recall_report.py --csv data.csv --queries egg garlic "olive oil"
+"""
+
+import argparse
+import os
+import re
+import sys
+
+import pandas as pd
+from dotenv import load_dotenv
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ingredients import canonicalize_ingredient, canonicalize_ingredients
+
+load_dotenv()
+
+CSV_PATH = os.getenv("CSV_PATH", "Food Ingredients and Recipe Dataset with Image Name Mapping.csv")
+
+DEFAULT_QUERIES = [
+    "egg", "garlic", "onion", "butter", "olive oil", "salt", "sugar", "flour", "lemon juice",
+    "chicken", "tomato", "parmesan", "cilantro", "scallion", "chickpea", "heavy cream", "ginger",
+    "honey", "rice", "potato",
+]
+
+
+def recall(found: set, truth: set) -> float:
+    return len(found & truth) / len(truth) if truth else 0.0
+
+
+def main(args):
+    df = pd.read_csv(args.csv, dtype=str, encoding="utf-8", keep_default_na=False)
+    print(f"Loaded {len(df)} recipes from {args.csv}\n")
+
+    raw_text = df["Ingredients"].str.lower().tolist()
+    before_lists = [
+        {s.strip().lower() for s in value.split(",") if s.strip()}
+        for value in df["Cleaned_Ingredients"]
+    ]
+    after_lists = [set(canonicalize_ingredients(value)) for value in df["Cleaned_Ingredients"]]
+
+    header = f"{'query':<14} {'truth':>6} {'before':>7} {'after':>7} {'recall before':>14} {'recall after':>13}"
+    print(header)
+    print("-" * len(header))
+
+    totals = {"truth": 0, "before": 0, "after": 0}
+    for query in args.queries:
+        pattern = re.compile(rf"\b{re.escape(query.lower())}(e?s)?\b")
+        canonical_query = canonicalize_ingredient(query)
+
+        truth = {i for i, text in enumerate(raw_text) if pattern.search(text)}
+        before = {i for i, names in enumerate(before_lists) if query.lower() in names}
+        after = {i for i, names in enumerate(after_lists) if canonical_query in names}
+
+        totals["truth"] += len(truth)
+        totals["before"] += len(before & truth)
+        totals["after"] += len(after & truth)
+        print(
+            f"{query:<14} {len(truth):>6} {len(before):>7} {len(after):>7} "
+            f"{recall(before, truth):>14.1%} {recall(after, truth):>13.1%}"
+        )
+
+    if totals["truth"]:
+        print("-" * len(header))
+        print(
+            f"{'overall':<14} {totals['truth']:>6} {'':>7} {'':>7} "
+            f"{totals['before'] / totals['truth']:>14.1%} {totals['after'] / totals['truth']:>13.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingredient match recall before/after canonicalization")
+    parser.add_argument("--csv", default=CSV_PATH, help="Path to the Epicurious CSV (defaults to .env CSV_PATH)")
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES, help="Ingredient queries to evaluate")
+    main(parser.parse_args())
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import sys
+import os
+
+from pymongo import UpdateOne
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import db
+from crud.crud_recipe import UPDATED_AT_FIELD, apply_ingredient_stats, mark_corpus_updated
+from utils.dietary import DIET_FLAGS_FIELD, with_diet_flags
+from utils.ingredient_stats import StatsDelta
+from utils.ingredients import CANONICAL_FIELD, canonical_source, canonicalize_ingredients
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TARGET_COLLECTION = "recipes"
+BATCH_SIZE = 500
+
+
+async def canonicalize_in_place():
+    """
+    Backfills 'ingredients_canonical' and the 'diet_flags' derived from it
+    on every recipe and makes sure both fields are indexed. Safe to re-run
+    after editing the synonym dictionary or the dietary keyword table.
+    """
+    collection = db[TARGET_COLLECTION]
+    total_documents = await collection.count_documents({})
+    logging.info(f"Found {total_documents} documents to process in '{TARGET_COLLECTION}'.")
+
+    projection = {
+        "ingredients_raw": 1, "Ingredients": 1, "CleanedIngredients": 1, "ingredients_cleaned": 1, CANONICAL_FIELD: 1,
+    }
+    processed_count = 0
+    batch = []
+    stats_delta = StatsDelta()
+    async for recipe in collection.find({}, projection):
+        canonical = canonicalize_ingredients(canonical_source(recipe))
+        stats_delta.add(recipe.get(CANONICAL_FIELD), canonical)
+        batch.append(UpdateOne(
+            {"_id": recipe["_id"]},
+            with_diet_flags(
+                {"$set": {CANONICAL_FIELD: canonical}, "$currentDate": {UPDATED_AT_FIELD: True}}, canonical,
+            ),
+        ))
+
+        if len(batch) >= BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            await apply_ingredient_stats(stats_delta)
+            stats_delta.clear()
+            processed_count += len(batch)
+            batch = []
+            logging.info(f"Processed {processed_count}/{total_documents} recipes.")
+
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        await apply_ingredient_stats(stats_delta)
+        processed_count += len(batch)
+
+    await collection.create_index(CANONICAL_FIELD)
+    await collection.create_index(UPDATED_AT_FIELD)
+    await collection.create_index(DIET_FLAGS_FIELD)
+    logging.info(f"Finished processing. Total recipes updated: {processed_count}")
+    if processed_count:
+        await mark_corpus_updated()
+
+
+if __name__ == "__main__":
+    asyncio.run(canonicalize_in_place())
@@ -8,12 +8,18 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.mongodb import db
+from crud.crud_recipe import UPDATED_AT_FIELD, apply_ingredient_stats, mark_corpus_updated
+from utils.dietary import with_diet_flags
 from utils.formatters import clean_recipe_ingredients
+from utils.ingredient_stats import StatsDelta
+from utils.ingredients import CANONICAL_FIELD, canonicalize_ingredients
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 TARGET_COLLECTION = "recipes"
+# Recipes whose ingredient statistics changes are applied together
+STATS_BATCH_SIZE = 500
 
 async def fix_ingredients_data():
     """
@@ -25,6 +31,7 @@ async def fix_ingredients_data():
     logging.info(f"Found {total_documents} documents to process in '{TARGET_COLLECTION}'.")
 
     processed_count = 0
+    stats_delta = StatsDelta()
     async for recipe in collection.find({"ingredients_raw": {"$exists": True}}):
         recipe_id = recipe.get("_id")  # Get ID early for logging
         try:
@@ -44,19 +51,30 @@ async def fix_ingredients_data():
                 continue
 
             cleaned_ingredients = clean_recipe_ingredients(ingredients_list)
+            canonical = canonicalize_ingredients(ingredients_list)
 
             await collection.update_one(
                 {"_id": recipe_id},
-                {"$set": {"ingredients_cleaned": cleaned_ingredients}}
+                with_diet_flags({"$set": {
+                    "ingredients_cleaned": cleaned_ingredients,
+                    CANONICAL_FIELD: canonical,
+                }, "$currentDate": {UPDATED_AT_FIELD: True}}, canonical)
             )
+            stats_delta.add(recipe.get(CANONICAL_FIELD), canonical)
             processed_count += 1
+            if processed_count % STATS_BATCH_SIZE == 0:
+                await apply_ingredient_stats(stats_delta)
+                stats_delta.clear()
             if processed_count % 100 == 0:
                 logging.info(f"Processed {processed_count}/{total_documents} recipes.")
 
         except Exception as e:
             logging.error(f"Failed to process recipe {recipe_id}: {e}")
 
+    await apply_ingredient_stats(stats_delta)
     logging.info(f"Finished processing. Total recipes updated: {processed_count}")
+    if processed_count:
+        await mark_corpus_updated()
 
 
 if __name__ == "__main__":
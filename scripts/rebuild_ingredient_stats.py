@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import sys
+import os
+import time
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crud.crud_recipe import (
+    get_ingredient_lists, get_recipes_updated_since, mark_ingredient_stats_built, replace_ingredient_stats,
+)
+from utils.ingredient_stats import STATS_COLLECTION, compute_stats, stats_documents
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+async def rebuild_ingredient_stats():
+    """
+    Recomputes the 'ingredient_stats' collection from the canonical
+    ingredients of every recipe and swaps it in. Importer and migrations
+    maintain it incrementally; run this after restoring a backup, editing
+    recipes by hand, or to drop counts that reached zero. Run it once after
+    deploying the stats; until then the API computes them from the recipes.
+
+    Writers' increments between the recompute and the swap are lost, so run
+    it while no importer or migration is writing; a warning is logged (and
+    the script should be re-run) if a recipe was written meanwhile.
+    """
+    started = time.perf_counter()
+    last_write = await get_recipes_updated_since(None)
+    recipe_ids, ingredient_lists = await get_ingredient_lists()
+    documents = stats_documents(compute_stats(ingredient_lists))
+    pairs = sum(len(doc["pairs"]) for doc in documents) // 2
+    logging.info(
+        f"Computed stats for {len(documents)} ingredients and {pairs} pairs "
+        f"from {len(recipe_ids)} recipes in {time.perf_counter() - started:.2f}s."
+    )
+
+    await replace_ingredient_stats(documents)
+    # Marks the collection as trustworthy and lets running API workers reload their mirror
+    await mark_ingredient_stats_built()
+    logging.info(f"Replaced '{STATS_COLLECTION}' in {time.perf_counter() - started:.2f}s.")
+
+    if await get_recipes_updated_since(None) != last_write:
+        logging.warning("Recipes were written during the rebuild and their stats updates may be lost; re-run it.")
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_ingredient_stats())
@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import logging
+import sys
+import os
+import time
+
+# Add project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.mongodb import db
+from core.config import settings
+from services.corpus_snapshot import write_snapshot
+from utils.dietary import DIET_FLAGS_FIELD
+from utils.formatters import clean_recipe_ingredients
+from utils.ingredients import CANONICAL_FIELD
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# The formatter logs every recipe at INFO; that is far too chatty for an export
+logging.getLogger("utils.formatters").setLevel(logging.WARNING)
+
+TARGET_COLLECTION = "recipes"
+
+
+async def export_snapshot(path: str):
+    """
+    Exports the recipe corpus to a compact snapshot file that API workers
+    memory-map (see services/corpus_snapshot.py).
+    """
+    started = time.perf_counter()
+    projection = {"title": 1, "ingredients_raw": 1, "instructions": 1, "image": 1,
+                  CANONICAL_FIELD: 1, DIET_FLAGS_FIELD: 1}
+
+    recipes = []
+    async for recipe in db[TARGET_COLLECTION].find({}, projection).batch_size(2000):
+        recipes.append(clean_recipe_ingredients(recipe))
+
+    count = write_snapshot(path, recipes)
+    size_mib = os.path.getsize(path) / 1024 / 1024
+    logging.info(f"Wrote {count} recipes to {path} ({size_mib:.1f} MiB) in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the recipe corpus to a memory-mappable snapshot")
+    parser.add_argument("--out", default=settings.CORPUS_SNAPSHOT_PATH or "corpus.snapshot",
+                        help="Output path (defaults to CORPUS_SNAPSHOT_PATH)")
+    args = parser.parse_args()
+    asyncio.run(export_snapshot(args.out))
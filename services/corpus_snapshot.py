@@ -0,0 +1,341 @@
+# stir-backend/services/corpus_snapshot.py
+
+"""
+Compact, memory-mapped snapshot of the recipe corpus.
+
+The snapshot is one binary file of flat arrays: sorted 12-byte ObjectIds,
+UTF-8 string blobs with offset tables (title, instructions, image fields),
+and CSR-style arrays of interned ingredient ids. Workers map it read-only,
+so the page cache holds a single copy no matter how many uvicorn workers
+run, and start-up is an mmap plus a header parse instead of a full
+collection scan into Python dicts.
+
+Layout:
+    8 bytes   magic  b"STIRSNP1"
+    4 bytes   header length (little-endian uint32)
+    N bytes   JSON header {"count": n, "arrays": {name: [offset, dtype, length]}}
+    ...       arrays, each 8-byte aligned, offsets relative to file start
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from utils.dietary import DIET_FLAGS_FIELD
+from utils.ingredients import CANONICAL_FIELD
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"STIRSNP1"
+_ALIGNMENT = 8
+
+# Per-recipe string fields stored as blob + offsets
+STRING_FIELDS = ("title", "instructions", "image_url", "image_public_id", "image_format")
+
+
+class _StringTableBuilder:
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.offsets: List[int] = [0]
+
+    def add(self, value: Optional[str]) -> None:
+        data = (value or "").encode("utf-8")
+        self.chunks.append(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        return (
+            np.frombuffer(b"".join(self.chunks), dtype=np.uint8),
+            np.asarray(self.offsets, dtype=np.int64),
+        )
+
+
+class _InternedListBuilder:
+    """
+    Interns strings to integer ids and stores one list of ids per recipe.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.vocabulary = _StringTableBuilder()
+        self.indices: List[int] = []
+        self.indptr: List[int] = [0]
+
+    def add(self, values: Iterable[str]) -> None:
+        for value in values:
+            if value not in self.ids:
+                self.ids[value] = len(self.ids)
+                self.vocabulary.add(value)
+            self.indices.append(self.ids[value])
+        self.indptr.append(len(self.indices))
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        blob, offsets = self.vocabulary.arrays()
+        return {
+            f"{prefix}_vocab": blob,
+            f"{prefix}_vocab_offsets": offsets,
+            f"{prefix}_indices": np.asarray(self.indices, dtype=np.uint32),
+            f"{prefix}_indptr": np.asarray(self.indptr, dtype=np.int64),
+        }
+
+
+def write_snapshot(path: str, recipes: Iterable[dict]) -> int:
+    """
+    Writes a snapshot of `recipes` (already cleaned for display, i.e. with
+    'ingredients_cleaned' as the API returns it) to `path`. The file is
+    written to a temporary name and renamed, so readers never observe a
+    partial snapshot. Returns the number of recipes written.
+    """
+    rows = sorted(recipes, key=lambda recipe: ObjectId(recipe["_id"]).binary)
+
+    strings = {field: _StringTableBuilder() for field in STRING_FIELDS}
+    ingredients = _InternedListBuilder()
+    canonical = _InternedListBuilder()
+    image_size = np.full((len(rows), 2), -1, dtype=np.int32)
+    # -1 marks recipes not yet classified; they never match a diet filter
+    diet_flags = np.full(len(rows), -1, dtype=np.int64)
+
+    for i, recipe in enumerate(rows):
+        image = recipe.get("image") or {}
+        strings["title"].add(recipe.get("title"))
+        strings["instructions"].add(recipe.get("instructions"))
+        strings["image_url"].add(image.get("url"))
+        strings["image_public_id"].add(image.get("public_id"))
+        strings["image_format"].add(image.get("format"))
+        if image:
+            image_size[i] = (image.get("width") or 0, image.get("height") or 0)
+        ingredients.add(recipe.get("ingredients_cleaned") or [])
+        canonical.add(recipe.get(CANONICAL_FIELD) or [])
+        if recipe.get(DIET_FLAGS_FIELD) is not None:
+            diet_flags[i] = recipe[DIET_FLAGS_FIELD]
+
+    arrays: Dict[str, np.ndarray] = {
+        "ids": np.frombuffer(b"".join(ObjectId(r["_id"]).binary for r in rows), dtype="S12"),
+        "image_size": image_size,
+        "diet_flags": diet_flags,
+    }
+    for field, builder in strings.items():
+        arrays[field], arrays[f"{field}_offsets"] = builder.arrays()
+    arrays.update(ingredients.arrays("ingredients"))
+    arrays.update(canonical.arrays("canonical"))
+
+    # Lay the arrays out after a header whose size we only know once
+    # offsets are assigned, so reserve generously and pad.
+    header_reserve = 64 * len(arrays) + 256
+    offset = len(MAGIC) + 4 + header_reserve
+    layout = {}
+    for name, array in arrays.items():
+        offset += -offset % _ALIGNMENT
+        layout[name] = [offset, array.dtype.str, array.shape]
+        offset += array.nbytes
+
+    header = json.dumps({"count": len(rows), "arrays": layout}).encode("utf-8")
+    if len(header) > header_reserve:
+        raise RuntimeError("Snapshot header exceeds reserved space")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(MAGIC)
+        fh.write(struct.pack("<I", len(header)))
+        fh.write(header)
+        for name, array in arrays.items():
+            fh.write(b"\0" * (layout[name][0] - fh.tell()))
+            fh.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+class CorpusSnapshot:
+    """
+    Read-only view over a snapshot file. All arrays are zero-copy views of
+    the shared mapping; only the recipes actually served are materialised
+    as Python objects.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.stat(path).st_mtime
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a corpus snapshot")
+        (header_length,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_length])
+
+        self._count = header["count"]
+        self._arrays: Dict[str, np.ndarray] = {}
+        for name, (offset, dtype, shape) in header["arrays"].items():
+            size = int(np.prod(shape)) if shape else 1
+            self._arrays[name] = np.frombuffer(
+                self._mmap, dtype=np.dtype(dtype), count=size, offset=offset
+            ).reshape(shape)
+
+        self._ids = self._arrays["ids"]
+        # Recipes written since the snapshot was taken; lookups skip them so
+        # callers fall through to the cache/Mongo for the current version
+        self.stale_ids: Set[str] = set()
+        # Set by a full invalidation (e.g. a re-import): nothing in the file
+        # can be trusted until a new snapshot is mapped
+        self.superseded = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def has_diet_flags(self) -> bool:
+        # Snapshots written before dietary classification lack the array
+        return "diet_flags" in self._arrays
+
+    def _string(self, field: str, i: int) -> str:
+        offsets = self._arrays[f"{field}_offsets"]
+        return self._arrays[field][offsets[i]:offsets[i + 1]].tobytes().decode("utf-8")
+
+    def _interned(self, prefix: str, i: int) -> List[str]:
+        indptr = self._arrays[f"{prefix}_indptr"]
+        return [
+            self._string(f"{prefix}_vocab", int(term))
+            for term in self._arrays[f"{prefix}_indices"][indptr[i]:indptr[i + 1]]
+        ]
+
+    def position(self, recipe_id: str) -> Optional[int]:
+        """
+        Row of recipe_id in the snapshot (binary search over sorted ids).
+        """
+        if not ObjectId.is_valid(recipe_id):
+            return None
+        key = np.array(ObjectId(recipe_id).binary, dtype="S12")
+        i = int(np.searchsorted(self._ids, key))
+        return i if i < self._count and self._ids[i] == key else None
+
+    def recipe(self, i: int) -> dict:
+        """
+        Materialises row i in the shape of a cleaned recipe document.
+        """
+        doc = {
+            "_id": ObjectId(self._ids[i].tobytes().ljust(12, b"\0")),
+            "title": self._string("title", i),
+            "ingredients_cleaned": self._interned("ingredients", i),
+            CANONICAL_FIELD: self._interned("canonical", i),
+            "instructions": self._string("instructions", i),
+            "image": None,
+        }
+        if self.has_diet_flags and self._arrays["diet_flags"][i] >= 0:
+            doc[DIET_FLAGS_FIELD] = int(self._arrays["diet_flags"][i])
+        width, height = self._arrays["image_size"][i]
+        if width >= 0:
+            doc["image"] = {
+                "url": self._string("image_url", i),
+                "public_id": self._string("image_public_id", i),
+                "width": int(width),
+                "height": int(height),
+                "format": self._string("image_format", i),
+            }
+        return doc
+
+    def get(self, recipe_id: str) -> Optional[dict]:
+        if self.superseded or recipe_id in self.stale_ids:
+            return None
+        i = self.position(recipe_id)
+        return self.recipe(i) if i is not None else None
+
+    def get_many(self, recipe_ids: Sequence[str]) -> Dict[str, dict]:
+        found = {}
+        if self.superseded:
+            return found
+        for recipe_id in recipe_ids:
+            if recipe_id in self.stale_ids:
+                continue
+            i = self.position(recipe_id)
+            if i is not None:
+                found[recipe_id] = self.recipe(i)
+        return found
+
+    def page(self, skip: int = 0, limit: int = 100, diet_filter=None) -> List[dict]:
+        """
+        Recipes in _id order, optionally restricted to those matching a
+        utils.dietary.DietFilter (evaluated as one vectorised pass over the
+        flags array). Requires has_diet_flags when a filter is given.
+        Rows in stale_ids are returned as stored; callers replace them (see
+        is_stale) and must not page from a superseded snapshot.
+        """
+        if diet_filter is None:
+            return [self.recipe(i) for i in range(max(skip, 0), min(skip + limit, self._count))]
+
+        rows = np.flatnonzero(self.diet_mask(diet_filter))
+        return [self.recipe(int(i)) for i in rows[max(skip, 0):max(skip, 0) + limit]]
+
+    def is_stale(self, recipe: dict) -> bool:
+        return str(recipe["_id"]) in self.stale_ids
+
+    def diet_mask(self, diet_filter) -> np.ndarray:
+        """
+        Boolean array marking the rows whose diet_flags match diet_filter.
+        """
+        flags = self._arrays["diet_flags"]
+        mask = flags >= 0
+        if diet_filter.all_clear:
+            mask &= (flags & diet_filter.all_clear) == 0
+        if diet_filter.all_set:
+            mask &= (flags & diet_filter.all_set) == diet_filter.all_set
+        for any_set in diet_filter.any_set:
+            mask &= (flags & any_set) != 0
+        return mask
+
+
+# The snapshot currently served by this worker, if one is configured
+_snapshot: Optional[CorpusSnapshot] = None
+
+
+def get_snapshot() -> Optional[CorpusSnapshot]:
+    return _snapshot
+
+
+def load(path: Optional[str]) -> Optional[CorpusSnapshot]:
+    """
+    Maps the snapshot at `path`, or clears it if the path is unset or missing.
+    """
+    global _snapshot
+
+    if not path or not os.path.exists(path):
+        _snapshot = None
+        return None
+    _snapshot = CorpusSnapshot(path)
+    logger.info(f"Mapped corpus snapshot {path} with {len(_snapshot)} recipes.")
+    return _snapshot
+
+
+def on_invalidation(event) -> None:
+    """
+    services.invalidation consumer: stops serving recipes changed since the
+    snapshot was written. After a full invalidation the snapshot serves
+    nothing (reads go to Mongo) until a new snapshot file is mapped.
+    """
+    if _snapshot is None:
+        return
+    if event.full:
+        if not _snapshot.superseded:
+            logger.info("Corpus changed as a whole; serving from Mongo until a new snapshot is mapped.")
+        _snapshot.superseded = True
+    else:
+        _snapshot.stale_ids.update(event.recipe_ids)
+
+
+def refresh_if_stale(path: Optional[str]) -> bool:
+    """
+    Re-maps the snapshot if the file was replaced since it was loaded.
+    Returns True if the served snapshot changed.
+    """
+    current_mtime = os.stat(path).st_mtime if path and os.path.exists(path) else None
+    loaded_mtime = _snapshot.mtime if _snapshot is not None else None
+    if current_mtime == loaded_mtime:
+        return False
+    load(path)
+    return True
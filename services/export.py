@@ -0,0 +1,175 @@
+# stir-backend/services/export.py
+
+"""
+Streaming bulk export of the recipe corpus as NDJSON or CSV.
+
+Recipes are read from a Motor cursor one batch at a time, encoded, and
+yielded in chunks of roughly EXPORT_CHUNK_BYTES. Starlette awaits each
+send before pulling the next chunk, so a slow client slows the cursor
+down instead of buffering the export in memory: at most one cursor batch
+and one chunk are held per export, whatever its size. With gzip, chunks
+are compressed incrementally with a single zlib stream.
+"""
+
+import csv
+import io
+import zlib
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from api.responses import dumps
+from core import metrics
+from crud import crud_recipe
+from utils.formatters import clean_recipe_ingredients
+from utils.images import image_variants
+
+EXPORTS = metrics.REGISTRY.counter(
+    "recipe_exports_total", "Bulk exports by format and outcome (complete or aborted).", ("format", "outcome"),
+)
+EXPORTED_RECIPES = metrics.REGISTRY.counter(
+    "exported_recipes_total", "Recipes written by bulk exports.", ("format",),
+)
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Exportable fields -> fields to project from Mongo to produce them
+EXPORT_FIELDS: Dict[str, List[str]] = {
+    "_id": ["_id"],
+    "title": ["title"],
+    "ingredients_cleaned": ["title", "ingredients_raw"],
+    "ingredients_canonical": ["ingredients_canonical"],
+    "instructions": ["instructions"],
+    "image": ["image"],
+    "diet_flags": ["diet_flags"],
+}
+# The GET /recipes/ response shape
+DEFAULT_FIELDS = ["_id", "title", "ingredients_cleaned", "instructions", "image"]
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    Comma-separated field names, in the order given. Raises ValueError
+    naming any field that cannot be exported.
+    """
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown export field(s): {', '.join(unknown)}. Use {', '.join(EXPORT_FIELDS)}.")
+    return names or list(DEFAULT_FIELDS)
+
+
+def projection_for(fields: Sequence[str]) -> dict:
+    projection = {"_id": 1 if "_id" in fields else 0}
+    for name in fields:
+        for source in EXPORT_FIELDS[name]:
+            if source != "_id":
+                projection[source] = 1
+    return projection
+
+
+def shape(doc: dict, fields: Sequence[str]) -> dict:
+    """
+    The exported record: requested fields only, in the requested order.
+    """
+    if "ingredients_cleaned" in fields:
+        doc = clean_recipe_ingredients(doc)
+    record = {name: doc.get(name) for name in fields}
+    if record.get("image"):
+        record["image"] = {**record["image"], "variants": image_variants(record["image"])}
+    return record
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode("utf-8")
+    return str(value)
+
+
+class _CSVEncoder:
+    def __init__(self, fields: Sequence[str]):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._fields = fields
+
+    def _take(self) -> bytes:
+        data = self._buffer.getvalue().encode("utf-8")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        self._writer.writerow(self._fields)
+        return self._take()
+
+    def row(self, record: dict) -> bytes:
+        self._writer.writerow([_csv_cell(record[name]) for name in self._fields])
+        return self._take()
+
+
+async def stream_recipes(
+    fmt: str,
+    fields: Sequence[str],
+    ingredients: Optional[List[str]] = None,
+    diet_query: Optional[dict] = None,
+    batch_size: int = 500,
+    chunk_bytes: int = 64 * 1024,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Yields the encoded export in chunks of about `chunk_bytes` (before
+    compression).
+    """
+    csv_encoder = _CSVEncoder(fields) if fmt == "csv" else None
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    pending: List[bytes] = []
+    pending_bytes = 0
+    exported = 0
+    outcome = "aborted"
+
+    def flush() -> bytes:
+        nonlocal pending_bytes
+        data = b"".join(pending)
+        pending.clear()
+        pending_bytes = 0
+        return compressor.compress(data) if compressor else data
+
+    if csv_encoder is not None:
+        pending.append(csv_encoder.header())
+
+    records = crud_recipe.iter_recipes(
+        ingredients=ingredients, diet_query=diet_query, projection=projection_for(fields), batch_size=batch_size,
+    )
+    try:
+        async for doc in records:
+            record = shape(doc, fields)
+            if csv_encoder is not None:
+                line = csv_encoder.row(record)
+            else:
+                line = dumps(record) + b"\n"
+            pending.append(line)
+            pending_bytes += len(line)
+            exported += 1
+            if pending_bytes >= chunk_bytes:
+                chunk = flush()
+                # zlib may hold small inputs back; skip empty chunks
+                if chunk:
+                    yield chunk
+
+        tail = flush()
+        if compressor:
+            tail += compressor.flush()
+        if tail:
+            yield tail
+        outcome = "complete"
+    finally:
+        # Closes the cursor now if the client disconnected mid-export
+        await records.aclose()
+        EXPORTS.inc((fmt, outcome))
+        EXPORTED_RECIPES.inc((fmt,), exported)
+
@@ -0,0 +1,253 @@
+# stir-backend/services/hybrid_generation.py
+
+"""
+Database-first recipe generation.
+
+Before paying for a Gemini call, the submitted ingredients are scored
+against the corpus. A recipe's coverage is
+
+    |shared ingredients| / |distinct ingredients of request and recipe|
+
+over canonical names, ignoring pantry staples (salt, oil, ...), so 1.0
+means the recipe uses exactly what the user has. If the best recipe
+reaches HYBRID_MIN_COVERAGE it is returned in the generated-recipe shape;
+otherwise Gemini generates one, which is optionally stored in the corpus
+so that the next similar request is served locally.
+
+Candidates come from one indexed `$in` query. Coverage >= t requires a
+recipe to share at least ceil(t * n) of the n submitted ingredients, so
+it must use one of the n - ceil(t * n) + 1 rarest of them (by the
+ingredient statistics); only those are queried, which keeps the
+candidate set small even when the request includes common ingredients.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from core import metrics
+from core.config import settings
+from crud import crud_recipe
+from services import genaitext, ingredient_stats
+from utils.dietary import DIET_FLAGS_FIELD, classify_ingredients
+from utils.formatters import clean_recipe_ingredients
+from utils.ingredient_stats import StatsDelta
+from utils.ingredients import CANONICAL_FIELD, canonicalize_ingredient, canonicalize_ingredients, split_quantity
+
+logger = logging.getLogger(__name__)
+
+GENERATION_REQUESTS = metrics.REGISTRY.counter(
+    "recipe_generation_requests_total",
+    "Generate-recipe requests by serving path (corpus, generated, failed).",
+    ("path",),
+)
+GENERATION_LATENCY = metrics.REGISTRY.histogram(
+    "recipe_generation_duration_seconds", "Generate-recipe latency by serving path.", ("path",),
+)
+MATCH_COVERAGE = metrics.REGISTRY.histogram(
+    "recipe_generation_best_coverage", "Coverage of the best corpus match per request.",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0),
+)
+PERSISTED_RECIPES = metrics.REGISTRY.counter(
+    "generated_recipes_persisted_total", "Generated recipes stored in the corpus, by outcome.", ("outcome",),
+)
+
+# Marks generated recipes stored in the corpus
+GENERATED_SOURCE = "gemini"
+
+# Pending persist_generated tasks; the loop only keeps weak references
+_persist_tasks: Set[asyncio.Task] = set()
+
+
+def pantry_staples() -> set:
+    return {
+        name for name in (canonicalize_ingredient(item) for item in settings.HYBRID_PANTRY_STAPLES.split(","))
+        if name
+    }
+
+
+def coverage(request_terms: set, recipe_terms: set) -> float:
+    if not request_terms and not recipe_terms:
+        return 0.0
+    return len(request_terms & recipe_terms) / len(request_terms | recipe_terms)
+
+
+async def best_corpus_match(ingredients: List[str], min_coverage: float) -> Optional[Tuple[str, float]]:
+    """
+    (recipe ID, coverage) of the corpus recipe covering `ingredients` best,
+    or None if no recipe reaches `min_coverage`.
+    """
+    pantry = pantry_staples()
+    terms = [term for term in canonicalize_ingredients(ingredients) if term not in pantry]
+    if not terms:
+        return None
+
+    stats = ingredient_stats.get_stats()
+    if stats is not None:
+        terms = stats.rarest_first(terms)
+    required = max(1, math.ceil(min_coverage * len(terms)))
+    if required > len(terms):
+        return None
+    probe = terms[:len(terms) - required + 1]
+
+    candidates = await crud_recipe.find_ingredient_lists_using_any(probe, settings.HYBRID_MAX_CANDIDATES)
+    request_terms = set(terms)
+    best: Optional[Tuple[str, float]] = None
+    for recipe_id, recipe_terms in candidates:
+        score = coverage(request_terms, set(recipe_terms) - pantry)
+        if best is None or score > best[1]:
+            best = (recipe_id, score)
+
+    MATCH_COVERAGE.observe(best[1] if best else 0.0)
+    return best if best is not None and best[1] >= min_coverage else None
+
+
+def corpus_recipe_response(recipe: dict, match_coverage: float) -> Dict:
+    """
+    A cleaned corpus recipe in the shape generate_recipe_with_gemini returns.
+    Recipes stored from earlier generations keep their original fields.
+    """
+    ingredients = []
+    for line in recipe.get("ingredients_cleaned") or []:
+        quantity, item = split_quantity(line)
+        ingredients.append({"item": item or line, "quantity": quantity})
+
+    instructions = recipe.get("instructions") or ""
+    if isinstance(instructions, str):
+        instructions = [step.strip() for step in instructions.split("\n") if step.strip()]
+
+    return {
+        "title": recipe.get("title") or "",
+        "description": recipe.get("description") or "",
+        "servings": recipe.get("servings") or "",
+        "prep_time": recipe.get("prep_time") or "",
+        "cook_time": recipe.get("cook_time") or "",
+        "ingredients": ingredients,
+        "instructions": instructions,
+        "source": "corpus",
+        "recipe_id": str(recipe["_id"]),
+        "coverage": round(match_coverage, 3),
+    }
+
+
+def generated_recipe_document(recipe: Dict) -> dict:
+    """
+    A generated recipe as a corpus document, with the same derived fields
+    the importer writes.
+    """
+    lines = []
+    for ingredient in recipe.get("ingredients") or []:
+        if isinstance(ingredient, dict):
+            lines.append(" ".join(filter(None, [ingredient.get("quantity"), ingredient.get("item")])).strip())
+        else:
+            lines.append(str(ingredient).strip())
+    lines = [line for line in lines if line]
+    canonical = canonicalize_ingredients(lines)
+    instructions = recipe.get("instructions") or []
+
+    doc = {
+        "title": recipe.get("title") or "",
+        "ingredients_raw": repr(lines),
+        "ingredients_cleaned": lines,
+        CANONICAL_FIELD: canonical,
+        "instructions": "\n".join(instructions) if isinstance(instructions, list) else str(instructions),
+        "description": recipe.get("description") or "",
+        "servings": recipe.get("servings") or "",
+        "prep_time": recipe.get("prep_time") or "",
+        "cook_time": recipe.get("cook_time") or "",
+        "source_meta": {"generated_by": GENERATED_SOURCE},
+    }
+    flags = classify_ingredients(canonical)
+    if flags is not None:
+        doc[DIET_FLAGS_FIELD] = flags
+    return doc
+
+
+async def persist_generated(recipe: Dict) -> None:
+    """
+    Stores a generated recipe (keyed by title among generated recipes) and
+    updates the ingredient statistics. Failures are logged, never raised.
+    """
+    try:
+        doc = generated_recipe_document(recipe)
+        if not doc["title"] or not doc[CANONICAL_FIELD]:
+            PERSISTED_RECIPES.inc(("skipped",))
+            return
+        previous = await crud_recipe.upsert_recipe(
+            {"title": doc["title"], "source_meta.generated_by": GENERATED_SOURCE}, doc,
+        )
+        delta = StatsDelta()
+        delta.add((previous or {}).get(CANONICAL_FIELD), doc[CANONICAL_FIELD])
+        await crud_recipe.apply_ingredient_stats(delta)
+        PERSISTED_RECIPES.inc(("stored",))
+    except Exception:
+        PERSISTED_RECIPES.inc(("failed",))
+        logger.exception("Could not store generated recipe")
+
+
+def schedule_persist(recipe: Dict) -> asyncio.Task:
+    """
+    Stores a generated recipe in the background so the response does not
+    wait for the corpus writes.
+    """
+    task = asyncio.create_task(persist_generated(recipe))
+    _persist_tasks.add(task)
+    task.add_done_callback(_persist_tasks.discard)
+    return task
+
+
+async def drain_persist_tasks() -> None:
+    """
+    Waits for pending background stores, e.g. on shutdown.
+    """
+    if _persist_tasks:
+        await asyncio.gather(*list(_persist_tasks), return_exceptions=True)
+
+
+async def corpus_recipe(ingredients: List[str]) -> Optional[Dict]:
+    """
+    The best-covering corpus recipe in generated-recipe shape, or None if
+    none is good enough (or it was deleted since the match).
+    """
+    match = await best_corpus_match(ingredients, settings.HYBRID_MIN_COVERAGE)
+    if match is None:
+        return None
+    recipe_id, match_coverage = match
+    recipes = await crud_recipe.get_recipes_by_ids([recipe_id])
+    if recipe_id not in recipes:
+        return None
+    return corpus_recipe_response(clean_recipe_ingredients(recipes[recipe_id]), match_coverage)
+
+
+async def generate_recipe(ingredients: List[str]) -> Dict:
+    """
+    Serves a corpus recipe when one covers `ingredients` well enough,
+    otherwise generates one with Gemini. Raises UpstreamError like
+    genaitext.generate_recipe_with_gemini.
+    """
+    started = time.perf_counter()
+    path = "failed"
+    try:
+        if settings.HYBRID_GENERATION:
+            try:
+                response = await corpus_recipe(ingredients)
+            except Exception:
+                # The corpus is an optimisation; generation still works without it
+                logger.exception("Corpus match failed; generating instead")
+                response = None
+            if response is not None:
+                path = "corpus"
+                return response
+
+        recipe = await genaitext.generate_recipe_with_gemini(ingredients)
+        if "error" in recipe:
+            return recipe
+        path = "generated"
+        if settings.HYBRID_PERSIST_GENERATED:
+            schedule_persist(recipe)
+        return {**recipe, "source": "generated"}
+    finally:
+        GENERATION_REQUESTS.inc((path,))
+        GENERATION_LATENCY.observe(time.perf_counter() - started, (path,))
@@ -1,18 +1,22 @@
 # pip install 'fireworks-ai'
-import fireworks.client
-from fireworks.client.image import ImageInference, Answer
 import io
 
-# Initialize the ImageInference client
-fireworks.client.api_key = "fw_3ZVJjTeW9DXMbVL2kYBQikSw"
-inference_client = ImageInference(model="stable-diffusion-xl-1024-v1-0")
+from core.tracing import traced
+from services import upstreams
+from services.registry import registry
 
+# The Fireworks ImageInference client is built on first use, see services/registry.py
+
+@traced("fireworks")
 async def generate_image_from_prompt(prompt: str) -> bytes:
     """
     Generates an image from a text prompt using Fireworks AI.
+    Raises UpstreamError if Fireworks is unavailable or too slow.
     """
-    # Generate an image using the text_to_image method
-    answer : Answer = await inference_client.text_to_image_async(
+    # Generate an image using the text_to_image method, under the Fireworks
+    # timeout/retry/circuit-breaker policy
+    inference_client = registry.get("fireworks_image")
+    answer = await upstreams.fireworks.call(lambda: inference_client.text_to_image_async(
         prompt=prompt,
         #cfg_scale=undefined,
         height=1024,
@@ -23,7 +27,7 @@ async def generate_image_from_prompt(prompt: str) -> bytes:
         safety_check=False,
         output_image_format="JPG",
         # Add additional parameters here
-    )
+    ))
 
     if answer.image is None:
         raise RuntimeError(f"No return image, {answer.finish_reason}")
@@ -0,0 +1,108 @@
+# stir-backend/services/ingredient_index.py
+
+"""
+In-memory prefix index over every distinct ingredient name in the corpus.
+
+Names are kept in a sorted array so a prefix maps to a contiguous slice
+(two binary searches). Suggestions are ranked by how many recipes use the
+ingredient. Top-k lists for very short prefixes, whose slices can span most
+of the vocabulary, are precomputed at build time so every keystroke is a
+bisect plus at most a small heap selection.
+"""
+
+import asyncio
+import bisect
+import heapq
+import logging
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from crud import crud_recipe
+
+logger = logging.getLogger(__name__)
+
+# Prefixes up to this length get their top-k precomputed at build time
+PRECOMPUTED_PREFIX_LENGTH = 2
+PRECOMPUTED_TOP_K = 50
+
+# Sorts after any character that can appear in an ingredient name
+_PREFIX_END = "\uffff"
+
+
+class IngredientPrefixIndex:
+    """
+    Sorted-array prefix index with corpus-frequency ranking.
+    """
+
+    def __init__(self, frequencies: Dict[str, int]):
+        self._names: List[str] = sorted(frequencies)
+        self._counts = array("I", (frequencies[name] for name in self._names))
+        self._top: Dict[str, List[int]] = self._precompute_top()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _precompute_top(self) -> Dict[str, List[int]]:
+        groups: Dict[str, List[int]] = {"": list(range(len(self._names)))}
+        for i, name in enumerate(self._names):
+            for length in range(1, min(PRECOMPUTED_PREFIX_LENGTH, len(name)) + 1):
+                groups.setdefault(name[:length], []).append(i)
+
+        return {
+            prefix: heapq.nlargest(PRECOMPUTED_TOP_K, positions, key=self._counts.__getitem__)
+            for prefix, positions in groups.items()
+        }
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Tuple[str, int]]:
+        """
+        Returns up to `limit` (name, recipe_count) pairs whose name starts
+        with `prefix`, most frequent first. Ties keep alphabetical order.
+        """
+        prefix = prefix.strip().lower()
+
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH and limit <= PRECOMPUTED_TOP_K:
+            positions = self._top.get(prefix, [])[:limit]
+        else:
+            lo = bisect.bisect_left(self._names, prefix)
+            hi = bisect.bisect_left(self._names, prefix + _PREFIX_END, lo)
+            positions = heapq.nlargest(limit, range(lo, hi), key=self._counts.__getitem__)
+
+        return [(self._names[i], self._counts[i]) for i in positions]
+
+
+# The index is shared by all requests and swapped atomically on rebuild
+_index: Optional[IngredientPrefixIndex] = None
+_built_from_version = None
+
+
+def get_index() -> Optional[IngredientPrefixIndex]:
+    """
+    Returns the current index, or None if it has not been built yet.
+    """
+    return _index
+
+
+async def rebuild() -> None:
+    """
+    Rebuilds the index from the recipes collection and swaps it in.
+    """
+    global _index, _built_from_version
+
+    version = await crud_recipe.get_corpus_version()
+    frequencies = await crud_recipe.get_ingredient_frequencies()
+    # Precomputing per-prefix suggestions is CPU work; do it on a worker thread
+    _index = await asyncio.to_thread(IngredientPrefixIndex, frequencies)
+    _built_from_version = version
+    logger.info(f"Ingredient index built with {len(_index)} distinct ingredients.")
+
+
+async def refresh_if_stale() -> bool:
+    """
+    Rebuilds the index if the corpus was re-imported since the last build.
+    Returns True if a rebuild happened.
+    """
+    if _index is not None and await crud_recipe.get_corpus_version() == _built_from_version:
+        return False
+    await rebuild()
+    return True
+
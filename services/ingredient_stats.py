@@ -0,0 +1,108 @@
+# stir-backend/services/ingredient_stats.py
+
+"""
+In-memory mirror of the materialized `ingredient_stats` collection.
+
+Holds per-ingredient recipe counts, the most popular ingredients and, per
+ingredient, its top co-occurring ingredients, so the stats endpoints and
+query planning (rarest ingredient first) never aggregate over recipes.
+Writers keep the collection current with `$inc` updates; the mirror is
+reloaded from it once writes settle, and after a full rebuild.
+
+Until scripts/rebuild_ingredient_stats.py has built the collection (it
+records `built_at` in corpus_meta), the collection only holds increments
+from writes made since it was introduced, so the mirror is computed from
+the recipes directly instead.
+"""
+
+import asyncio
+import heapq
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.config import settings
+from crud import crud_recipe
+from utils.ingredient_stats import (
+    PAIRS_FIELD, RECIPES_FIELD, STATS_COLLECTION, compute_stats, name_from_key, stats_documents,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class IngredientStats:
+    """
+    Read-only statistics built from stats documents.
+    """
+
+    def __init__(self, documents: Iterable[dict], top_n: int):
+        self.counts: Dict[str, int] = {}
+        self.related: Dict[str, List[Tuple[str, int]]] = {}
+        for doc in documents:
+            count = doc.get(RECIPES_FIELD) or 0
+            # Counts left at zero by incremental updates until the next rebuild
+            if count <= 0:
+                continue
+            name = doc["_id"]
+            self.counts[name] = count
+            pairs = ((name_from_key(key), n) for key, n in (doc.get(PAIRS_FIELD) or {}).items() if n > 0)
+            self.related[name] = heapq.nlargest(top_n, pairs, key=lambda pair: (pair[1], pair[0]))
+        self._popular = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.counts
+
+    def popular(self, limit: int) -> List[Tuple[str, int]]:
+        return self._popular[:limit]
+
+    def rarest_first(self, terms: List[str]) -> List[str]:
+        """
+        Orders search terms by ascending recipe count; unknown names (count
+        0) come first since they bound the result to nothing.
+        """
+        return sorted(terms, key=lambda term: self.counts.get(term, 0))
+
+
+_stats: Optional[IngredientStats] = None
+_built_from_version = None
+
+
+def get_stats() -> Optional[IngredientStats]:
+    return _stats
+
+
+def _documents_from_recipes(ingredient_lists: List[List[str]]) -> List[dict]:
+    return stats_documents(compute_stats(ingredient_lists))
+
+
+async def rebuild() -> None:
+    """
+    Reloads the mirror from the stats collection and swaps it in.
+    """
+    global _stats, _built_from_version
+
+    version = await crud_recipe.get_corpus_version(STATS_COLLECTION)
+    if await crud_recipe.ingredient_stats_built():
+        documents = await crud_recipe.get_ingredient_stats()
+    else:
+        _, ingredient_lists = await crud_recipe.get_ingredient_lists()
+        documents = await asyncio.to_thread(_documents_from_recipes, ingredient_lists)
+        logger.info("Ingredient stats collection has not been built; computed stats from recipes instead.")
+
+    # Ranking the per-ingredient top-N lists is CPU work too
+    _stats = await asyncio.to_thread(IngredientStats, documents, settings.INGREDIENT_STATS_TOP_N)
+    _built_from_version = version
+    logger.info(f"Ingredient stats loaded for {len(_stats)} ingredients.")
+
+
+async def refresh_if_stale() -> bool:
+    """
+    Reloads the mirror if the stats collection was rebuilt since the last
+    load. Returns True if a reload happened.
+    """
+    if _stats is not None and await crud_recipe.get_corpus_version(STATS_COLLECTION) == _built_from_version:
+        return False
+    await rebuild()
+    return True
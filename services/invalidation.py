@@ -0,0 +1,279 @@
+# stir-backend/services/invalidation.py
+
+"""
+Change-driven invalidation of in-memory data derived from the recipes
+collection.
+
+A single background task per worker follows writes to the collection and
+publishes InvalidationEvents to consumers registered with `bus.subscribe`:
+
+  * change streams (replica sets / sharded clusters): every insert, update,
+    replace and delete, resumable after errors via the resume token;
+  * polling fallback (standalone servers, or INVALIDATION_MODE="poll"):
+    recipes whose `updated_at` moved past the last seen watermark. Writers
+    set `updated_at` with $currentDate; deletions are not visible to
+    polling, so a change of the corpus version (mark_corpus_updated)
+    publishes a full invalidation instead.
+
+Changes arriving close together are coalesced into one event per batch
+window, so a migration rewriting thousands of recipes produces a handful of
+events rather than thousands.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, FrozenSet, Optional, Set, Union
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from core import metrics
+from crud import crud_recipe
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_EVENTS = metrics.REGISTRY.counter(
+    "invalidation_events_total", "Invalidation events published, by source and scope (recipes or full).",
+    ("source", "scope"),
+)
+INVALIDATED_RECIPES = metrics.REGISTRY.counter(
+    "invalidated_recipes_total", "Recipe IDs carried by invalidation events, by source.", ("source",),
+)
+CONSUMER_ERRORS = metrics.REGISTRY.counter(
+    "invalidation_consumer_errors_total", "Exceptions raised by invalidation consumers.", ("consumer",),
+)
+
+# Change stream operations that name a single document
+_DOCUMENT_OPERATIONS = {"insert", "update", "replace", "delete"}
+# Server error codes meaning change streams are unavailable on this deployment
+_CHANGE_STREAMS_UNSUPPORTED = {40573, 40324}
+# Largest batch of IDs published as one event
+_MAX_BATCH_IDS = 5000
+# Naive UTC, as PyMongo returns datetimes by default
+_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class InvalidationEvent:
+    # IDs of recipes that were inserted, changed or deleted
+    recipe_ids: FrozenSet[str] = frozenset()
+    # True when the change cannot be narrowed to IDs (drop, rename,
+    # re-import); consumers should discard everything derived from the corpus
+    full: bool = False
+    source: str = "change_stream"
+
+
+Consumer = Callable[[InvalidationEvent], Union[None, Awaitable[None]]]
+
+
+class InvalidationBus:
+    """
+    In-process fan-out of InvalidationEvents to named consumers. Consumers
+    may be sync or async; one failing consumer does not affect the others.
+    """
+
+    def __init__(self):
+        self._consumers: Dict[str, Consumer] = {}
+
+    def subscribe(self, name: str, consumer: Consumer) -> None:
+        if name in self._consumers:
+            raise ValueError(f"Invalidation consumer '{name}' is already subscribed")
+        self._consumers[name] = consumer
+
+    def unsubscribe(self, name: str) -> None:
+        self._consumers.pop(name, None)
+
+    async def publish(self, event: InvalidationEvent) -> None:
+        INVALIDATION_EVENTS.inc((event.source, "full" if event.full else "recipes"))
+        if event.recipe_ids:
+            INVALIDATED_RECIPES.inc((event.source,), len(event.recipe_ids))
+
+        for name, consumer in list(self._consumers.items()):
+            try:
+                result = consumer(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                CONSUMER_ERRORS.inc((name,))
+                logger.exception(f"Invalidation consumer '{name}' failed")
+
+
+bus = InvalidationBus()
+
+
+class DebouncedTask:
+    """
+    Consumer that runs `task` once changes have stopped arriving for `delay`
+    seconds, for derived structures that cannot be patched per recipe
+    (e.g. frequency-ranked or vector indexes) and are rebuilt instead.
+    """
+
+    def __init__(self, name: str, task: Callable[[], Awaitable[None]], delay: float):
+        self.name = name
+        self._task = task
+        self._delay = delay
+        self._pending: Optional[asyncio.Task] = None
+
+    def __call__(self, event: InvalidationEvent) -> None:
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+        self._pending = asyncio.create_task(self._run_later())
+
+    async def _run_later(self) -> None:
+        await asyncio.sleep(self._delay)
+        try:
+            await self._task()
+        except Exception:
+            logger.exception(f"Deferred rebuild '{self.name}' failed")
+
+    async def cancel(self) -> None:
+        """
+        Drops a pending run and waits for it to stop.
+        """
+        pending, self._pending = self._pending, None
+        if pending is not None and not pending.done():
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+
+
+@dataclass
+class _Batch:
+    ids: Set[str] = field(default_factory=set)
+    full: bool = False
+    started: float = 0.0
+
+    def add(self, recipe_id: str) -> None:
+        if not self.ids and not self.full:
+            self.started = time.monotonic()
+        self.ids.add(recipe_id)
+
+    def mark_full(self) -> None:
+        if not self.ids and not self.full:
+            self.started = time.monotonic()
+        self.full = True
+
+    def __bool__(self) -> bool:
+        return bool(self.ids) or self.full
+
+    def due(self, window: float) -> bool:
+        return bool(self) and (len(self.ids) >= _MAX_BATCH_IDS or time.monotonic() - self.started >= window)
+
+    async def flush(self, source: str) -> None:
+        if self:
+            event = InvalidationEvent(recipe_ids=frozenset(self.ids), full=self.full, source=source)
+            self.ids, self.full = set(), False
+            await bus.publish(event)
+
+
+class ChangeStreamsUnsupported(Exception):
+    pass
+
+
+async def follow_change_stream(batch_window: float, retry_delay: float = 5.0) -> None:
+    """
+    Publishes events from the recipes change stream until cancelled.
+    Raises ChangeStreamsUnsupported if the deployment has no change streams.
+    """
+    resume_token = None
+    batch = _Batch()
+    window_ms = max(int(batch_window * 1000), 1)
+
+    while True:
+        try:
+            async with crud_recipe.watch_recipe_changes(resume_token, max_await_time_ms=window_ms) as stream:
+                logger.info("Following recipe changes through a change stream.")
+                while stream.alive:
+                    change = await stream.try_next()
+                    if change is not None:
+                        operation = change.get("operationType")
+                        if operation in _DOCUMENT_OPERATIONS:
+                            batch.add(str(change["documentKey"]["_id"]))
+                        else:
+                            # drop, rename, dropDatabase, invalidate
+                            batch.mark_full()
+                    resume_token = stream.resume_token
+                    if batch.due(batch_window) or (change is None and batch):
+                        await batch.flush("change_stream")
+                # The stream was invalidated (e.g. collection dropped); start afresh
+                await batch.flush("change_stream")
+                resume_token = None
+        except asyncio.CancelledError:
+            raise
+        except NotImplementedError as e:
+            raise ChangeStreamsUnsupported(str(e))
+        except OperationFailure as e:
+            if e.code in _CHANGE_STREAMS_UNSUPPORTED:
+                raise ChangeStreamsUnsupported(str(e))
+            logger.warning(f"Change stream failed ({e}); resuming in {retry_delay:.0f}s")
+            await asyncio.sleep(retry_delay)
+        except PyMongoError as e:
+            logger.warning(f"Change stream failed ({e}); resuming in {retry_delay:.0f}s")
+            await asyncio.sleep(retry_delay)
+
+
+async def poll_updated_at(interval: float) -> None:
+    """
+    Publishes events for recipes whose `updated_at` advanced, and a full
+    invalidation when the corpus version changes, until cancelled.
+    """
+    latest = await crud_recipe.get_recipes_updated_since(None)
+    # Nothing stamped yet: every stamped write from now on is new
+    watermark = latest[0][1] if latest else _EPOCH
+    # IDs already published at exactly the watermark ($gte re-reads them)
+    seen_at_watermark: Set[str] = {recipe_id for recipe_id, _ in latest}
+    corpus_version = await crud_recipe.get_corpus_version()
+    logger.info(f"Polling recipe changes every {interval:.0f}s.")
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            version = await crud_recipe.get_corpus_version()
+            if version != corpus_version:
+                corpus_version = version
+                await bus.publish(InvalidationEvent(full=True, source="poll"))
+
+            # Drain everything written since the last poll, page by page
+            while True:
+                rows = await crud_recipe.get_recipes_updated_since(watermark, limit=_MAX_BATCH_IDS)
+                fresh = [(recipe_id, ts) for recipe_id, ts in rows
+                         if not (ts == watermark and recipe_id in seen_at_watermark)]
+                if not fresh:
+                    break
+
+                newest = fresh[-1][1]
+                if newest != watermark:
+                    seen_at_watermark = set()
+                watermark = newest
+                seen_at_watermark.update(recipe_id for recipe_id, ts in fresh if ts == newest)
+                await bus.publish(InvalidationEvent(
+                    recipe_ids=frozenset(recipe_id for recipe_id, _ in fresh), source="poll",
+                ))
+                if len(rows) < _MAX_BATCH_IDS:
+                    break
+        except Exception:
+            logger.exception("Polling for recipe changes failed")
+
+
+async def run(mode: str, poll_interval: float, batch_window: float) -> None:
+    """
+    Background task: follows recipe changes according to `mode`
+    ("auto", "change_stream", "poll" or "off") until cancelled.
+    """
+    if mode == "off":
+        return
+    if mode in ("auto", "change_stream"):
+        try:
+            await follow_change_stream(batch_window)
+        except ChangeStreamsUnsupported as e:
+            if mode == "change_stream":
+                logger.error(f"Change streams are not available: {e}")
+                return
+            logger.info("Change streams are not available on this deployment; falling back to polling.")
+        except Exception:
+            if mode == "change_stream":
+                raise
+            logger.exception("Could not follow the change stream; falling back to polling.")
+    await poll_updated_at(poll_interval)
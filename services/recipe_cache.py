@@ -0,0 +1,116 @@
+# stir-backend/services/recipe_cache.py
+
+"""
+Optional in-process cache of cleaned recipes, keyed by string ID.
+
+Sits between the corpus snapshot and Mongo in load_cleaned_recipes, so
+repeated favourites/meal-plan lookups skip both the query and the
+ingredient cleaning. Bounded in size (least recently used entries are
+evicted first) and in age (entries expire after a TTL). Entries are
+dropped per recipe as the invalidation bus reports writes, and entirely
+when the corpus is re-imported. Disabled when RECIPE_CACHE_MAX_ENTRIES is 0.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from core import metrics
+from core.config import settings
+from crud import crud_recipe
+
+CACHE_REQUESTS = metrics.REGISTRY.counter(
+    "recipe_cache_requests_total", "Recipe cache lookups by result (hit or miss).", ("result",),
+)
+
+
+class RecipeCache:
+    """
+    LRU + TTL map of recipe ID -> cleaned recipe document.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, recipe_ids: Sequence[str]) -> Dict[str, dict]:
+        now = self._clock()
+        found = {}
+        for recipe_id in recipe_ids:
+            entry = self._entries.get(recipe_id)
+            if entry is None:
+                continue
+            expires_at, recipe = entry
+            if expires_at <= now:
+                del self._entries[recipe_id]
+                continue
+            self._entries.move_to_end(recipe_id)
+            found[recipe_id] = recipe
+
+        hits = len(found)
+        if hits:
+            CACHE_REQUESTS.inc(("hit",), hits)
+        if len(recipe_ids) > hits:
+            CACHE_REQUESTS.inc(("miss",), len(recipe_ids) - hits)
+        return found
+
+    def put_many(self, recipes: Dict[str, dict]) -> None:
+        expires_at = self._clock() + self.ttl_seconds
+        for recipe_id, recipe in recipes.items():
+            self._entries[recipe_id] = (expires_at, recipe)
+            self._entries.move_to_end(recipe_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, recipe_ids: Iterable[str]) -> None:
+        for recipe_id in recipe_ids:
+            self._entries.pop(recipe_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Shared cache for this worker, or None when disabled
+_cache: Optional[RecipeCache] = (
+    RecipeCache(settings.RECIPE_CACHE_MAX_ENTRIES, settings.RECIPE_CACHE_TTL_SECONDS)
+    if settings.RECIPE_CACHE_MAX_ENTRIES > 0 else None
+)
+_cached_version = None
+
+
+def get_cache() -> Optional[RecipeCache]:
+    return _cache
+
+
+def on_invalidation(event) -> None:
+    """
+    services.invalidation consumer.
+    """
+    if _cache is None:
+        return
+    if event.full:
+        _cache.clear()
+    else:
+        _cache.invalidate(event.recipe_ids)
+
+
+async def refresh_if_stale() -> bool:
+    """
+    Empties the cache if the corpus was re-imported since it was filled.
+    Returns True if the cache was cleared.
+    """
+    global _cached_version
+
+    if _cache is None:
+        return False
+    version = await crud_recipe.get_corpus_version()
+    if version == _cached_version:
+        return False
+    _cache.clear()
+    _cached_version = version
+    return True
@@ -0,0 +1,125 @@
+# stir-backend/services/registry.py
+
+"""
+Lazily constructed clients for external AI and CDN services.
+
+Importing google.generativeai, fireworks, cloudinary and PIL costs most of
+the app's start-up time and memory, yet a worker that only serves recipe
+reads never calls them. Service modules therefore ask the registry for a
+client at call time; the SDK is imported and configured on first use and
+the instance is shared afterwards.
+
+    genai = registry.get("gemini")
+    registry.override("gemini", fake)   # benchmarks and local runs
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FIREWORKS_IMAGE_MODEL = "stable-diffusion-xl-1024-v1-0"
+
+
+class ServiceNotConfigured(RuntimeError):
+    """
+    A service client was requested but its credentials are not set.
+    """
+
+
+def _require(name: str, value: Optional[str]) -> str:
+    if not value:
+        raise ServiceNotConfigured(f"{name} is not set; add it to .env or the environment")
+    return value
+
+
+class ServiceRegistry:
+    """
+    Name -> factory map whose instances are built once, on first get().
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        if name in self._factories:
+            raise ValueError(f"Service '{name}' is already registered")
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        # Factories may be slow (SDK import); build each one only once even
+        # when first used from several threads at the same time
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"Unknown service '{name}'")
+                instance = self._instances[name] = factory()
+                logger.info(f"Initialised service client '{name}'.")
+        return instance
+
+    def override(self, name: str, instance: Any) -> None:
+        """
+        Replaces the instance for `name`, e.g. with a fake.
+        """
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self, name: str) -> None:
+        """
+        Drops the instance for `name`; the next get() builds a new one.
+        """
+        with self._lock:
+            self._instances.pop(name, None)
+
+    def loaded(self) -> List[str]:
+        return sorted(self._instances)
+
+    def preload(self, names: List[str]) -> None:
+        for name in names:
+            self.get(name)
+
+
+def _make_gemini():
+    api_key = _require("GEMINI_API_KEY", settings.GEMINI_API_KEY)
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai
+
+
+def _make_fireworks_image():
+    api_key = _require("FIREWORKS_API_KEY", settings.FIREWORKS_API_KEY)
+    import fireworks.client
+    from fireworks.client.image import ImageInference
+
+    fireworks.client.api_key = api_key
+    return ImageInference(model=FIREWORKS_IMAGE_MODEL)
+
+
+def _make_cloudinary():
+    import cloudinary
+    import cloudinary.uploader
+
+    cloud_name = os.getenv("CLOUD_NAME")
+    api_key = os.getenv("CLOUD_API_KEY")
+    api_secret = os.getenv("CLOUD_API_SECRET")
+    if cloud_name and api_key and api_secret:
+        cloudinary.config(cloud_name=cloud_name, api_key=api_key, api_secret=api_secret, secure=True)
+    return cloudinary.uploader
+
+
+registry = ServiceRegistry()
+registry.register("gemini", _make_gemini)
+registry.register("fireworks_image", _make_fireworks_image)
+registry.register("cloudinary", _make_cloudinary)
@@ -0,0 +1,168 @@
+# stir-backend/services/similarity.py
+
+"""
+"More like this" recipe similarity over ingredient vectors.
+
+Every recipe becomes a sparse, L2-normalised TF-IDF (or binary) vector over
+the canonical ingredient vocabulary. Cosine similarity is then a single
+sparse row-times-matrix product, which only touches recipes that share at
+least one ingredient with the query, instead of a comparison against the
+whole corpus in Mongo.
+"""
+
+import asyncio
+import logging
+import math
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from crud import crud_recipe
+
+logger = logging.getLogger(__name__)
+
+WEIGHTINGS = ("tfidf", "binary")
+
+
+class SimilarityIndex:
+    """
+    Row-normalised recipe x ingredient matrix with top-k cosine queries.
+    """
+
+    def __init__(self, recipe_ids: Sequence[str], ingredient_lists: Sequence[Sequence[str]],
+                 weighting: str = "tfidf"):
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting '{weighting}', expected one of {WEIGHTINGS}")
+
+        self._ids: List[str] = list(recipe_ids)
+        self._position: Dict[str, int] = {recipe_id: i for i, recipe_id in enumerate(self._ids)}
+
+        vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        indices: List[int] = []
+        for names in ingredient_lists:
+            columns = {vocabulary.setdefault(name, len(vocabulary)) for name in names}
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+
+        shape = (len(self._ids), max(len(vocabulary), 1))
+        indices_arr = np.asarray(indices, dtype=np.int32)
+        data = np.ones(len(indices_arr), dtype=np.float32)
+
+        if weighting == "tfidf":
+            # Smoothed idf, as in scikit-learn: rare ingredients count for more
+            doc_freq = np.bincount(indices_arr, minlength=shape[1])
+            idf = np.log((1 + shape[0]) / (1 + doc_freq)).astype(np.float32) + 1.0
+            data = idf[indices_arr]
+
+        matrix = sparse.csr_matrix((data, indices_arr, np.asarray(indptr, dtype=np.int64)), shape=shape)
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self._matrix = sparse.diags(1.0 / norms).dot(matrix).astype(np.float32).tocsr()
+        # Ingredient-major copy so row @ matrix_t is a cheap sparse product
+        self._matrix_t = self._matrix.T.tocsr()
+        self.vocabulary_size = len(vocabulary)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, recipe_id: str) -> bool:
+        return recipe_id in self._position
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the two sparse matrices.
+        """
+        return sum(
+            m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+            for m in (self._matrix, self._matrix_t)
+        )
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def similar(self, recipe_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Returns up to k (recipe_id, cosine) pairs most similar to recipe_id,
+        best first, excluding the recipe itself and zero-overlap recipes.
+        """
+        row = self._position.get(recipe_id)
+        if row is None:
+            return []
+
+        scores = (self._matrix[row] @ self._matrix_t).toarray().ravel()
+        scores[row] = 0.0
+        return [
+            (self._ids[i], float(scores[i]))
+            for i in self._top_k(scores, k) if scores[i] > 0
+        ]
+
+    def all_neighbors(self, k: int = 10, batch_size: int = 512) -> Iterator[Tuple[str, List[Tuple[str, float]]]]:
+        """
+        Yields (recipe_id, neighbours) for every recipe, computing the
+        similarity matrix one block of rows at a time to bound memory.
+        """
+        for start in range(0, len(self._ids), batch_size):
+            block = (self._matrix[start:start + batch_size] @ self._matrix_t).toarray()
+            for offset, scores in enumerate(block):
+                row = start + offset
+                scores[row] = 0.0
+                yield self._ids[row], [
+                    (self._ids[i], float(scores[i]))
+                    for i in self._top_k(scores, k) if scores[i] > 0
+                ]
+
+
+# Shared index, swapped atomically on rebuild
+_index = None
+_built_from_version = None
+
+
+def get_index():
+    """
+    Returns the current SimilarityIndex, or None if it has not been built.
+    """
+    return _index
+
+
+async def build_index(weighting: str = "tfidf") -> SimilarityIndex:
+    """
+    Loads every recipe's canonical ingredients and builds a fresh index on
+    a worker thread, so requests keep being served meanwhile.
+    """
+    recipe_ids, ingredient_lists = await crud_recipe.get_ingredient_lists()
+    return await asyncio.to_thread(SimilarityIndex, recipe_ids, ingredient_lists, weighting=weighting)
+
+
+async def rebuild(weighting: str = "tfidf") -> None:
+    """
+    Rebuilds the shared index from the recipes collection and swaps it in.
+    """
+    global _index, _built_from_version
+
+    version = await crud_recipe.get_corpus_version()
+    _index = await build_index(weighting)
+    _built_from_version = version
+    logger.info(
+        f"Similarity index built for {len(_index)} recipes over {_index.vocabulary_size} ingredients "
+        f"({math.ceil(_index.nbytes / 1024)} KiB)."
+    )
+
+
+async def refresh_if_stale(weighting: str = "tfidf") -> bool:
+    """
+    Rebuilds the index if the corpus was re-imported since the last build.
+    Returns True if a rebuild happened.
+    """
+    if _index is not None and await crud_recipe.get_corpus_version() == _built_from_version:
+        return False
+    await rebuild(weighting)
+    return True
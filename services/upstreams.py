@@ -0,0 +1,49 @@
+# stir-backend/services/upstreams.py
+
+"""
+Resilience policies for the external AI services, built from Settings.
+Service modules route every Gemini / Fireworks request through these.
+"""
+
+from core.config import settings
+from core.resilience import Policy, Upstream
+
+
+def _policy(timeout: float, deadline: float, max_attempts: int, hedge: bool) -> Policy:
+    return Policy(
+        timeout=timeout,
+        deadline=deadline,
+        max_attempts=max_attempts,
+        backoff_base=settings.UPSTREAM_BACKOFF_BASE_SECONDS,
+        backoff_max=settings.UPSTREAM_BACKOFF_MAX_SECONDS,
+        hedge=hedge,
+        hedge_delay=settings.UPSTREAM_HEDGE_DELAY_SECONDS,
+        failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.CIRCUIT_RESET_SECONDS,
+    )
+
+
+gemini = Upstream(
+    "gemini",
+    _policy(settings.GEMINI_TIMEOUT_SECONDS, settings.GEMINI_DEADLINE_SECONDS,
+            settings.GEMINI_MAX_ATTEMPTS, settings.GEMINI_HEDGE),
+    max_threads=settings.GEMINI_MAX_CONCURRENCY,
+)
+
+fireworks = Upstream(
+    "fireworks",
+    _policy(settings.FIREWORKS_TIMEOUT_SECONDS, settings.FIREWORKS_DEADLINE_SECONDS,
+            settings.FIREWORKS_MAX_ATTEMPTS, settings.FIREWORKS_HEDGE),
+)
+
+
+async def generate_gemini_content(model, prompt):
+    """
+    model.generate_content(prompt) under the Gemini policy. The SDK call is
+    blocking, so it runs on the Gemini thread pool; it is also given the
+    attempt timeout so a stalled request does not keep its thread forever.
+    """
+    request_options = {"timeout": gemini.policy.timeout}
+    return await gemini.call(
+        lambda: gemini.run_sync(model.generate_content, prompt, request_options=request_options)
+    )
@@ -0,0 +1,46 @@
+# stir-backend/tests/conftest.py
+
+import os
+import sys
+
+import pytest
+
+# Add project root to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings require a URI; tests that need a database install the mongomock fakes
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/stir")
+# The Mongo stand-in has no change streams
+os.environ.setdefault("INVALIDATION_MODE", "poll")
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """
+    An empty mongomock-motor database that the data layer reads and writes.
+    Rebinds the same module attributes as benchmarks.fakes.install_fakes.
+    """
+    from mongomock_motor import AsyncMongoMockClient
+
+    from crud import crud_recipe
+    from db import mongodb
+
+    db = AsyncMongoMockClient()["stir"]
+    for module in (mongodb, crud_recipe):
+        monkeypatch.setattr(module, "db", db)
+        monkeypatch.setattr(module, "read_db", db)
+    return db
+
+
+@pytest.fixture
+def api_client(fake_db):
+    """
+    A client for the API routes over `fake_db`, without the startup tasks.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from api.api import api_router
+
+    app = FastAPI()
+    app.include_router(api_router, prefix="/api/v1")
+    return TestClient(app)
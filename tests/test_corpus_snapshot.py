@@ -0,0 +1,90 @@
+# stir-backend/tests/test_corpus_snapshot.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from crud import crud_recipe
+from services import corpus_snapshot
+from utils.dietary import DAIRY, DIET_FLAGS_FIELD, EGG, MEAT, DietFilter
+from utils.formatters import clean_recipe_ingredients
+from utils.ingredients import CANONICAL_FIELD
+
+IMAGE = {"url": "https://example.com/a.jpg", "public_id": "stir/a", "width": 800, "height": 600, "format": "jpg"}
+
+
+def cleaned_recipe(oid, title, diet_flags=None, image=None):
+    recipe = {
+        "_id": oid,
+        "title": title,
+        "ingredients_cleaned": ["2 tomatoes", "1 clove garlic"],
+        CANONICAL_FIELD: ["tomato", "garlic"],
+        "instructions": "Chop.\nCook.",
+        "image": image,
+    }
+    if diet_flags is not None:
+        recipe[DIET_FLAGS_FIELD] = diet_flags
+    return recipe
+
+
+@pytest.fixture
+def recipes():
+    return [
+        cleaned_recipe(ObjectId(), "Crème brûlée", diet_flags=DAIRY | EGG, image=IMAGE),
+        # numpy's S12 strips trailing NULs; recipe() must pad them back
+        cleaned_recipe(ObjectId(b"\x65" + b"\x01" * 9 + b"\x00\x00"), "Trailing NULs"),
+        cleaned_recipe(ObjectId(b"\x00" * 12), "All NULs", diet_flags=MEAT),
+        cleaned_recipe(ObjectId(), ""),
+    ]
+
+
+@pytest.fixture
+def snapshot(tmp_path, recipes):
+    path = str(tmp_path / "corpus.snap")
+    assert corpus_snapshot.write_snapshot(path, recipes) == len(recipes)
+    return corpus_snapshot.CorpusSnapshot(path)
+
+
+def test_recipes_round_trip(snapshot, recipes):
+    assert len(snapshot) == len(recipes)
+    for recipe in recipes:
+        assert snapshot.get(str(recipe["_id"])) == recipe
+    assert snapshot.get(str(ObjectId())) is None
+    assert snapshot.get("not-an-id") is None
+
+
+def test_page_is_in_id_order(snapshot, recipes):
+    ordered = sorted(recipes, key=lambda recipe: recipe["_id"].binary)
+    assert snapshot.page(0, 100) == ordered
+    assert snapshot.page(1, 2) == ordered[1:3]
+    assert snapshot.page(10, 5) == []
+    assert [recipe["title"] for recipe in snapshot.page(0, 10, DietFilter.parse(include=["vegetarian"]))] == [
+        "Crème brûlée",
+    ]
+
+
+def test_stale_and_superseded_rows_are_skipped(snapshot, recipes):
+    stale = str(recipes[0]["_id"])
+    snapshot.stale_ids.add(stale)
+    assert snapshot.get(stale) is None
+    assert stale not in snapshot.get_many([str(recipe["_id"]) for recipe in recipes])
+    assert any(snapshot.is_stale(recipe) for recipe in snapshot.page(0, 10))
+
+    snapshot.superseded = True
+    assert snapshot.get_many([str(recipe["_id"]) for recipe in recipes]) == {}
+
+
+def test_page_matches_mongo_order(fake_db, tmp_path, recipes):
+    documents = [
+        {"_id": recipe["_id"], "title": recipe["title"], "ingredients_raw": repr(recipe["ingredients_cleaned"]),
+         "instructions": recipe["instructions"]}
+        for recipe in recipes
+    ]
+    asyncio.run(fake_db["recipes"].insert_many(documents))
+    from_mongo = [clean_recipe_ingredients(doc) for doc in asyncio.run(crud_recipe.get_recipes(1, 2))]
+
+    path = str(tmp_path / "corpus.snap")
+    corpus_snapshot.write_snapshot(path, [clean_recipe_ingredients(doc) for doc in documents])
+    from_snapshot = corpus_snapshot.CorpusSnapshot(path).page(1, 2)
+    assert [recipe["_id"] for recipe in from_snapshot] == [recipe["_id"] for recipe in from_mongo]
@@ -0,0 +1,35 @@
+# stir-backend/tests/test_dietary.py
+
+from utils.dietary import (
+    DAIRY, DIET_FLAGS_FIELD, MEAT, PORK, DietFilter, classify_ingredients, with_diet_flags,
+)
+from utils.ingredients import canonicalize_ingredients
+
+
+def flags_for(lines):
+    return classify_ingredients(canonicalize_ingredients(lines))
+
+
+def test_accented_dairy_is_flagged():
+    assert flags_for(["1/2 cup crème fraîche"]) & DAIRY
+    assert flags_for(["4 oz Gruyère, grated"]) & DAIRY
+
+
+def test_hot_dogs_are_not_vegan():
+    flags = flags_for(["4 hot dogs", "4 buns"])
+    assert flags & (MEAT | PORK) == MEAT | PORK
+    assert not DietFilter.parse(include=["vegan"]).matches(flags)
+
+
+def test_cream_of_tartar_is_not_dairy():
+    assert not flags_for(["1 tsp cream of tartar"]) & DAIRY
+
+
+def test_unrecognised_ingredients_are_unclassified():
+    assert classify_ingredients([]) is None
+    assert not DietFilter.parse(include=["vegan"]).matches(classify_ingredients([]))
+
+
+def test_with_diet_flags_unsets_when_unclassified():
+    assert with_diet_flags({"$set": {"a": 1}}, []) == {"$set": {"a": 1}, "$unset": {DIET_FLAGS_FIELD: ""}}
+    assert with_diet_flags({"$set": {"a": 1}}, ["milk"]) == {"$set": {"a": 1, DIET_FLAGS_FIELD: DAIRY}}
@@ -0,0 +1,106 @@
+# stir-backend/tests/test_export.py
+
+import ast
+import asyncio
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from bson import ObjectId
+
+from crud import crud_recipe
+from services import export
+
+
+@pytest.fixture
+def recipes(fake_db):
+    docs = [
+        {
+            "_id": ObjectId(),
+            "title": f"Recipe {i}, \"quoted\"",
+            "ingredients_raw": repr([f"{i} eggs", "salt"]),
+            "ingredients_canonical": ["egg", "salt"],
+            "instructions": "Whisk.\nCook.",
+        }
+        for i in range(30)
+    ]
+    asyncio.run(fake_db["recipes"].insert_many(docs))
+    return sorted(docs, key=lambda doc: doc["_id"])
+
+
+async def collect(chunks) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_ndjson_export(api_client, recipes):
+    response = api_client.get("/api/v1/recipes/export", params={"fields": "_id,title,ingredients_cleaned"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        {"_id": str(doc["_id"]), "title": doc["title"], "ingredients_cleaned": ast.literal_eval(doc["ingredients_raw"])}
+        for doc in recipes
+    ]
+
+
+def test_csv_export(api_client, recipes):
+    params = {"format": "csv", "fields": "title,ingredients_canonical"}
+    response = api_client.get("/api/v1/recipes/export", params=params)
+    assert response.status_code == 200
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["title", "ingredients_canonical"]
+    assert rows[1:] == [[doc["title"], '["egg","salt"]'] for doc in recipes]
+
+
+def test_unknown_export_field(api_client):
+    response = api_client.get("/api/v1/recipes/export", params={"fields": "title,secret"})
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+
+def test_gzip_export_matches_plain(fake_db, recipes):
+    def stream(compress):
+        return export.stream_recipes(
+            "ndjson", export.DEFAULT_FIELDS, batch_size=4, chunk_bytes=256, compress=compress,
+        )
+
+    plain = asyncio.run(collect(stream(False)))
+    assert plain.count(b"\n") == len(recipes)
+    assert gzip.decompress(asyncio.run(collect(stream(True)))) == plain
+
+
+def test_gzip_export_endpoint(api_client, recipes):
+    plain = api_client.get("/api/v1/recipes/export", headers={"Accept-Encoding": "identity"})
+    compressed = api_client.get("/api/v1/recipes/export", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    # The client decodes the body
+    assert compressed.content == plain.content
+
+
+def test_early_close_releases_the_cursor(fake_db, recipes, monkeypatch):
+    closed = []
+    iter_recipes = crud_recipe.iter_recipes
+
+    async def tracking_iter_recipes(**kwargs):
+        try:
+            async for doc in iter_recipes(**kwargs):
+                yield doc
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(crud_recipe, "iter_recipes", tracking_iter_recipes)
+    aborted = export.EXPORTS.value(("ndjson", "aborted"))
+    exported = export.EXPORTED_RECIPES.value(("ndjson",))
+
+    async def read_one_chunk():
+        chunks = export.stream_recipes("ndjson", ["_id"], batch_size=2, chunk_bytes=1)
+        first = await chunks.__anext__()
+        await chunks.aclose()
+        return first
+
+    assert json.loads(asyncio.run(read_one_chunk())) == {"_id": str(recipes[0]["_id"])}
+    assert closed == [True]
+    assert export.EXPORTS.value(("ndjson", "aborted")) == aborted + 1
+    assert export.EXPORTED_RECIPES.value(("ndjson",)) == exported + 1
@@ -0,0 +1,56 @@
+# stir-backend/tests/test_fast_serialization.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from core.config import settings
+from services import similarity
+
+
+def recipe_doc(title, canonical, image=None):
+    doc = {
+        "_id": ObjectId(),
+        "title": title,
+        "ingredients_raw": repr([f"1 {name}" for name in canonical]),
+        "ingredients_canonical": canonical,
+        "instructions": "Mix «gently».\nServe — warm.",
+    }
+    if image is not None:
+        doc["image"] = image
+    return doc
+
+
+@pytest.fixture
+def corpus(fake_db, monkeypatch):
+    recipes = [
+        recipe_doc("Crème brûlée", ["cream", "egg", "sugar"], image={
+            "url": "https://res.cloudinary.com/demo/image/upload/stir/creme.jpg",
+            "public_id": "stir/creme", "width": 1024, "height": 768, "format": "jpg",
+        }),
+        recipe_doc("Custard", ["milk", "egg", "sugar"]),
+        recipe_doc("Flan", ["milk", "egg", "sugar", "caramel"]),
+    ]
+    asyncio.run(fake_db["recipes"].insert_many(recipes))
+    monkeypatch.setattr(similarity, "_index", asyncio.run(similarity.build_index()))
+    monkeypatch.setattr(settings, "SIMILAR_USE_PRECOMPUTED", False)
+    return [str(recipe["_id"]) for recipe in recipes]
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/recipes/{0}",
+    "/api/v1/recipes/{1}",
+    "/api/v1/recipes/?limit=10",
+    "/api/v1/recipes/{0}/similar",
+])
+def test_fast_path_is_byte_identical_to_validated_path(api_client, corpus, monkeypatch, path):
+    url = path.format(*corpus)
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", False)
+    validated = api_client.get(url)
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+    fast = api_client.get(url)
+    assert validated.status_code == fast.status_code == 200
+    assert fast.content == validated.content
+    assert b'"_id"' in fast.content
+    assert fast.headers["content-type"] == validated.headers["content-type"]
@@ -0,0 +1,124 @@
+# stir-backend/tests/test_hybrid_generation.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from core.config import settings
+from crud import crud_recipe
+from services import genaitext, hybrid_generation
+
+GENERATED = {
+    "title": "Generated Skillet",
+    "description": "",
+    "servings": "2",
+    "prep_time": "5 minutes",
+    "cook_time": "10 minutes",
+    "ingredients": [{"item": "tomato", "quantity": "2"}],
+    "instructions": ["Cook."],
+}
+
+
+def recipe_doc(title, lines, canonical):
+    return {
+        "_id": ObjectId(),
+        "title": title,
+        "ingredients_raw": repr(lines),
+        "ingredients_canonical": canonical,
+        "instructions": "Chop everything.\n\nCook everything.",
+    }
+
+
+@pytest.fixture
+def corpus(fake_db):
+    recipes = [
+        recipe_doc("Tomato Basil", ["2 tomatoes", "1 clove garlic", "basil"], ["tomato", "garlic", "basil"]),
+        recipe_doc("Soffritto", ["1 tomato", "1 onion", "1 carrot", "1 celery stalk"],
+                   ["tomato", "onion", "carrot", "celery"]),
+    ]
+    asyncio.run(fake_db["recipes"].insert_many(recipes))
+    return recipes
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    calls = []
+
+    async def generate(ingredients):
+        calls.append(ingredients)
+        return dict(GENERATED)
+
+    monkeypatch.setattr(genaitext, "generate_recipe_with_gemini", generate)
+    return calls
+
+
+def test_best_corpus_match_ignores_pantry_staples(corpus):
+    match = asyncio.run(hybrid_generation.best_corpus_match(["2 tomatoes", "garlic", "basil", "salt"], 0.8))
+    assert match == (str(corpus[0]["_id"]), 1.0)
+
+
+def test_best_corpus_match_below_min_coverage(corpus):
+    assert asyncio.run(hybrid_generation.best_corpus_match(["tomato", "onion"], 0.8)) is None
+    assert asyncio.run(hybrid_generation.best_corpus_match(["tomato", "onion"], 0.5)) == (str(corpus[1]["_id"]), 0.5)
+    assert asyncio.run(hybrid_generation.best_corpus_match(["salt", "water"], 0.5)) is None
+
+
+def test_corpus_recipe_response_matches_generated_shape():
+    recipe = {
+        "_id": ObjectId(),
+        "title": "Chickpeas",
+        "ingredients_cleaned": ["1 (14-oz.) can chickpeas, drained", "Salt to taste"],
+        "instructions": "Rinse.\n\n Serve. ",
+    }
+    response = hybrid_generation.corpus_recipe_response(recipe, 5 / 6)
+    assert set(GENERATED) <= set(response)
+    assert response["ingredients"] == [
+        {"item": "chickpeas, drained", "quantity": "1 (14-oz.) can"},
+        {"item": "Salt to taste", "quantity": ""},
+    ]
+    assert response["instructions"] == ["Rinse.", "Serve."]
+    assert response["source"] == "corpus"
+    assert response["recipe_id"] == str(recipe["_id"])
+    assert response["coverage"] == 0.833
+
+
+def test_generate_recipe_serves_corpus_match(corpus, fake_gemini, monkeypatch):
+    monkeypatch.setattr(settings, "HYBRID_GENERATION", True)
+    response = asyncio.run(hybrid_generation.generate_recipe(["tomatoes", "garlic", "basil"]))
+    assert response["source"] == "corpus"
+    assert response["title"] == "Tomato Basil"
+    assert not fake_gemini
+
+
+def test_generate_recipe_falls_back_when_corpus_fails(fake_gemini, monkeypatch):
+    async def broken(*args):
+        raise ConnectionError("mongo down")
+
+    monkeypatch.setattr(settings, "HYBRID_GENERATION", True)
+    monkeypatch.setattr(crud_recipe, "find_ingredient_lists_using_any", broken)
+    response = asyncio.run(hybrid_generation.generate_recipe(["tomato", "garlic"]))
+    assert response == {**GENERATED, "source": "generated"}
+    assert fake_gemini == [["tomato", "garlic"]]
+
+
+def test_generated_recipe_is_persisted_in_background(fake_gemini, monkeypatch):
+    stored = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def persist(recipe):
+            await release.wait()
+            stored.append(recipe["title"])
+
+        monkeypatch.setattr(hybrid_generation, "persist_generated", persist)
+        response = await hybrid_generation.generate_recipe(["tomato"])
+        assert response["source"] == "generated"
+        assert not stored
+        release.set()
+        await hybrid_generation.drain_persist_tasks()
+
+    monkeypatch.setattr(settings, "HYBRID_PERSIST_GENERATED", True)
+    asyncio.run(run())
+    assert stored == ["Generated Skillet"]
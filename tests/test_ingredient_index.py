@@ -0,0 +1,56 @@
+# stir-backend/tests/test_ingredient_index.py
+
+import asyncio
+import random
+
+from services import ingredient_index
+from services.ingredient_index import PRECOMPUTED_TOP_K, IngredientPrefixIndex
+
+FREQUENCIES = {
+    "garlic": 90, "garlic powder": 30, "ginger": 30, "green onion": 45, "gruyere": 5,
+    "salt": 120, "sugar": 80, "soy sauce": 25,
+}
+
+
+def brute_force(frequencies, prefix, limit):
+    names = sorted(name for name in frequencies if name.startswith(prefix))
+    return [(name, frequencies[name]) for name in sorted(names, key=lambda name: -frequencies[name])][:limit]
+
+
+def test_suggest_ranks_by_count_then_name():
+    index = IngredientPrefixIndex(FREQUENCIES)
+    assert index.suggest("g") == [
+        ("garlic", 90), ("green onion", 45), ("garlic powder", 30), ("ginger", 30), ("gruyere", 5),
+    ]
+    assert index.suggest("gar", limit=1) == [("garlic", 90)]
+    assert index.suggest("  GA ") == [("garlic", 90), ("garlic powder", 30)]
+    assert index.suggest("", limit=2) == [("salt", 120), ("garlic", 90)]
+    assert index.suggest("x") == []
+
+
+def test_precomputed_and_scanned_prefixes_agree():
+    rng = random.Random(3)
+    letters = "abcde"
+    frequencies = {
+        "".join(rng.choice(letters) for _ in range(rng.randint(1, 6))): rng.randint(1, 20) for _ in range(500)
+    }
+    index = IngredientPrefixIndex(frequencies)
+    prefixes = ["", "a", "b", "ab", "ea", "abc", "dd", "ddee"]
+    for prefix in prefixes:
+        # Short prefixes use the precomputed lists unless the limit exceeds them
+        for limit in (1, 10, PRECOMPUTED_TOP_K, PRECOMPUTED_TOP_K + 1):
+            assert index.suggest(prefix, limit) == brute_force(frequencies, prefix, limit), (prefix, limit)
+
+
+def test_suggest_endpoint(api_client, fake_db, monkeypatch):
+    monkeypatch.setattr(ingredient_index, "_index", None)
+    assert api_client.get("/api/v1/recipes/ingredients/suggest", params={"prefix": "g"}).status_code == 503
+
+    asyncio.run(fake_db["recipes"].insert_many([
+        {"ingredients_canonical": ["garlic", "ginger"]},
+        {"ingredients_canonical": ["garlic", "tomato"]},
+        {"ingredients_cleaned": ["Ginger ", "Garlic"]},
+    ]))
+    asyncio.run(ingredient_index.rebuild())
+    response = api_client.get("/api/v1/recipes/ingredients/suggest", params={"prefix": "g", "limit": 5})
+    assert response.json() == [{"name": "garlic", "count": 3}, {"name": "ginger", "count": 2}]
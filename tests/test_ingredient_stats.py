@@ -0,0 +1,72 @@
+# stir-backend/tests/test_ingredient_stats.py
+
+import asyncio
+import random
+
+from utils.ingredient_stats import (
+    PAIRS_FIELD, RECIPES_FIELD, STATS_COLLECTION, StatsDelta, compute_stats, field_key, name_from_key,
+    stats_documents,
+)
+
+NAMES = ["egg", "flour", "milk", "sugar", "butter", "st. john's wort", "$weird"]
+
+
+async def apply(collection, delta: StatsDelta) -> None:
+    # mongomock's bulk_write rejects current PyMongo UpdateOne objects;
+    # replay the operations one at a time instead
+    for operation in delta.updates():
+        await collection.update_one(operation._filter, operation._doc, upsert=True)
+
+
+def without_zero_counts(documents):
+    result = {}
+    for doc in documents:
+        pairs = {key: count for key, count in doc.get(PAIRS_FIELD, {}).items() if count}
+        if doc.get(RECIPES_FIELD):
+            result[doc["_id"]] = (doc[RECIPES_FIELD], pairs)
+    return result
+
+
+def test_incremental_updates_match_full_rebuild(fake_db):
+    rng = random.Random(7)
+    collection = fake_db[STATS_COLLECTION]
+    recipes = {}
+
+    async def run():
+        for step in range(200):
+            recipe_id = rng.randrange(25)
+            old = recipes.get(recipe_id)
+            new = rng.sample(NAMES, rng.randint(1, 4)) if rng.random() > 0.2 else None
+            if new is None:
+                recipes.pop(recipe_id, None)
+            else:
+                recipes[recipe_id] = new
+
+            delta = StatsDelta()
+            delta.add(old, new)
+            await apply(collection, delta)
+        return await collection.find({}).to_list(length=None)
+
+    incremental = asyncio.run(run())
+    rebuilt = stats_documents(compute_stats(recipes.values()))
+    assert without_zero_counts(incremental) == without_zero_counts(rebuilt)
+
+
+def test_unchanged_ingredients_need_no_writes():
+    delta = StatsDelta()
+    delta.add(["egg", "milk"], ["milk", "egg"])
+    assert not delta
+    assert delta.updates() == []
+
+
+def test_pair_increments_use_safe_field_keys():
+    delta = StatsDelta()
+    delta.add(None, ["st. john's wort", "$weird"])
+    increments = {operation._filter["_id"]: operation._doc["$inc"] for operation in delta.updates()}
+    assert increments == {
+        "$weird": {RECIPES_FIELD: 1, f"{PAIRS_FIELD}.{field_key(NAMES[5])}": 1},
+        "st. john's wort": {RECIPES_FIELD: 1, f"{PAIRS_FIELD}.{field_key(NAMES[6])}": 1},
+    }
+    assert "." not in field_key(NAMES[5]) and not field_key(NAMES[6]).startswith("$")
+    assert name_from_key(field_key(NAMES[5])) == NAMES[5]
+    assert name_from_key(field_key(NAMES[6])) == NAMES[6]
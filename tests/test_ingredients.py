@@ -0,0 +1,45 @@
+# stir-backend/tests/test_ingredients.py
+
+import pytest
+
+from utils.ingredients import canonicalize_ingredient, canonicalize_ingredients, split_quantity
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("2 large eggs, beaten", "egg"),
+    ("1 (14-oz.) can chickpeas", "chickpea"),
+    ("Freshly ground black pepper", "pepper"),
+    ("1 tsp ground cinnamon", "cinnamon"),
+    ("2 cups chopped and drained tomatoes", "tomato"),
+    # Preparation words that are part of the ingredient's name
+    ("1 lb ground beef", "ground beef"),
+    ("500 g minced beef", "ground beef"),
+    ("1 cup hot sauce", "hot sauce"),
+    ("2 hot dogs", "hot dog"),
+    ("1 cup whole milk", "milk"),
+    ("salt and pepper", "salt and pepper"),
+    ("1 tsp bicarbonate of soda", "baking soda"),
+    ("1/2 tsp cream of tartar", "cream of tartar"),
+    # Accented names
+    ("1/2 cup crème fraîche", "creme fraiche"),
+    ("4 oz Gruyère, grated", "gruyere"),
+    ("½ cup sugar", "sugar"),
+])
+def test_canonicalize_ingredient(line, expected):
+    assert canonicalize_ingredient(line) == expected
+
+
+def test_canonicalize_ingredient_without_ingredient():
+    assert canonicalize_ingredient("2 tbsp, divided") is None
+    assert canonicalize_ingredient("") is None
+
+
+def test_canonicalize_ingredients_dedupes_in_order():
+    assert canonicalize_ingredients("['2 eggs', 'Kosher salt', '1 egg yolk', 'sea salt']") == [
+        "egg", "salt", "egg yolk",
+    ]
+
+
+def test_split_quantity():
+    assert split_quantity("1 (14-oz.) can chickpeas, drained") == ("1 (14-oz.) can", "chickpeas, drained")
+    assert split_quantity("Salt to taste") == ("", "Salt to taste")
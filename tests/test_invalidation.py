@@ -0,0 +1,95 @@
+# stir-backend/tests/test_invalidation.py
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from crud import crud_recipe
+from services import invalidation
+from services.invalidation import DebouncedTask, InvalidationBus, InvalidationEvent
+
+
+async def wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_bus_fans_out_to_sync_and_async_consumers():
+    bus = InvalidationBus()
+    received = []
+
+    async def async_consumer(event):
+        received.append(("async", event))
+
+    def failing_consumer(event):
+        raise RuntimeError("boom")
+
+    bus.subscribe("sync", lambda event: received.append(("sync", event)))
+    bus.subscribe("failing", failing_consumer)
+    bus.subscribe("async", async_consumer)
+    event = InvalidationEvent(recipe_ids=frozenset({"a"}), source="test")
+    asyncio.run(bus.publish(event))
+    assert received == [("sync", event), ("async", event)]
+
+    with pytest.raises(ValueError):
+        bus.subscribe("sync", print)
+    bus.unsubscribe("sync")
+    bus.unsubscribe("missing")
+    asyncio.run(bus.publish(event))
+    assert received[-1] == ("async", event) and len(received) == 3
+
+
+def test_debounced_task_coalesces_bursts():
+    runs = []
+
+    async def rebuild():
+        runs.append(asyncio.get_running_loop().time())
+
+    async def run():
+        task = DebouncedTask("test", rebuild, delay=0.05)
+        for _ in range(5):
+            task(InvalidationEvent(full=True))
+            await asyncio.sleep(0.01)
+        assert not runs
+        await wait_for(lambda: runs)
+        await asyncio.sleep(0.1)
+        assert len(runs) == 1
+
+        task(InvalidationEvent(full=True))
+        await task.cancel()
+        await asyncio.sleep(0.1)
+        assert len(runs) == 1
+
+    asyncio.run(run())
+
+
+def test_poll_updated_at_publishes_writes_and_version_changes(fake_db):
+    events = []
+
+    async def run():
+        await fake_db["recipes"].insert_one({"_id": ObjectId(), "title": "Old", "updated_at": datetime(2024, 1, 1)})
+        poller = asyncio.create_task(invalidation.poll_updated_at(0.01))
+        await asyncio.sleep(0.05)
+        assert not events
+
+        await crud_recipe.upsert_recipe({"title": "New"}, {"title": "New"})
+        new = await fake_db["recipes"].find_one({"title": "New"})
+        await wait_for(lambda: events)
+        assert events == [InvalidationEvent(recipe_ids=frozenset({str(new["_id"])}), source="poll")]
+
+        await crud_recipe.mark_corpus_updated()
+        await wait_for(lambda: len(events) == 2)
+        assert events[1] == InvalidationEvent(full=True, source="poll")
+
+        poller.cancel()
+        await asyncio.gather(poller, return_exceptions=True)
+
+    invalidation.bus.subscribe("test_poll", events.append)
+    try:
+        asyncio.run(run())
+    finally:
+        invalidation.bus.unsubscribe("test_poll")
@@ -0,0 +1,42 @@
+# stir-backend/tests/test_recipe_batch.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from core.config import settings
+
+
+@pytest.fixture
+def recipe_ids(fake_db):
+    recipes = [
+        {"_id": ObjectId(), "title": title, "ingredients_raw": "['1 egg']", "instructions": "Cook."}
+        for title in ("Omelette", "Frittata", "Shakshuka")
+    ]
+    asyncio.run(fake_db["recipes"].insert_many(recipes))
+    return [str(recipe["_id"]) for recipe in recipes]
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_batch_follows_request_order(api_client, recipe_ids, monkeypatch, fast):
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", fast)
+    missing = str(ObjectId())
+    ids = [recipe_ids[2], "not-an-id", recipe_ids[0], missing, recipe_ids[2]]
+
+    response = api_client.post("/api/v1/recipes/batch", json={"ids": ids})
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["id"] for item in items] == ids
+    assert [item["recipe"] and item["recipe"]["title"] for item in items] == [
+        "Shakshuka", None, "Omelette", None, "Shakshuka",
+    ]
+    assert [item["error"] for item in items] == [None, "invalid_id", None, "not_found", None]
+    assert items[0]["recipe"]["_id"] == recipe_ids[2]
+    assert items[0]["recipe"]["ingredients_cleaned"] == ["1 egg"]
+
+
+def test_batch_rejects_too_many_ids(api_client, monkeypatch):
+    monkeypatch.setattr(settings, "RECIPE_BATCH_MAX_IDS", 2)
+    response = api_client.post("/api/v1/recipes/batch", json={"ids": [str(ObjectId()) for _ in range(3)]})
+    assert response.status_code == 400
@@ -0,0 +1,151 @@
+# stir-backend/tests/test_resilience.py
+
+import asyncio
+import time
+
+import pytest
+
+from core.resilience import (
+    CircuitBreaker, CircuitOpenError, DeadlineExceededError, Policy, Upstream, UpstreamError, is_transient,
+)
+
+
+class FakeUpstream:
+    """
+    Async stand-in for an AI API that can be told to fail its next N calls.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_next: int = 0, error=ConnectionError):
+        self.latency = latency
+        self.fail_next = fail_next
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise self.error("injected failure")
+        await asyncio.sleep(self.latency)
+        return "ok"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def call(upstream: Upstream, request):
+    return asyncio.run(upstream.call(request))
+
+
+def test_is_transient():
+    assert is_transient(ConnectionError())
+    assert is_transient(asyncio.TimeoutError())
+    assert is_transient(type("ServiceUnavailable", (Exception,), {})())
+    error = Exception()
+    error.status_code = 503
+    assert is_transient(error)
+    error.status_code = 400
+    assert not is_transient(error)
+    assert not is_transient(ValueError())
+
+
+def test_deadline_abandons_stalled_upstream():
+    upstream = Upstream("test_deadline", Policy(timeout=0.05, deadline=0.15, max_attempts=10, backoff_base=0.001))
+    fake = FakeUpstream(latency=10.0)
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceededError):
+        call(upstream, fake)
+    assert time.perf_counter() - started < 0.5
+    assert fake.calls >= 2
+
+
+def test_transient_errors_are_retried():
+    upstream = Upstream("test_retry", Policy(timeout=1.0, deadline=5.0, max_attempts=3, backoff_base=0.001))
+    fake = FakeUpstream(fail_next=2)
+    assert call(upstream, fake) == "ok"
+    assert fake.calls == 3
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_exhausted_retries_raise_upstream_error():
+    upstream = Upstream("test_exhausted", Policy(timeout=1.0, deadline=5.0, max_attempts=2, backoff_base=0.001))
+    fake = FakeUpstream(fail_next=100)
+    with pytest.raises(UpstreamError) as raised:
+        call(upstream, fake)
+    assert type(raised.value) is UpstreamError
+    assert isinstance(raised.value.__cause__, ConnectionError)
+    assert raised.value.upstream == "test_exhausted"
+    assert fake.calls == 2
+
+
+def test_breaker_opening_between_retries_raises_circuit_open():
+    policy = Policy(timeout=1.0, deadline=5.0, max_attempts=5, backoff_base=0.001, failure_threshold=2)
+    upstream = Upstream("test_open_mid_retry", policy)
+    fake = FakeUpstream(fail_next=100)
+    with pytest.raises(CircuitOpenError):
+        call(upstream, fake)
+    assert fake.calls == 2
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+
+def test_non_transient_errors_are_not_retried_and_keep_circuit_closed():
+    upstream = Upstream("test_no_retry", Policy(timeout=1.0, deadline=5.0, max_attempts=3, failure_threshold=2))
+    fake = FakeUpstream(fail_next=10, error=ValueError)
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            call(upstream, fake)
+    assert fake.calls == 5
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_opens_fails_fast_and_closes_after_probe():
+    clock = FakeClock()
+    policy = Policy(timeout=1.0, deadline=1.0, max_attempts=1, failure_threshold=3, reset_timeout=30.0)
+    upstream = Upstream("test_breaker", policy, clock=clock)
+    fake = FakeUpstream(fail_next=3)
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            call(upstream, fake)
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError) as raised:
+        call(upstream, fake)
+    assert fake.calls == 3
+    assert raised.value.retry_after == pytest.approx(30.0)
+
+    clock.now += 31.0
+    assert call(upstream, fake) == "ok"
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test_probe", failure_threshold=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 11.0
+    assert breaker.allow()
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_hedge_answers_from_second_request():
+    latencies = [10.0, 0.0]
+
+    async def request():
+        await asyncio.sleep(latencies.pop(0))
+        return "ok"
+
+    upstream = Upstream("test_hedge", Policy(timeout=5.0, deadline=5.0, hedge=True, hedge_delay=0.05))
+    started = time.perf_counter()
+    assert call(upstream, request) == "ok"
+    assert time.perf_counter() - started < 1.0
+    assert not latencies
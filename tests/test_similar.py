@@ -0,0 +1,65 @@
+# stir-backend/tests/test_similar.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from core.config import settings
+from crud import crud_recipe
+from crud.crud_recipe import NEIGHBORS_COLLECTION
+from services import similarity
+
+
+def recipe_doc(title, canonical):
+    return {
+        "_id": ObjectId(),
+        "title": title,
+        "ingredients_raw": repr(canonical),
+        "ingredients_canonical": canonical,
+        "instructions": "Cook.",
+    }
+
+
+@pytest.fixture
+def corpus(fake_db, monkeypatch):
+    recipes = [
+        recipe_doc("Bruschetta", ["tomato", "garlic", "basil"]),
+        recipe_doc("Tomato Sauce", ["tomato", "garlic", "onion"]),
+        recipe_doc("Soup", ["carrot", "celery"]),
+    ]
+    asyncio.run(fake_db["recipes"].insert_many(recipes))
+    monkeypatch.setattr(similarity, "_index", asyncio.run(similarity.build_index()))
+    monkeypatch.setattr(settings, "SIMILAR_USE_PRECOMPUTED", True)
+    return [str(recipe["_id"]) for recipe in recipes]
+
+
+def similar_titles(client, recipe_id):
+    response = client.get(f"/api/v1/recipes/{recipe_id}/similar")
+    assert response.status_code == 200
+    return [recipe["title"] for recipe in response.json()]
+
+
+def store_neighbors(db, recipe_id, neighbor_ids, recipes_updated_at=None):
+    asyncio.run(db[NEIGHBORS_COLLECTION].replace_one({"_id": ObjectId(recipe_id)}, {
+        "neighbors": [{"_id": ObjectId(neighbor_id), "score": 0.5} for neighbor_id in neighbor_ids],
+        "corpus_version": None,
+        "recipes_updated_at": recipes_updated_at,
+    }, upsert=True))
+
+
+def test_similar_from_index(api_client, corpus):
+    assert similar_titles(api_client, corpus[0]) == ["Tomato Sauce"]
+    assert api_client.get(f"/api/v1/recipes/{ObjectId()}/similar").status_code == 404
+
+
+def test_similar_uses_precomputed_until_a_recipe_is_written(api_client, fake_db, corpus):
+    store_neighbors(fake_db, corpus[0], [corpus[2]])
+    assert similar_titles(api_client, corpus[0]) == ["Soup"]
+
+    asyncio.run(crud_recipe.upsert_recipe({"title": "Pesto"}, {"title": "Pesto"}))
+    assert similar_titles(api_client, corpus[0]) == ["Tomato Sauce"]
+
+    # Rebuilt after the write
+    store_neighbors(fake_db, corpus[0], [corpus[2]], asyncio.run(crud_recipe.get_latest_recipe_write()))
+    assert similar_titles(api_client, corpus[0]) == ["Soup"]
@@ -0,0 +1,292 @@
+# stir-backend/utils/dietary.py
+
+"""
+Dietary and allergen classification as a compact integer bitmask.
+
+Each recipe stores `diet_flags`: one bit per ingredient category it
+*contains* (meat, dairy, gluten, tree nuts, ...), derived from its
+canonical ingredient names at import/migration time. Diets are defined by
+the categories they forbid, so every filter is a bitwise test:
+
+    vegetarian            flags & (MEAT|POULTRY|FISH|SHELLFISH) == 0   $bitsAllClear
+    contains dairy        flags & DAIRY == DAIRY                       $bitsAllSet
+    not vegan             flags & VEGAN_FORBIDDEN != 0                 $bitsAnySet
+
+Classification is keyword based and errs on the side of flagging: a
+recipe is only labelled nut-free if none of its ingredients looks like a
+nut. Recipes without `diet_flags` never match a filter; writers leave it
+unset when no ingredient was recognised, since 0 would read as "vegan and
+free of every allergen".
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.ingredients import singularize
+
+DIET_FLAGS_FIELD = "diet_flags"
+
+# ---- Categories a recipe can contain (one bit each; never renumber) ----
+MEAT = 1 << 0        # red meat, game, gelatin
+POULTRY = 1 << 1
+FISH = 1 << 2
+SHELLFISH = 1 << 3
+DAIRY = 1 << 4
+EGG = 1 << 5
+GLUTEN = 1 << 6
+TREE_NUT = 1 << 7
+PEANUT = 1 << 8
+SOY = 1 << 9
+SESAME = 1 << 10
+ALCOHOL = 1 << 11
+PORK = 1 << 12
+HONEY = 1 << 13
+
+CATEGORIES: Dict[str, int] = {
+    "meat": MEAT,
+    "poultry": POULTRY,
+    "fish": FISH,
+    "shellfish": SHELLFISH,
+    "dairy": DAIRY,
+    "egg": EGG,
+    "gluten": GLUTEN,
+    "tree_nut": TREE_NUT,
+    "peanut": PEANUT,
+    "soy": SOY,
+    "sesame": SESAME,
+    "alcohol": ALCOHOL,
+    "pork": PORK,
+    "honey": HONEY,
+}
+
+_ANIMAL_FLESH = MEAT | PORK | POULTRY | FISH | SHELLFISH
+
+# ---- Diets: the categories each one forbids ----
+DIETS: Dict[str, int] = {
+    "vegetarian": _ANIMAL_FLESH,
+    "vegan": _ANIMAL_FLESH | DAIRY | EGG | HONEY,
+    "pescatarian": MEAT | PORK | POULTRY,
+    "gluten_free": GLUTEN,
+    "dairy_free": DAIRY,
+    "egg_free": EGG,
+    "nut_free": TREE_NUT | PEANUT,
+    "soy_free": SOY,
+    "shellfish_free": SHELLFISH,
+    "alcohol_free": ALCOHOL,
+    "pork_free": PORK,
+}
+
+# Keyword -> categories, matched on whole (singularized) words of canonical
+# names. Longer phrases win over the words they contain, which is how the
+# false friends are handled: "coconut milk" is not dairy, "peanut butter"
+# is peanut, "rice flour" is not gluten. Phrases with 0 mean "not a match".
+KEYWORDS: Dict[str, int] = {
+    # Meat and pork
+    "beef": MEAT, "steak": MEAT, "veal": MEAT, "lamb": MEAT, "mutton": MEAT, "goat": MEAT,
+    "venison": MEAT, "bison": MEAT, "rabbit": MEAT, "oxtail": MEAT, "brisket": MEAT, "sirloin": MEAT,
+    "tenderloin": MEAT, "short rib": MEAT, "chuck": MEAT, "meatball": MEAT, "gelatin": MEAT,
+    "bone marrow": MEAT, "liver": MEAT, "beef broth": MEAT, "beef stock": MEAT, "suet": MEAT,
+    "pork": MEAT | PORK, "bacon": MEAT | PORK, "ham": MEAT | PORK, "prosciutto": MEAT | PORK,
+    "pancetta": MEAT | PORK, "guanciale": MEAT | PORK, "chorizo": MEAT | PORK, "salami": MEAT | PORK,
+    "pepperoni": MEAT | PORK, "sausage": MEAT | PORK, "lard": MEAT | PORK, "speck": MEAT | PORK,
+    "mortadella": MEAT | PORK, "andouille": MEAT | PORK, "kielbasa": MEAT | PORK,
+    "hot dog": MEAT | PORK, "frankfurter": MEAT | PORK, "wiener": MEAT | PORK, "bratwurst": MEAT | PORK,
+    # Poultry
+    "chicken": POULTRY, "turkey": POULTRY, "duck": POULTRY, "goose": POULTRY, "quail": POULTRY,
+    "poussin": POULTRY, "cornish hen": POULTRY, "foie gras": POULTRY,
+    # Fish and shellfish
+    "fish": FISH, "salmon": FISH, "tuna": FISH, "cod": FISH, "anchovy": FISH, "sardine": FISH,
+    "trout": FISH, "halibut": FISH, "mackerel": FISH, "tilapia": FISH, "bass": FISH, "snapper": FISH,
+    "swordfish": FISH, "haddock": FISH, "sole": FISH, "flounder": FISH, "catfish": FISH,
+    "monkfish": FISH, "branzino": FISH, "bonito": FISH, "caviar": FISH, "roe": FISH,
+    "worcestershire": FISH, "worcestershire sauce": FISH, "fish sauce": FISH,
+    "shrimp": SHELLFISH, "prawn": SHELLFISH, "crab": SHELLFISH, "lobster": SHELLFISH,
+    "clam": SHELLFISH, "mussel": SHELLFISH, "oyster": SHELLFISH, "scallop": SHELLFISH,
+    "squid": SHELLFISH, "calamari": SHELLFISH, "octopus": SHELLFISH, "crawfish": SHELLFISH,
+    "langoustine": SHELLFISH, "oyster sauce": SHELLFISH,
+    # Dairy
+    "milk": DAIRY, "butter": DAIRY, "buttermilk": DAIRY, "cream": DAIRY, "cheese": DAIRY,
+    "yogurt": DAIRY, "yoghurt": DAIRY, "parmesan": DAIRY, "parmigiano": DAIRY, "mozzarella": DAIRY,
+    "ricotta": DAIRY, "mascarpone": DAIRY, "feta": DAIRY, "cheddar": DAIRY, "gruyere": DAIRY,
+    "pecorino": DAIRY, "brie": DAIRY, "gouda": DAIRY, "goat cheese": DAIRY, "burrata": DAIRY,
+    "halloumi": DAIRY, "paneer": DAIRY, "ghee": DAIRY, "whey": DAIRY, "creme fraiche": DAIRY,
+    "kefir": DAIRY, "half-and-half": DAIRY, "sour cream": DAIRY, "ice cream": DAIRY,
+    "custard": DAIRY | EGG, "quark": DAIRY, "labneh": DAIRY, "queso": DAIRY,
+    "coconut milk": 0, "coconut cream": 0, "almond milk": TREE_NUT, "cashew milk": TREE_NUT,
+    "soy milk": SOY, "soymilk": SOY, "oat milk": 0, "rice milk": 0, "cocoa butter": 0,
+    "cream tartar": 0, "cream of tartar": 0, "vegan butter": 0, "vegan cheese": 0, "nutritional yeast": 0,
+    "apple butter": 0, "shea butter": 0,
+    # Egg
+    "egg": EGG, "egg yolk": EGG, "egg white": EGG, "mayonnaise": EGG, "mayo": EGG,
+    "aioli": EGG, "meringue": EGG, "hollandaise": EGG | DAIRY,
+    # Gluten
+    "flour": GLUTEN, "wheat": GLUTEN, "bread": GLUTEN, "breadcrumb": GLUTEN, "panko": GLUTEN,
+    "pasta": GLUTEN, "spaghetti": GLUTEN, "linguine": GLUTEN, "fettuccine": GLUTEN, "penne": GLUTEN,
+    "macaroni": GLUTEN, "lasagna": GLUTEN, "orzo": GLUTEN, "noodle": GLUTEN, "couscous": GLUTEN,
+    "bulgur": GLUTEN, "farro": GLUTEN, "barley": GLUTEN, "rye": GLUTEN, "spelt": GLUTEN,
+    "semolina": GLUTEN, "seitan": GLUTEN, "tortilla": GLUTEN, "pita": GLUTEN, "baguette": GLUTEN,
+    "brioche": GLUTEN, "croissant": GLUTEN, "cracker": GLUTEN, "puff pastry": GLUTEN,
+    "pastry": GLUTEN, "phyllo": GLUTEN, "filo": GLUTEN, "dough": GLUTEN, "biscuit": GLUTEN,
+    "graham cracker": GLUTEN, "cookie": GLUTEN, "cake": GLUTEN, "beer": GLUTEN | ALCOHOL,
+    "malt": GLUTEN, "soy sauce": SOY | GLUTEN, "teriyaki": SOY | GLUTEN, "hoisin": SOY | GLUTEN,
+    "rice flour": 0, "almond flour": TREE_NUT, "coconut flour": 0, "corn flour": 0,
+    "chickpea flour": 0, "gluten-free flour": 0, "rice noodle": 0, "corn tortilla": 0,
+    "buckwheat": 0, "tamari": SOY, "cornbread": GLUTEN, "rice cake": 0, "fish cake": FISH | GLUTEN,
+    # Nuts and seeds
+    "almond": TREE_NUT, "walnut": TREE_NUT, "pecan": TREE_NUT, "cashew": TREE_NUT,
+    "pistachio": TREE_NUT, "hazelnut": TREE_NUT, "macadamia": TREE_NUT, "pine nut": TREE_NUT,
+    "brazil nut": TREE_NUT, "chestnut": TREE_NUT, "praline": TREE_NUT, "marzipan": TREE_NUT,
+    "nutella": TREE_NUT | DAIRY, "frangipane": TREE_NUT | EGG | DAIRY, "mixed nut": TREE_NUT | PEANUT,
+    "nut": TREE_NUT, "water chestnut": 0,
+    "peanut": PEANUT, "peanut butter": PEANUT, "peanut oil": PEANUT, "satay": PEANUT,
+    "soy": SOY, "soybean": SOY, "tofu": SOY, "tempeh": SOY, "edamame": SOY, "miso": SOY,
+    "sesame": SESAME, "tahini": SESAME, "sesame oil": SESAME, "sesame seed": SESAME, "halva": SESAME,
+    # Alcohol
+    "wine": ALCOHOL, "red wine": ALCOHOL, "white wine": ALCOHOL, "rum": ALCOHOL, "vodka": ALCOHOL,
+    "brandy": ALCOHOL, "bourbon": ALCOHOL, "whiskey": ALCOHOL, "whisky": ALCOHOL, "sherry": ALCOHOL,
+    "liqueur": ALCOHOL, "gin": ALCOHOL, "tequila": ALCOHOL, "cognac": ALCOHOL, "mirin": ALCOHOL,
+    "sake": ALCOHOL, "vermouth": ALCOHOL, "kirsch": ALCOHOL, "marsala": ALCOHOL, "port": ALCOHOL,
+    "champagne": ALCOHOL, "prosecco": ALCOHOL, "cider": 0, "hard cider": ALCOHOL,
+    "amaretto": ALCOHOL, "grand marnier": ALCOHOL, "cointreau": ALCOHOL, "triple sec": ALCOHOL,
+    "kahlua": ALCOHOL, "calvados": ALCOHOL, "mezcal": ALCOHOL, "stout": GLUTEN | ALCOHOL,
+    "wine vinegar": 0, "red wine vinegar": 0, "white wine vinegar": 0, "sherry vinegar": 0,
+    "rice wine vinegar": 0, "cooking wine": ALCOHOL, "shaoxing wine": ALCOHOL | GLUTEN,
+    # Honey
+    "honey": HONEY, "honeycomb": HONEY, "honeydew": 0,
+}
+
+_MAX_PHRASE_WORDS = 3
+
+
+def _normalise(phrase: str) -> Tuple[str, ...]:
+    return tuple(singularize(word) for word in phrase.lower().replace(",", " ").split())
+
+
+# Phrases are matched on singularized words, so singularize the table once
+_PHRASES: Dict[Tuple[str, ...], int] = {_normalise(phrase): flags for phrase, flags in KEYWORDS.items()}
+
+
+def classify_ingredient(name: str) -> int:
+    """
+    Categories one ingredient name belongs to, e.g. "unsalted butter" -> DAIRY.
+    """
+    words = _normalise(name)
+    flags = 0
+    i = 0
+    while i < len(words):
+        for length in range(min(_MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+            match = _PHRASES.get(words[i:i + length])
+            if match is not None:
+                flags |= match
+                i += length
+                break
+        else:
+            i += 1
+    return flags
+
+
+def classify_ingredients(names: Iterable[str]) -> Optional[int]:
+    """
+    The diet_flags value for a recipe with these canonical ingredient names,
+    or None if there are none (nothing is known about the recipe).
+    """
+    flags = None
+    for name in names:
+        flags = (flags or 0) | classify_ingredient(name)
+    return flags
+
+
+def with_diet_flags(update: dict, names: Iterable[str]) -> dict:
+    """
+    Adds diet_flags for these canonical names to a Mongo update document:
+    `$set` when classified, `$unset` when no ingredient was recognised so a
+    stale value cannot survive. Returns `update`.
+    """
+    flags = classify_ingredients(names)
+    if flags is None:
+        update.setdefault("$unset", {})[DIET_FLAGS_FIELD] = ""
+    else:
+        update.setdefault("$set", {})[DIET_FLAGS_FIELD] = flags
+    return update
+
+
+def labels(flags: int) -> List[str]:
+    """
+    The diets a recipe with these flags satisfies, e.g. ["vegetarian", "nut_free"].
+    """
+    return [diet for diet, forbidden in DIETS.items() if not flags & forbidden]
+
+
+@dataclass
+class DietFilter:
+    """
+    Compiled include/exclude filter over diet_flags.
+
+    include: diets the recipe must satisfy, or categories it must contain
+    exclude: categories it must not contain, or diets it must not satisfy
+    """
+
+    all_clear: int = 0
+    all_set: int = 0
+    # Each mask needs at least one bit set (one per excluded diet)
+    any_set: List[int] = field(default_factory=list)
+
+    @classmethod
+    def parse(cls, include: Sequence[str] = (), exclude: Sequence[str] = ()) -> Optional["DietFilter"]:
+        """
+        Builds a filter from label names, or returns None if both are empty.
+        Raises ValueError naming any unknown label.
+        """
+        if not include and not exclude:
+            return None
+
+        unknown = [label for label in (*include, *exclude) if _key(label) not in DIETS and _key(label) not in CATEGORIES]
+        if unknown:
+            raise ValueError(
+                f"Unknown dietary filter(s): {', '.join(unknown)}. "
+                f"Use diets {sorted(DIETS)} or categories {sorted(CATEGORIES)}."
+            )
+
+        diet_filter = cls()
+        for label in include:
+            key = _key(label)
+            if key in DIETS:
+                diet_filter.all_clear |= DIETS[key]
+            else:
+                diet_filter.all_set |= CATEGORIES[key]
+        for label in exclude:
+            key = _key(label)
+            if key in CATEGORIES:
+                diet_filter.all_clear |= CATEGORIES[key]
+            else:
+                diet_filter.any_set.append(DIETS[key])
+        return diet_filter
+
+    def matches(self, flags: Optional[int]) -> bool:
+        if flags is None or flags < 0:
+            return False
+        return (
+            not flags & self.all_clear
+            and flags & self.all_set == self.all_set
+            and all(flags & mask for mask in self.any_set)
+        )
+
+    def to_query(self) -> dict:
+        """
+        The equivalent Mongo filter, to merge into a find() query.
+        """
+        conditions = {}
+        if self.all_clear:
+            conditions["$bitsAllClear"] = self.all_clear
+        if self.all_set:
+            conditions["$bitsAllSet"] = self.all_set
+        if self.any_set:
+            conditions["$bitsAnySet"] = self.any_set[0]
+        query = {DIET_FLAGS_FIELD: conditions or {"$exists": True}}
+        if len(self.any_set) > 1:
+            query["$and"] = [{DIET_FLAGS_FIELD: {"$bitsAnySet": mask}} for mask in self.any_set[1:]]
+        return query
+
+
+def _key(label: str) -> str:
+    return label.strip().lower().replace("-", "_").replace(" ", "_")
@@ -3,15 +3,19 @@ from typing import Dict
 import re
 import ast
 
+from utils.images import image_variants
+
 logger = logging.getLogger(__name__)
 
 
 def clean_recipe_ingredients(recipe: Dict) -> Dict:
     """
     Cleans the ingredients fields by parsing 'ingredients_raw'.
+    Runs for every recipe of list pages and exports, so progress is logged
+    at DEBUG; only parse problems are logged above it.
     """
     title = recipe.get('title', 'Unknown Recipe')
-    logger.info(f"--- Cleaning ingredients for: {title} ---")
+    logger.debug(f"--- Cleaning ingredients for: {title} ---")
 
     raw_ingredients_str = recipe.get("ingredients_raw")
 
@@ -28,15 +32,45 @@ def clean_recipe_ingredients(recipe: Dict) -> Dict:
                     clean_item = str(item).strip()
                     if clean_item:
                         clean_list.append(clean_item)
-                logger.info(f"Successfully parsed and cleaned {len(clean_list)} ingredients from raw field.")
+                logger.debug(f"Successfully parsed and cleaned {len(clean_list)} ingredients from raw field.")
             else:
                 logger.warning(f"Parsed raw ingredients data is not a list for recipe: {title}")
         except (ValueError, SyntaxError) as e:
             logger.error(f"Failed to parse 'ingredients_raw' for recipe '{title}': {e}")
     else:
-        logger.info(f"No 'ingredients_raw' field found for recipe: {title}")
+        logger.debug(f"No 'ingredients_raw' field found for recipe: {title}")
 
     # Replace the old 'ingredients_cleaned' with the newly parsed list
     recipe["ingredients_cleaned"] = clean_list
 
-    return recipe
\ No newline at end of file
+    return recipe
+
+
+def serialize_recipe(recipe: Dict) -> Dict:
+    """
+    Projects a cleaned recipe document onto the `schemas.recipe.Recipe`
+    response shape (field order and aliases included) without running
+    Pydantic validation. A "score" key (SimilarRecipe) is passed through.
+    Only use this for documents from our own database.
+    """
+    image = recipe.get("image")
+    if image:
+        image = {
+            "url": image.get("url"),
+            "public_id": image.get("public_id"),
+            "width": image.get("width"),
+            "height": image.get("height"),
+            "format": image.get("format"),
+            "variants": image_variants(image),
+        }
+
+    serialized = {
+        "_id": recipe["_id"],
+        "title": recipe.get("title"),
+        "ingredients_cleaned": recipe.get("ingredients_cleaned") or [],
+        "instructions": recipe.get("instructions"),
+        "image": image or None,
+    }
+    if "score" in recipe:
+        serialized["score"] = recipe["score"]
+    return serialized
@@ -0,0 +1,78 @@
+# stir-backend/utils/images.py
+
+"""
+Width-based delivery variants for recipe images.
+
+Each variant is a Cloudinary transformation URL built from the image's
+stored public_id, e.g.
+
+    https://res.cloudinary.com/<cloud>/image/upload/c_limit,w_480,f_auto,q_auto/v1/recipes/<stem>
+
+c_limit never upscales, so a variant is at most as wide as the original;
+f_auto/q_auto let the CDN pick WebP/AVIF and a perceptual quality per
+client. Cloudinary derives and caches each variant on first request, so
+nothing is uploaded or stored for them.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from core.config import settings
+
+# Delivery base and optional version segment of a stored Cloudinary URL
+_UPLOAD_URL = re.compile(r"^(?P<base>https?://[^/]+/[^/]+)/image/upload/(?:(?P<version>v\d+)/)?")
+
+
+@lru_cache(maxsize=8)
+def parse_widths(spec: str) -> Tuple[Tuple[str, int], ...]:
+    """
+    "thumbnail=160,card=480" -> (("thumbnail", 160), ("card", 480)).
+    Raises ValueError on a malformed spec.
+    """
+    widths: List[Tuple[str, int]] = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, width = part.partition("=")
+        if not name.strip() or not width.strip().isdigit() or int(width) <= 0:
+            raise ValueError(f"Invalid image variant '{part.strip()}'; expected name=width")
+        widths.append((name.strip(), int(width)))
+    return tuple(widths)
+
+
+def _delivery_prefix(url: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    match = _UPLOAD_URL.match(url or "")
+    if match:
+        return match.group("base"), match.group("version")
+    if settings.CLOUD_NAME:
+        return f"https://res.cloudinary.com/{settings.CLOUD_NAME}", None
+    return None, None
+
+
+def image_variants(image: Optional[dict]) -> Optional[Dict[str, dict]]:
+    """
+    Variant name -> {"url", "width", "height"} for a stored image
+    ({"url", "public_id", "width", "height", "format"}), or None if the
+    image has no public_id or its cloud cannot be determined.
+    """
+    if not image or not image.get("public_id"):
+        return None
+    base, version = _delivery_prefix(image.get("url"))
+    if base is None:
+        return None
+
+    original_width = image.get("width") or 0
+    original_height = image.get("height") or 0
+    path = f"{version}/{image['public_id']}" if version else image["public_id"]
+
+    variants = {}
+    for name, width in parse_widths(settings.IMAGE_VARIANT_WIDTHS):
+        served_width = min(width, original_width) if original_width > 0 else width
+        served_height = round(original_height * served_width / original_width) if original_width > 0 else None
+        variants[name] = {
+            "url": f"{base}/image/upload/c_limit,w_{width},{settings.IMAGE_VARIANT_TRANSFORM}/{path}",
+            "width": served_width,
+            "height": served_height,
+        }
+    return variants
@@ -0,0 +1,122 @@
+# stir-backend/utils/ingredient_stats.py
+
+"""
+Materialized per-ingredient statistics, maintained incrementally by every
+writer of recipes.
+
+The `ingredient_stats` collection holds one document per canonical
+ingredient name:
+
+    {"_id": "garlic", "recipes": 4120, "pairs": {"onion": 2210, "olive oil": 1984, ...}}
+
+`recipes` counts the recipes using the ingredient and `pairs` counts, per
+other ingredient, the recipes using both. Full pair counts (rather than a
+stored top-N) are what make exact incremental maintenance possible: a
+writer that changes a recipe's canonical list from `old` to `new` only
+needs `$inc` updates for the names and pairs that differ. Top-N lists are
+derived from them by the in-memory mirror (services/ingredient_stats.py).
+"""
+
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from pymongo import UpdateOne
+
+STATS_COLLECTION = "ingredient_stats"
+RECIPES_FIELD = "recipes"
+PAIRS_FIELD = "pairs"
+
+
+def field_key(name: str) -> str:
+    """
+    Ingredient name as a field name under `pairs`: "." and a leading "$"
+    would be read as paths/operators, so they are swapped for look-alikes.
+    """
+    key = name.replace(".", "．")
+    return "＄" + key[1:] if key.startswith("$") else key
+
+
+def name_from_key(key: str) -> str:
+    name = key.replace("．", ".")
+    return "$" + name[1:] if name.startswith("＄") else name
+
+
+class StatsDelta:
+    """
+    Accumulates the count changes caused by a batch of recipe writes and
+    turns them into one bulk write against the stats collection.
+    """
+
+    def __init__(self):
+        self.recipes: Counter = Counter()
+        self.pairs: Dict[str, Counter] = {}
+
+    def __bool__(self) -> bool:
+        # Changes that cancel out leave zero entries behind
+        return any(self.recipes.values()) or any(any(pairs.values()) for pairs in self.pairs.values())
+
+    def _apply(self, names: Iterable[str], sign: int) -> None:
+        unique = sorted(set(names))
+        for name in unique:
+            self.recipes[name] += sign
+        for a, b in combinations(unique, 2):
+            self.pairs.setdefault(a, Counter())[b] += sign
+            self.pairs.setdefault(b, Counter())[a] += sign
+
+    def add(self, old: Optional[Sequence[str]], new: Optional[Sequence[str]]) -> None:
+        """
+        Records one recipe whose canonical ingredients changed from `old`
+        (None or empty for an insert) to `new` (None or empty for a delete).
+        """
+        if old:
+            self._apply(old, -1)
+        if new:
+            self._apply(new, +1)
+
+    def updates(self) -> List:
+        """
+        Bulk write operations for the accumulated changes (empty if they
+        cancel out). Counts that drop to zero are left in place; readers
+        ignore them and the next full rebuild removes them.
+        """
+        operations = []
+        for name in sorted(set(self.recipes) | set(self.pairs)):
+            increments = {}
+            if self.recipes.get(name):
+                increments[RECIPES_FIELD] = self.recipes[name]
+            for other, count in (self.pairs.get(name) or {}).items():
+                if count:
+                    increments[f"{PAIRS_FIELD}.{field_key(other)}"] = count
+            if increments:
+                operations.append(UpdateOne({"_id": name}, {"$inc": increments}, upsert=True))
+        return operations
+
+    def clear(self) -> None:
+        self.recipes.clear()
+        self.pairs.clear()
+
+
+def compute_stats(ingredient_lists: Iterable[Sequence[str]]) -> StatsDelta:
+    """
+    Statistics of a whole corpus, as one delta from empty (full rebuilds).
+    """
+    delta = StatsDelta()
+    for names in ingredient_lists:
+        delta.add(None, names)
+    return delta
+
+
+def stats_documents(delta: StatsDelta) -> List[dict]:
+    """
+    Stats documents for a corpus built with compute_stats.
+    """
+    return [
+        {
+            "_id": name,
+            RECIPES_FIELD: count,
+            PAIRS_FIELD: {field_key(other): n for other, n in (delta.pairs.get(name) or {}).items() if n > 0},
+        }
+        for name, count in sorted(delta.recipes.items())
+        if count > 0
+    ]
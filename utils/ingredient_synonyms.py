@@ -0,0 +1,67 @@
+# stir-backend/utils/ingredient_synonyms.py
+
+"""
+Maintained synonym dictionary for ingredient canonicalization.
+
+Keys and values are in the form produced by `canonicalize_ingredient`
+*before* synonym mapping: lower-case, quantities/units/preparation words
+removed and singularized. When you add an entry, re-run
+`scripts/canonicalize_migration.py` so stored documents pick it up.
+"""
+
+INGREDIENT_SYNONYMS = {
+    # Regional names
+    "aubergine": "eggplant",
+    "courgette": "zucchini",
+    "rocket": "arugula",
+    "coriander leaf": "cilantro",
+    "spring onion": "scallion",
+    "green onion": "scallion",
+    "garbanzo bean": "chickpea",
+    "garbanzo": "chickpea",
+    "prawn": "shrimp",
+    "minced beef": "ground beef",
+    "double cream": "heavy cream",
+    "single cream": "light cream",
+    "caster sugar": "superfine sugar",
+    "icing sugar": "powdered sugar",
+    "confectioner sugar": "powdered sugar",
+    "confectioners sugar": "powdered sugar",
+    "bicarbonate of soda": "baking soda",
+    "bicarb": "baking soda",
+    "cornflour": "cornstarch",
+    "corn starch": "cornstarch",
+    "capsicum": "bell pepper",
+
+    # Varieties that recipes treat as interchangeable
+    "kosher salt": "salt",
+    "sea salt": "salt",
+    "table salt": "salt",
+    "flaky sea salt": "salt",
+    "black pepper": "pepper",
+    "black peppercorn": "peppercorn",
+    "extra virgin olive oil": "olive oil",
+    "extra-virgin olive oil": "olive oil",
+    "all purpose flour": "flour",
+    "all-purpose flour": "flour",
+    "plain flour": "flour",
+    "unsalted butter": "butter",
+    "salted butter": "butter",
+    "heavy whipping cream": "heavy cream",
+    "whipping cream": "heavy cream",
+    "granulated sugar": "sugar",
+    "white sugar": "sugar",
+    "light brown sugar": "brown sugar",
+    "dark brown sugar": "brown sugar",
+    "salt pepper": "salt and pepper",
+    "garlic clove": "garlic",
+    "clove garlic": "garlic",
+    "whole milk": "milk",
+    "vegetable stock": "vegetable broth",
+    "chicken stock": "chicken broth",
+    "beef stock": "beef broth",
+    "low-sodium chicken broth": "chicken broth",
+    "parmigiano-reggiano": "parmesan",
+    "parmigiano reggiano": "parmesan",
+    "parmesan cheese": "parmesan",
+}
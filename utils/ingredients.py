@@ -0,0 +1,248 @@
+# stir-backend/utils/ingredients.py
+
+"""
+Ingredient canonicalization.
+
+Turns free-text ingredient lines such as "2 large eggs, beaten" into a
+canonical name ("egg") so that ingredient queries can be answered with
+exact, indexed matches on the `ingredients_canonical` array instead of
+unanchored regex scans.
+"""
+
+import ast
+import re
+import unicodedata
+from typing import Iterable, List, Optional, Tuple, Union
+
+from utils.ingredient_synonyms import INGREDIENT_SYNONYMS
+
+CANONICAL_FIELD = "ingredients_canonical"
+
+UNITS = {
+    "cup", "cups", "c", "tablespoon", "tablespoons", "tbsp", "tbs", "tbsps", "teaspoon", "teaspoons",
+    "tsp", "tsps", "ounce", "ounces", "oz", "pound", "pounds", "lb", "lbs", "gram", "grams", "g", "kg",
+    "kilogram", "kilograms", "ml", "milliliter", "milliliters", "l", "liter", "liters", "litre", "litres",
+    "quart", "quarts", "qt", "pint", "pints", "pt", "gallon", "gallons", "pinch", "pinches", "dash",
+    "dashes", "handful", "handfuls", "stick", "sticks", "can", "cans", "jar", "jars", "package",
+    "packages", "pkg", "bunch", "bunches", "sprig", "sprigs", "head", "heads", "slice", "slices",
+    "piece", "pieces", "inch", "inches", "box", "boxes", "bag", "bags", "bottle", "bottles", "container",
+    "containers", "envelope", "envelopes", "sheet", "sheets", "stalk", "stalks", "drop", "drops",
+}
+
+PREPARATION_WORDS = {
+    "large", "small", "medium", "extra-large", "jumbo", "fresh", "freshly", "frozen", "thawed", "dried",
+    "chopped", "finely", "coarsely", "roughly", "thinly", "thickly", "minced", "diced", "sliced", "grated",
+    "shredded", "crushed", "ground", "peeled", "seeded", "cored", "trimmed", "halved", "quartered",
+    "cubed", "julienned", "beaten", "lightly", "softened", "melted", "room-temperature", "cold", "warm",
+    "hot", "packed", "loosely", "firmly", "sifted", "divided", "optional", "about", "plus", "more",
+    "to", "taste", "for", "serving", "garnish", "rinsed", "drained", "toasted", "cooked", "uncooked",
+    "raw", "whole", "boneless", "skinless", "pitted", "zested", "juiced", "cut", "into", "and", "or",
+    "of", "a", "an", "the", "very", "well", "such", "as", "preferably", "good-quality", "homemade",
+    "store-bought", "at", "temperature", "room", "inch-thick", "pieces", "wedges", "strips",
+}
+
+# Ingredient names that contain preparation words ("ground beef" is not
+# "beef", "salt and pepper" is not "salt pepper"). Matched on the words of a
+# line before preparation words are stripped; the synonym keys and values
+# are added below so that entries like "minced beef" can match.
+PROTECTED_PHRASES = {
+    "ground beef", "ground pork", "ground lamb", "ground veal", "ground turkey", "ground chicken",
+    "hot dog", "hot sauce", "hot pepper", "hot chili", "hot chili pepper", "hot water",
+    "whole milk", "whole wheat", "whole wheat flour", "whole wheat bread", "whole grain mustard",
+    "salt and pepper", "half and half", "half-and-half", "mac and cheese", "sweet and sour sauce",
+    "cream of tartar", "cream of mushroom soup", "cream of chicken soup", "ice water", "cold water",
+}
+
+# Plural forms that the suffix rules below would get wrong
+IRREGULAR_SINGULARS = {
+    "leaves": "leaf",
+    "loaves": "loaf",
+    "halves": "half",
+    "knives": "knife",
+    "geese": "goose",
+    "teeth": "tooth",
+    "feet": "foot",
+}
+
+# Words that end in "s" but are already singular
+UNCOUNTABLE = {
+    "asparagus", "couscous", "hummus", "molasses", "swiss", "lemongrass", "watercress", "bass",
+    "grits", "brussels", "citrus", "octopus", "hibiscus", "cactus", "schnapps", "cress", "gras",
+}
+
+_PARENTHETICAL = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_QUANTITY = re.compile(r"[\d¼½¾⅓⅔⅛⅜⅝⅞]+(?:[/.\-–][\d¼½¾⅓⅔⅛⅜⅝⅞]*)*")
+_NON_WORD = re.compile(r"[^a-z\- ]+")
+
+
+def singularize(word: str) -> str:
+    """
+    Rule-based English singularization, good enough for ingredient nouns.
+    """
+    if word in IRREGULAR_SINGULARS:
+        return IRREGULAR_SINGULARS[word]
+    if word in UNCOUNTABLE or len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "sses", "zes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _strip_accents(text: str) -> str:
+    """
+    "crème fraîche" -> "creme fraiche", so accented names survive the
+    ASCII-only word filter.
+    """
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+
+def _phrase_key(words: Iterable[str]) -> Tuple[str, ...]:
+    words = list(words)
+    if words:
+        words[-1] = singularize(words[-1])
+    return tuple(words)
+
+
+def _protected_phrases() -> dict:
+    # Only phrases with a word the stripping would drop need protection
+    phrases = {}
+    for phrase in (*PROTECTED_PHRASES, *INGREDIENT_SYNONYMS, *INGREDIENT_SYNONYMS.values()):
+        words = phrase.split()
+        if len(words) > 1 and any(word in PREPARATION_WORDS or word in UNITS for word in words):
+            phrases[_phrase_key(words)] = len(words)
+    return phrases
+
+
+_PROTECTED = _protected_phrases()
+_MAX_PROTECTED_WORDS = max((length for length in _PROTECTED.values()), default=0)
+
+
+def _strip_words(words: List[str]) -> List[str]:
+    """
+    Drops units and preparation words, except inside a protected phrase
+    (longest match wins).
+    """
+    kept = []
+    i = 0
+    while i < len(words):
+        for length in range(min(_MAX_PROTECTED_WORDS, len(words) - i), 1, -1):
+            if _phrase_key(words[i:i + length]) in _PROTECTED:
+                kept.extend(words[i:i + length])
+                i += length
+                break
+        else:
+            if words[i] not in UNITS and words[i] not in PREPARATION_WORDS:
+                kept.append(words[i])
+            i += 1
+    return kept
+
+
+def canonicalize_ingredient(text: str) -> Optional[str]:
+    """
+    Maps one ingredient line to its canonical name, or None if nothing
+    ingredient-like is left after stripping quantities, units and
+    preparation words.
+
+    "2 large eggs, beaten"          -> "egg"
+    "1 (14-oz.) can chickpeas"      -> "chickpea"
+    "Freshly ground black pepper"   -> "pepper"
+    "1 lb ground beef"              -> "ground beef"
+    "Crème fraîche"                 -> "creme fraiche"
+    """
+    if not text:
+        return None
+
+    text = str(text).lower()
+    # Preparation notes normally follow the first comma: "onion, finely chopped"
+    text = text.split(",", 1)[0]
+    text = _PARENTHETICAL.sub(" ", text)
+    text = _QUANTITY.sub(" ", text)
+    # After the quantities: NFKD would turn "½" into "1⁄2"
+    text = _strip_accents(text)
+    text = _NON_WORD.sub(" ", text)
+
+    words = _strip_words([word.strip("-") for word in text.split() if word.strip("-")])
+    if not words:
+        return None
+
+    words[-1] = singularize(words[-1])
+    name = " ".join(words)
+    return INGREDIENT_SYNONYMS.get(name, name)
+
+
+def split_quantity(text: str) -> Tuple[str, str]:
+    """
+    Splits an ingredient line into its leading quantity/unit part and the
+    rest: "1 (14-oz.) can chickpeas, drained" -> ("1 (14-oz.) can",
+    "chickpeas, drained"). The quantity is "" when the line has none.
+    """
+    words = str(text or "").split()
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word.startswith("(") and not word.endswith(")"):
+            # Keep a multi-word parenthetical such as "(about 2 cups)" together
+            j = i
+            while j < len(words) and not words[j].endswith(")"):
+                j += 1
+            if j == len(words):
+                break
+            i = j + 1
+            continue
+        bare = word.lower().strip(".,")
+        if _PARENTHETICAL.fullmatch(word) or _QUANTITY.fullmatch(bare) or bare in UNITS:
+            i += 1
+            continue
+        break
+    return " ".join(words[:i]), " ".join(words[i:])
+
+
+def parse_ingredient_list(value: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Accepts the ingredient representations found in our data (a Python list,
+    a stringified list as in the Epicurious CSV, or a comma-joined string)
+    and returns a list of ingredient lines.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        stripped = value.strip()
+        if stripped.startswith("["):
+            try:
+                parsed = ast.literal_eval(stripped)
+                if isinstance(parsed, list):
+                    return [str(item) for item in parsed]
+            except (ValueError, SyntaxError):
+                pass
+        return stripped.split(",")
+    return [str(item) for item in value]
+
+
+def canonicalize_ingredients(value: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Canonicalizes every ingredient line and returns the distinct names in
+    their original order.
+    """
+    canonical = []
+    seen = set()
+    for line in parse_ingredient_list(value):
+        name = canonicalize_ingredient(line)
+        if name and name not in seen:
+            seen.add(name)
+            canonical.append(name)
+    return canonical
+
+
+def canonical_source(recipe: dict):
+    """
+    Picks the most complete ingredient field present on a stored recipe
+    document, covering both the importer and the Kaggle migration layouts.
+    """
+    for field in ("ingredients_raw", "Ingredients", "CleanedIngredients", "ingredients_cleaned"):
+        if recipe.get(field):
+            return recipe[field]
+    return None